@@ -0,0 +1,269 @@
+# Array mode for the calculator: add/subtract/multiply/divide over whole columns of
+# numbers at once, instead of one pair per call.
+#
+#   values, errors = calculate("/", [1, 2, 3], [1, 0, 4])
+#   # values: 1.0, nan, 0.75    errors: 0, 1, 0 (a division by zero)
+#
+# With NumPy installed the work is done by NumPy ufuncs. Without it, Python's
+# array('d') is used and each column goes through one C-level map() call, which is
+# slower but still well ahead of calling calculator_intern's functions pair by pair.
+#
+# Unlike calculator_intern.divide, which returns the string "Error! Division by zero.",
+# a division by zero here gives NaN in the result and True/1 in the error mask, so
+# a result column stays a column of numbers.
+#
+# Large inputs are streamed in chunks of rows, from CSV text or from binary files of
+# little-endian float64 records:
+#
+#   python calculator_arrays.py / data.csv --columns 2 3 --header -o ratios.csv
+#   python calculator_arrays.py + pairs.f64 --binary 2 -o sums.f64
+
+import argparse
+import operator
+import sys
+import time
+from array import array
+from itertools import islice, repeat
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+OPERATIONS = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide"}
+# The interactive menu's choice numbers work too
+OPERATIONS.update({"1": "add", "2": "subtract", "3": "multiply", "4": "divide"})
+
+PYTHON_FUNCTIONS = {"add": operator.add, "subtract": operator.sub, "multiply": operator.mul,
+                    "divide": operator.truediv}
+DEFAULT_CHUNK_ROWS = 65536
+
+def operation_name(operation):
+    try:
+        return OPERATIONS[operation]
+    except KeyError:
+        raise ValueError(f"unknown operation {operation!r}, use one of + - * / or 1-4") from None
+
+def as_column(values, length, use_numpy):
+    """values as a float64 column of `length` items; a single number is repeated"""
+    if isinstance(values, (int, float)):
+        return numpy.full(length, float(values)) if use_numpy else array("d", repeat(float(values), length))
+    column = numpy.asarray(values, dtype=numpy.float64) if use_numpy else (
+        values if isinstance(values, array) and values.typecode == "d" else array("d", values))
+    if len(column) != length:
+        raise ValueError(f"columns have different lengths ({len(column)} and {length})")
+    return column
+
+def calculate(operation, x, y, use_numpy=None):
+    """Apply an operation element-wise: (values, errors), errors marking divisions by zero.
+
+    x and y are sequences of numbers (or one of them a single number). The values are a
+    NumPy float64 array and the errors a NumPy bool array, or without NumPy an
+    array('d') and a bytearray of 0/1."""
+    name = operation_name(operation)
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ValueError("NumPy is not installed")
+    length = len(y) if isinstance(x, (int, float)) else len(x)
+    x = as_column(x, length, use_numpy)
+    y = as_column(y, length, use_numpy)
+    if use_numpy:
+        return numpy_calculate(name, x, y)
+    return python_calculate(name, x, y)
+
+def numpy_calculate(name, x, y):
+    if name != "divide":
+        return getattr(numpy, name)(x, y), numpy.zeros(len(x), dtype=bool)
+    errors = y == 0
+    values = numpy.full(len(x), numpy.nan)
+    with numpy.errstate(over="ignore", invalid="ignore"):
+        numpy.divide(x, y, out=values, where=~errors)
+    return values, errors
+
+def python_calculate(name, x, y):
+    errors = bytearray(len(x))
+    if name == "divide" and 0.0 in y:
+        # Zeros are usually rare: find them with array.index (a C scan) and patch a copy
+        # of y to NaN there, rather than checking every item in Python
+        y = array("d", y)
+        nan = float("nan")
+        index = y.index(0.0)
+        while True:
+            errors[index] = 1
+            y[index] = nan
+            try:
+                index = y.index(0.0, index + 1)
+            except ValueError:
+                break
+    return array("d", map(PYTHON_FUNCTIONS[name], x, y)), errors
+
+def error_count(errors):
+    if numpy is not None and isinstance(errors, numpy.ndarray):
+        return int(numpy.count_nonzero(errors))
+    return errors.count(1)
+
+def error_positions(errors, offset=0):
+    """Indexes (plus offset) where the error mask is set"""
+    if numpy is not None and isinstance(errors, numpy.ndarray):
+        return (numpy.flatnonzero(errors) + offset).tolist()
+    positions = []
+    index = errors.find(1)
+    while index != -1:
+        positions.append(index + offset)
+        index = errors.find(1, index + 1)
+    return positions
+
+# Streaming
+
+def read_csv_chunks(file, columns=(0, 1), chunk_rows=DEFAULT_CHUNK_ROWS, delimiter=",", header=False,
+                    use_numpy=None):
+    """Yield a tuple of float64 columns (the chosen ones) for every chunk_rows lines of a CSV text file.
+
+    Made for plain numeric CSV: every line has the same number of fields and nothing
+    is quoted. NumPy's loadtxt parses a chunk in C; without NumPy each chunk is split
+    into fields with two str calls and column c is the slice fields[c::width], so
+    the only per-row work left is float()."""
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if header:
+        file.readline()
+    line_number = int(header)
+    width = None
+    while True:
+        lines = list(islice(file, chunk_rows))
+        if not lines:
+            return
+        if width is None:
+            width = lines[0].count(delimiter) + 1
+        try:
+            if use_numpy:
+                # loadtxt parses in C (NumPy 1.23+)
+                table = numpy.loadtxt(lines, delimiter=delimiter, usecols=columns, ndmin=2)
+                chunk = tuple(table[:, index] for index in range(len(columns)))
+            else:
+                text = "".join(lines)
+                if text.endswith("\n"):
+                    text = text[:-1]
+                fields = text.replace(delimiter, "\n").split("\n")
+                if len(fields) != width * len(lines):
+                    raise ValueError
+                chunk = tuple(array("d", map(float, fields[column::width])) for column in columns)
+        except (IndexError, ValueError):
+            bad_line, problem = first_bad_line(lines, columns, width, delimiter)
+            raise ValueError(f"line {line_number + bad_line}: {problem}") from None
+        yield chunk
+        line_number += len(lines)
+
+def first_bad_line(lines, columns, width, delimiter):
+    """(line number within the chunk, what is wrong with it) for the first unreadable line"""
+    for line_number, line in enumerate(lines, start=1):
+        fields = line.split(delimiter)
+        if len(fields) != width:
+            return line_number, f"expected {width} fields, got {line.rstrip()!r}"
+        for column in columns:
+            try:
+                float(fields[column])
+            except (IndexError, ValueError):
+                return line_number, f"column {column} is not a number in {line.rstrip()!r}"
+    return 1, "unreadable chunk"
+
+def read_binary_chunks(file, column_count=2, chunk_rows=DEFAULT_CHUNK_ROWS, use_numpy=None):
+    """Yield the columns for every chunk_rows records of a binary file of little-endian float64 records"""
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    record_size = 8 * column_count
+    while True:
+        block = file.read(record_size * chunk_rows)
+        if not block:
+            return
+        if len(block) % record_size:
+            raise ValueError(f"file ends in the middle of a record of {column_count} float64 numbers")
+        if use_numpy:
+            records = numpy.frombuffer(block, dtype="<f8").reshape(-1, column_count)
+            yield tuple(records[:, column] for column in range(column_count))
+        else:
+            records = array("d", block)
+            if sys.byteorder == "big":
+                records.byteswap()
+            yield tuple(records[column::column_count] for column in range(column_count))
+
+def stream_calculate(operation, chunks, use_numpy=None):
+    """Yield (values, errors) for each chunk of (x, y) columns"""
+    for x, y in chunks:
+        yield calculate(operation, x, y, use_numpy)
+
+def write_csv_values(file, values):
+    # repr() round-trips a float exactly; NaN comes out as "nan", which float() reads back
+    file.write("\n".join(map(repr, values.tolist())))
+    file.write("\n")
+
+def write_binary_values(file, values):
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        file.write(values.astype("<f8").tobytes())
+    elif sys.byteorder == "big":
+        swapped = array("d", values)
+        swapped.byteswap()
+        file.write(swapped.tobytes())
+    else:
+        file.write(values.tobytes())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a calculator operation to two columns of numbers")
+    parser.add_argument("operation", help="+ - * / (or 1-4, as in the calculator menu)")
+    parser.add_argument("input", help="CSV file (or binary float64 records with --binary), - for stdin")
+    parser.add_argument("-o", "--output", help="where to write the results (default: stdout)")
+    parser.add_argument("--columns", type=int, nargs=2, default=[0, 1], metavar=("X", "Y"),
+                        help="CSV columns to use, counting from 0 (default: 0 1)")
+    parser.add_argument("--header", action="store_true", help="skip the first CSV line")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--binary", type=int, metavar="COLUMNS",
+                        help="input is float64 records of COLUMNS numbers; the first two are used; output is float64")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--no-numpy", action="store_true", help="use the pure Python array fallback")
+    args = parser.parse_args(argv)
+
+    use_numpy = numpy is not None and not args.no_numpy
+    binary = args.binary is not None
+    if binary and args.binary < 2:
+        parser.error("--binary needs at least 2 columns")
+    if binary:
+        source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+        chunks = read_binary_chunks(source, args.binary, args.chunk_rows, use_numpy)
+        chunks = (columns[:2] for columns in chunks)
+        output = open(args.output, "wb") if args.output else sys.stdout.buffer
+        write = write_binary_values
+    else:
+        source = sys.stdin if args.input == "-" else open(args.input, newline="")
+        chunks = read_csv_chunks(source, args.columns, args.chunk_rows, args.delimiter, args.header, use_numpy)
+        output = open(args.output, "w") if args.output else sys.stdout
+        write = write_csv_values
+
+    start = time.perf_counter()
+    rows = 0
+    error_total = 0
+    error_rows = []
+    try:
+        for values, errors in stream_calculate(args.operation, chunks, use_numpy):
+            write(output, values)
+            found = error_count(errors)
+            if found and len(error_rows) < 10:
+                error_rows += error_positions(errors, rows + 1)[:10 - len(error_rows)]
+            error_total += found
+            rows += len(values)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        source.close()
+        if args.output:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} rows in {elapsed:.2f} s ({rows / max(elapsed, 1e-9):,.0f} rows/s, "
+          f"{'NumPy' if use_numpy else 'array'})", file=sys.stderr)
+    if error_total:
+        print(f"{error_total:,} divisions by zero (result NaN), in rows {', '.join(map(str, error_rows))}"
+              f"{' ...' if error_total > len(error_rows) else ''}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# Batch mode for the calculator: evaluate a whole file of calculations, one per line,
+# and write one result per line in the same order.
+#
+#   python calculator_batch.py sums.txt -o results.txt --errors errors.tsv
+#
+# A line is either "num1 op num2" with spaces around the operator (op one of + - * /),
+# which goes straight to calculator_intern's functions, or any expression that
+# calculator_engine understands ("2 * (3 + 4) ^ 2"). A line that can't be calculated
+# gets "Error! <reason>" in the output, and its line number and reason are reported.
+#
+# The input is memory-mapped and cut into chunks that end at line breaks. Chunks are
+# evaluated by a pool of worker processes, and only a few chunks per worker are in
+# flight at once, so memory use doesn't grow with the size of the file.
+
+import argparse
+import mmap
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from calculator_engine import compile_expression, evaluate
+from calculator_intern import add, divide, multiply, subtract
+
+CALCULATOR_FUNCTIONS = {"+": add, "-": subtract, "*": multiply, "/": divide}
+DEFAULT_CHUNK_BYTES = 4 << 20
+# A number written in an expression (not the digits of a name like log10)
+LITERAL = re.compile(r"(?<![\w.])(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+# The names numbers are swapped for; a line that already uses one is evaluated as written
+PLACEHOLDER = re.compile(r"(?<![\w.])_\d+(?!\w)")
+
+def expression_value(line):
+    """Evaluate an expression line through the engine's cache.
+
+    The numbers are swapped for variables first, so "2 * (3 + 4)" and "5 * (1 + 8)"
+    share one compiled formula instead of each filling a cache slot."""
+    if PLACEHOLDER.search(line):
+        return evaluate(line)
+    values = {}
+
+    def variable(match):
+        name = f"_{len(values)}"
+        values[name] = float(match.group())
+        return name
+
+    try:
+        return compile_expression(LITERAL.sub(variable, line))(values)
+    except ValueError:
+        return evaluate(line)  # for an error message about the line as written
+
+def calculate_line(line):
+    """The result of one line as text; raises ValueError, ArithmeticError or TypeError if it has none"""
+    parts = line.split()
+    if len(parts) == 3 and parts[1] in CALCULATOR_FUNCTIONS:
+        try:
+            num1, num2 = float(parts[0]), float(parts[2])
+        except ValueError:
+            pass  # e.g. "x + 1" or "sqrt(2) * 3": an expression after all
+        else:
+            result = CALCULATOR_FUNCTIONS[parts[1]](num1, num2)
+            if isinstance(result, str):  # divide()'s "Error! Division by zero."
+                raise ZeroDivisionError("Division by zero.")
+            return repr(result)
+    return repr(expression_value(line))
+
+def evaluate_lines(lines):
+    """(output lines, [(index, reason) for each line that failed])"""
+    output = []
+    errors = []
+    for index, line in enumerate(lines):
+        if not line or line.isspace():
+            output.append("")
+            continue
+        try:
+            output.append(calculate_line(line))
+        except ZeroDivisionError:
+            output.append("Error! Division by zero.")
+            errors.append((index, "division by zero"))
+        except RecursionError:
+            output.append("Error! Expression is nested too deeply.")
+            errors.append((index, "expression is nested too deeply"))
+        except (ValueError, ArithmeticError, TypeError) as error:
+            # One bad line gets an error of its own instead of failing its whole chunk
+            output.append(f"Error! {error}")
+            errors.append((index, str(error)))
+    return output, errors
+
+def evaluate_chunk(path, start, end):
+    """Evaluate the lines in bytes [start, end) of a file: (line count, output bytes, errors)"""
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        text = data[start:end].decode("utf-8", errors="replace")
+    # Not splitlines(): that would also split at form feeds and other rare separators
+    lines = text.split("\n")
+    if text.endswith("\n"):
+        lines.pop()
+    output, errors = evaluate_lines(lines)
+    return len(lines), ("\n".join(output) + "\n").encode("utf-8"), errors
+
+def line_chunks(data, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Yield (start, end) byte ranges of about chunk_bytes that end just after a newline"""
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start + chunk_bytes - 1)
+        end = len(data) if end == -1 else end + 1
+        yield start, end
+        start = end
+
+def evaluate_file(path, output, processes=None, chunk_bytes=DEFAULT_CHUNK_BYTES, on_error=None):
+    """Evaluate every line of the file at path and write the results, in order, to the binary file output.
+
+    on_error(line_number, reason) is called for each line that failed, in order.
+    Returns (lines, errors)."""
+    processes = processes or os.cpu_count() or 1
+    if os.path.getsize(path) == 0:
+        return 0, 0
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        ranges = list(line_chunks(data, chunk_bytes))
+
+    lines = 0
+    error_count = 0
+
+    def write(result):
+        nonlocal lines, error_count
+        count, text, errors = result
+        output.write(text)
+        for index, reason in errors:
+            if on_error:
+                on_error(lines + index + 1, reason)
+        error_count += len(errors)
+        lines += count
+
+    if processes == 1:
+        for start, end in ranges:
+            write(evaluate_chunk(path, start, end))
+        return lines, error_count
+
+    with ProcessPoolExecutor(processes) as pool:
+        # Keep a couple of chunks per worker queued: enough to keep them busy, and
+        # results are written (and freed) in input order as soon as they're ready
+        pending = deque()
+        for start, end in ranges:
+            pending.append(pool.submit(evaluate_chunk, path, start, end))
+            if len(pending) >= 2 * processes:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+    return lines, error_count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a file of calculations, one per line")
+    parser.add_argument("input", help='file of "num1 op num2" or expression lines')
+    parser.add_argument("-o", "--output", help="where to write the results (default: stdout)")
+    parser.add_argument("--errors", help="write 'line<TAB>reason' for every failed line to this file")
+    parser.add_argument("--processes", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_BYTES / (1 << 20),
+                        help="size of the pieces handed to workers (default: 4)")
+    args = parser.parse_args(argv)
+    if args.chunk_mb <= 0:
+        parser.error("--chunk-mb must be greater than 0")
+
+    first_errors = []
+    errors_file = open(args.errors, "w", encoding="utf-8") if args.errors else None
+
+    def on_error(line_number, reason):
+        if len(first_errors) < 10:
+            first_errors.append(line_number)
+        if errors_file:
+            errors_file.write(f"{line_number}\t{reason}\n")
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    start = time.perf_counter()
+    try:
+        lines, errors = evaluate_file(args.input, output, args.processes, max(1, int(args.chunk_mb * (1 << 20))), on_error)
+    except OSError as error:
+        parser.error(str(error))
+    finally:
+        if args.output:
+            output.close()
+        if errors_file:
+            errors_file.close()
+
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.input)
+    print(f"{lines:,} lines in {elapsed:.2f} s: {lines / max(elapsed, 1e-9):,.0f} lines/s, "
+          f"{size / max(elapsed, 1e-9) / (1 << 20):.1f} MB/s", file=sys.stderr)
+    if errors:
+        print(f"{errors:,} lines could not be calculated, first on lines {', '.join(map(str, first_errors))}"
+              f"{' ...' if errors > len(first_errors) else ''}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
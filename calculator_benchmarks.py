@@ -0,0 +1,159 @@
+# Benchmarks for the calculator.
+# Run with: python calculator_benchmarks.py
+
+import io
+import os
+import random
+import tempfile
+import time
+from array import array
+
+import calculator_arrays
+from calculator_arrays import calculate, read_binary_chunks, read_csv_chunks, stream_calculate
+from calculator_batch import evaluate_file
+from calculator_engine import CompiledExpression, compile_expression, interpret, parse
+from calculator_intern import add, divide, multiply, subtract
+
+FORMULAS = [
+    "x + y",
+    "2 * (x + 3) ^ 2 - y / 4",
+    "sqrt(x * x + y * y) * pi / 180 + max(x, y, 1) % 7",
+    "((a + b) * (c - d) / (e1 + 1) - a ^ 2 + b * c * 3.5) / (1 + abs(d))",
+]
+
+def report(label, count, elapsed, unit="evaluations"):
+    print(f"{label:<44} {count:>9,} {unit:<11}  {elapsed:8.3f} s  {count / elapsed:12,.0f}/s")
+
+def expression_benchmark(count=200000):
+    """The same formula with new variable values each time: re-parse and walk vs cached compiled forms"""
+    random.seed(1)
+    for text in FORMULAS:
+        names = CompiledExpression(text).variables
+        bindings = [{name: random.uniform(1, 100) for name in names} for i in range(count)]
+        print(f"{text}:")
+
+        few = count // 10
+        start = time.perf_counter()
+        for variables in bindings[:few]:
+            interpret(parse(text), variables)
+        report("  parse + walk the AST every time", few, time.perf_counter() - start)
+
+        tree = parse(text)
+        start = time.perf_counter()
+        for variables in bindings:
+            interpret(tree, variables)
+        report("  parse once, walk the AST", count, time.perf_counter() - start)
+
+        expected = [interpret(tree, variables) for variables in bindings[:100]]
+        for mode in ("closures", "code"):
+            compile_expression.cache_clear()
+            start = time.perf_counter()
+            for variables in bindings:
+                compile_expression(text, mode)(variables)
+            report(f"  compile_expression(mode={mode!r}), cached", count, time.perf_counter() - start)
+            results = [compile_expression(text, mode)(variables) for variables in bindings[:100]]
+            assert all(abs(a - b) <= 1e-9 * max(1.0, abs(b)) for a, b in zip(results, expected)), mode
+
+        expression = compile_expression(text)
+        start = time.perf_counter()
+        for variables in bindings:
+            expression.function(variables)
+        report("  compiled code, called directly", count, time.perf_counter() - start)
+
+def array_benchmark(count=2000000, zero_share=0.05):
+    """Columns of number pairs: calculator_intern's functions one pair at a time vs array mode"""
+    random.seed(2)
+    x = array("d", (random.uniform(-1000, 1000) for i in range(count)))
+    y = array("d", (0.0 if random.random() < zero_share else random.uniform(-1000, 1000) for i in range(count)))
+    backends = [False] + ([True] if calculator_arrays.numpy is not None else [])
+    print(f"Array mode, {zero_share:.0%} of divisors zero:")
+    for operation, function in [("+", add), ("-", subtract), ("*", multiply), ("/", divide)]:
+        start = time.perf_counter()
+        scalar = [function(a, b) for a, b in zip(x, y)]
+        report(f"  {function.__name__}() per pair", count, time.perf_counter() - start, "pairs")
+        for use_numpy in backends:
+            start = time.perf_counter()
+            values, errors = calculate(operation, x, y, use_numpy)
+            report(f"  calculate({operation!r}), {'NumPy' if use_numpy else 'array fallback'}",
+                   count, time.perf_counter() - start, "pairs")
+            numbers = [value for value in scalar if not isinstance(value, str)]
+            assert calculator_arrays.error_count(errors) == len(scalar) - len(numbers)
+
+def streaming_benchmark(count=1000000):
+    """Whole files through the chunked readers, CSV text and binary float64 records"""
+    random.seed(3)
+    pairs = [(random.uniform(-1000, 1000), random.uniform(-1000, 1000)) for i in range(count)]
+    backends = [False] + ([True] if calculator_arrays.numpy is not None else [])
+    print("Streaming x / y over a file:")
+    with tempfile.TemporaryDirectory() as folder:
+        csv_path = os.path.join(folder, "pairs.csv")
+        binary_path = os.path.join(folder, "pairs.f64")
+        with open(csv_path, "w") as file:
+            file.writelines(f"{a!r},{b!r}\n" for a, b in pairs)
+        with open(binary_path, "wb") as file:
+            file.write(array("d", [number for pair in pairs for number in pair]).tobytes())
+
+        start = time.perf_counter()
+        with open(csv_path) as file:
+            for line in file:
+                a, b = line.split(",")
+                divide(float(a), float(b))
+        report("  CSV, divide() per line", count, time.perf_counter() - start, "rows")
+        for use_numpy in backends:
+            label = "NumPy" if use_numpy else "array fallback"
+            start = time.perf_counter()
+            with open(csv_path, newline="") as file:
+                for values, errors in stream_calculate("/", read_csv_chunks(file, use_numpy=use_numpy), use_numpy):
+                    pass
+            report(f"  CSV, chunked, {label}", count, time.perf_counter() - start, "rows")
+            start = time.perf_counter()
+            with open(binary_path, "rb") as file:
+                for values, errors in stream_calculate("/", read_binary_chunks(file, use_numpy=use_numpy),
+                                                       use_numpy):
+                    pass
+            report(f"  float64 records, chunked, {label}", count, time.perf_counter() - start, "rows")
+
+def batch_benchmark(count=1000000, expression_share=0.1):
+    """A file of "num1 op num2" lines with some expressions: a plain per-line loop vs evaluate_file"""
+    random.seed(4)
+    templates = ["{} * ({} + {}) ^ 2", "sqrt({}) + {} / {}", "({} - {}) * {} % 7"]
+    lines = []
+    for i in range(count):
+        if random.random() < expression_share:
+            lines.append(random.choice(templates).format(*(random.randint(1, 999) for j in range(3))))
+        else:
+            lines.append(f"{random.uniform(-1000, 1000):.6f} {random.choice('+-*/')} {random.randint(0, 99)}")
+    print(f"Batch file, {count:,} lines, {expression_share:.0%} expressions:")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "calculations.txt")
+        with open(path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+
+        functions = {"+": add, "-": subtract, "*": multiply, "/": divide}
+        start = time.perf_counter()
+        output = io.BytesIO()
+        with open(path) as file:
+            for line in file:
+                parts = line.split()
+                if len(parts) == 3 and parts[1] in functions:
+                    result = functions[parts[1]](float(parts[0]), float(parts[2]))
+                else:
+                    result = interpret(parse(line), {})
+                output.write(f"{result!r}\n".encode())
+        report("  per-line loop, parse + walk expressions", count, time.perf_counter() - start, "lines")
+
+        for processes in sorted({1, os.cpu_count() or 1}):
+            compile_expression.cache_clear()
+            start = time.perf_counter()
+            evaluated, errors = evaluate_file(path, io.BytesIO(), processes)
+            assert evaluated == count
+            report(f"  evaluate_file, {processes} process(es)", count, time.perf_counter() - start, "lines")
+
+if __name__ == "__main__":
+    expression_benchmark()
+    print()
+    array_benchmark()
+    print()
+    streaming_benchmark()
+    print()
+    batch_benchmark()
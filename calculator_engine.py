@@ -0,0 +1,371 @@
+# Expression engine for the calculator: full infix expressions instead of "number,
+# operator, number".
+#
+#   >>> evaluate("2 * (x + 3) ^ 2", x=1)
+#   32.0
+#   >>> area = compile_expression("pi * r ** 2")
+#   >>> area(r=2), area(r=3)
+#
+# Text is parsed into a small AST (named tuples), which is compiled once into either
+# a Python code object ("code", the default) or a tree of closures ("closures").
+# compile_expression keeps the most recently used formulas in an LRU cache, so
+# evaluating the same formula with new variable values skips the parser entirely.
+#
+# Grammar, loosest binding first:
+#   expression := term (("+" | "-") term)*
+#   term       := unary (("*" | "/" | "%") unary)*
+#   unary      := ("-" | "+") unary | power
+#   power      := primary (("**" | "^") unary)?      right-associative, so 2^3^2 = 2^9
+#   primary    := number | name | name "(" arguments ")" | "(" expression ")"
+# As in Python, -2 ** 2 is -(2 ** 2). All numbers are floats, as in calculator_intern.
+# Unlike Python, (-8) ** 0.5 is a math domain error rather than a complex number.
+#
+# Parsing, compiling and evaluating all recurse over the tree, so its depth is limited:
+# at most MAX_NESTING parentheses, signs and calls inside each other, and MAX_DEPTH
+# levels in the tree (a + b + c + ... adds a level per term). Deeper input is a ValueError.
+
+import math
+import operator
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+Number = namedtuple("Number", "value")
+Name = namedtuple("Name", "name")
+Unary = namedtuple("Unary", "op operand")
+Binary = namedtuple("Binary", "op left right")
+Call = namedtuple("Call", "name arguments")
+
+TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<op>\*\*|[-+*/%^(),])
+    )""", re.VERBOSE)
+
+def real_power(base, exponent):
+    """base ** exponent, but a math domain error where Python would return a complex number"""
+    result = base ** exponent
+    if type(result) is complex:
+        raise ValueError("math domain error")  # what math.sqrt(-1) says
+    return result
+
+BINARY_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+    "**": real_power,
+}
+UNARY_OPERATORS = {"-": operator.neg, "+": operator.pos}
+
+# name -> (function, number of arguments or None for any number)
+FUNCTIONS = {
+    "sqrt": (math.sqrt, 1),
+    "abs": (abs, 1),
+    "exp": (math.exp, 1),
+    "log": (math.log, 1),
+    "log10": (math.log10, 1),
+    "sin": (math.sin, 1),
+    "cos": (math.cos, 1),
+    "tan": (math.tan, 1),
+    "floor": (math.floor, 1),
+    "ceil": (math.ceil, 1),
+    "round": (round, 1),
+    "min": (min, None),
+    "max": (max, None),
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+MAX_NESTING = 100
+MAX_DEPTH = 200
+
+def tokenize(text):
+    """(kind, value, position) tuples, ending with ("end", None, len(text))"""
+    tokens = []
+    position = 0
+    while True:
+        match = TOKEN.match(text, position)
+        if not match:
+            rest = text[position:]
+            if rest.strip():
+                position += len(rest) - len(rest.lstrip())
+                raise ValueError(f"unexpected {text[position]!r} at position {position + 1}")
+            tokens.append(("end", None, len(text)))
+            return tokens
+        kind = match.lastgroup
+        value = match.group(kind)
+        tokens.append((kind, float(value) if kind == "number" else value, match.start(kind)))
+        position = match.end()
+
+class Parser:
+    """Recursive-descent parser: one method per grammar rule"""
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.index = 0
+        self.nesting = 0
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def advance(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, value):
+        kind, found, position = self.advance()
+        if found != value:
+            raise ValueError(f"expected {value!r} at position {position + 1}, found {describe(kind, found)}")
+
+    def nest(self):
+        # Each level here is several Python frames deep; fail cleanly long before RecursionError
+        self.nesting += 1
+        if self.nesting > MAX_NESTING:
+            raise ValueError(f"expression is nested too deeply at position {self.peek()[2] + 1}")
+
+    def parse(self):
+        tree = self.expression()
+        kind, value, position = self.peek()
+        if kind != "end":
+            raise ValueError(f"unexpected {describe(kind, value)} at position {position + 1}")
+        if tree_depth(tree) > MAX_DEPTH:
+            raise ValueError(f"expression is too deeply nested or too long (more than {MAX_DEPTH} levels)")
+        return tree
+
+    def expression(self):
+        self.nest()
+        tree = self.term()
+        while self.peek()[1] in ("+", "-"):
+            tree = Binary(self.advance()[1], tree, self.term())
+        self.nesting -= 1
+        return tree
+
+    def term(self):
+        tree = self.unary()
+        while self.peek()[1] in ("*", "/", "%"):
+            tree = Binary(self.advance()[1], tree, self.unary())
+        return tree
+
+    def unary(self):
+        if self.peek()[1] in ("-", "+"):
+            self.nest()
+            tree = Unary(self.advance()[1], self.unary())
+            self.nesting -= 1
+            return tree
+        return self.power()
+
+    def power(self):
+        tree = self.primary()
+        if self.peek()[1] in ("**", "^"):
+            self.advance()
+            tree = Binary("**", tree, self.unary())
+        return tree
+
+    def primary(self):
+        kind, value, position = self.advance()
+        if kind == "number":
+            return Number(value)
+        if kind == "name":
+            if self.peek()[1] != "(":
+                if value in FUNCTIONS:
+                    raise ValueError(f"{value} is a function; call it like {value}(x)")
+                return Name(value)
+            return self.call(value, position)
+        if value == "(":
+            tree = self.expression()
+            self.expect(")")
+            return tree
+        raise ValueError(f"expected a number, name or '(' at position {position + 1}, found {describe(kind, value)}")
+
+    def call(self, name, position):
+        if name not in FUNCTIONS:
+            raise ValueError(f"unknown function {name!r} at position {position + 1}")
+        self.expect("(")
+        arguments = []
+        if self.peek()[1] != ")":
+            arguments.append(self.expression())
+            while self.peek()[1] == ",":
+                self.advance()
+                arguments.append(self.expression())
+        self.expect(")")
+        wanted = FUNCTIONS[name][1]
+        if wanted is None and not arguments or wanted is not None and len(arguments) != wanted:
+            raise ValueError(f"{name}() takes {wanted or 'at least 1'} argument(s), got {len(arguments)}")
+        return Call(name, tuple(arguments))
+
+def describe(kind, value):
+    return "the end of the expression" if kind == "end" else repr(value)
+
+def parse(text):
+    """The AST of an expression; raises ValueError with the position of the first mistake"""
+    return Parser(text).parse()
+
+def tree_depth(tree):
+    """Levels in the tree: 1 for a lone number or name"""
+    deepest = 0
+    stack = [(tree, 1)]
+    while stack:
+        node, depth = stack.pop()
+        deepest = max(deepest, depth)
+        if type(node) is Unary:
+            stack.append((node.operand, depth + 1))
+        elif type(node) is Binary:
+            stack.extend(((node.left, depth + 1), (node.right, depth + 1)))
+        elif type(node) is Call:
+            stack.extend((argument, depth + 1) for argument in node.arguments)
+    return deepest
+
+def variable_names(tree):
+    """Variables used by the tree, in order of first appearance (constants like pi excluded)"""
+    names = {}
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if type(node) is Name:
+            if node.name not in CONSTANTS:
+                names[node.name] = None
+        elif type(node) is Unary:
+            stack.append(node.operand)
+        elif type(node) is Binary:
+            stack.extend((node.right, node.left))
+        elif type(node) is Call:
+            stack.extend(reversed(node.arguments))
+    return tuple(names)
+
+def fold_constants(tree):
+    """Replace every subtree without variables by its value (pi * 2 -> 6.283...)"""
+    if type(tree) is Name:
+        return Number(CONSTANTS[tree.name]) if tree.name in CONSTANTS else tree
+    if type(tree) is Unary:
+        children = [fold_constants(tree.operand)]
+        tree = Unary(tree.op, children[0])
+    elif type(tree) is Binary:
+        children = [fold_constants(tree.left), fold_constants(tree.right)]
+        tree = Binary(tree.op, *children)
+    elif type(tree) is Call:
+        children = [fold_constants(argument) for argument in tree.arguments]
+        tree = Call(tree.name, tuple(children))
+    else:
+        return tree
+    if all(type(child) is Number for child in children):
+        try:
+            # float(): floor() and round() give ints, which can be too big for a float
+            return Number(float(interpret(tree, {})))
+        except (ArithmeticError, ValueError, TypeError):
+            pass  # e.g. 1/0 or floor(1e308) ** 2: leave it to fail or not when evaluated, as without folding
+    return tree
+
+def interpret(tree, variables):
+    """Evaluate an AST by walking it: the baseline that compiling is measured against"""
+    node_type = type(tree)
+    if node_type is Number:
+        return tree.value
+    if node_type is Name:
+        if tree.name in CONSTANTS:
+            return CONSTANTS[tree.name]
+        return variables[tree.name]
+    if node_type is Binary:
+        return BINARY_OPERATORS[tree.op](interpret(tree.left, variables), interpret(tree.right, variables))
+    if node_type is Unary:
+        return UNARY_OPERATORS[tree.op](interpret(tree.operand, variables))
+    return FUNCTIONS[tree.name][0](*[interpret(argument, variables) for argument in tree.arguments])
+
+def compile_closures(tree):
+    """A function of the variables mapping, built from one closure per AST node"""
+    node_type = type(tree)
+    if node_type is Number:
+        value = tree.value
+        return lambda variables: value
+    if node_type is Name:
+        name = tree.name
+        return lambda variables: variables[name]
+    if node_type is Unary:
+        function = UNARY_OPERATORS[tree.op]
+        operand = compile_closures(tree.operand)
+        return lambda variables: function(operand(variables))
+    if node_type is Binary:
+        function = BINARY_OPERATORS[tree.op]
+        left = compile_closures(tree.left)
+        if type(tree.right) is Number:
+            # x * 2, x ** 2 and the like: skip a call for the constant
+            right_value = tree.right.value
+            return lambda variables: function(left(variables), right_value)
+        right = compile_closures(tree.right)
+        return lambda variables: function(left(variables), right(variables))
+    function = FUNCTIONS[tree.name][0]
+    arguments = [compile_closures(argument) for argument in tree.arguments]
+    if len(arguments) == 1:
+        argument = arguments[0]
+        return lambda variables: function(argument(variables))
+    return lambda variables: function(*[argument(variables) for argument in arguments])
+
+def python_source(tree, constants):
+    """Fully parenthesised Python source for the tree; odd constants (inf, nan) go into `constants`"""
+    node_type = type(tree)
+    if node_type is Number:
+        try:
+            finite = math.isfinite(tree.value)
+        except OverflowError:
+            raise ValueError(f"the number {tree.value:.6g} is too large") from None
+        if finite:
+            return repr(tree.value)
+        name = f"_constant{len(constants)}"
+        constants[name] = tree.value
+        return name
+    if node_type is Name:
+        # Subscripting the mapping works for any name, even ones that are Python keywords
+        return f"variables[{tree.name!r}]"
+    if node_type is Unary:
+        return f"({tree.op}{python_source(tree.operand, constants)})"
+    if node_type is Binary:
+        left, right = python_source(tree.left, constants), python_source(tree.right, constants)
+        if tree.op == "**":
+            return f"_real_power({left}, {right})"
+        return f"({left} {tree.op} {right})"
+    arguments = ", ".join(python_source(argument, constants) for argument in tree.arguments)
+    return f"_{tree.name}({arguments})"
+
+def compile_code(tree):
+    """A function of the variables mapping, compiled by Python from generated source.
+
+    The source comes from our own AST, never from the user's text, and only sees
+    the calculator's functions, so this is not an eval of arbitrary input."""
+    constants = {}
+    source = f"lambda variables: {python_source(tree, constants)}"
+    namespace = {"__builtins__": {}, "_real_power": real_power, **constants}
+    namespace.update((f"_{name}", function) for name, (function, count) in FUNCTIONS.items())
+    return eval(compile(source, "<expression>", "eval"), namespace)
+
+COMPILERS = {"code": compile_code, "closures": compile_closures}
+
+class CompiledExpression:
+    def __init__(self, text, mode="code"):
+        if mode not in COMPILERS:
+            raise ValueError(f"mode must be one of {', '.join(COMPILERS)}")
+        self.text = text
+        self.tree = fold_constants(parse(text))
+        self.variables = variable_names(self.tree)
+        self.function = COMPILERS[mode](self.tree)
+
+    def __call__(self, variables=None, **bindings):
+        """The value for these variable bindings (a mapping, keywords, or both)"""
+        if bindings:
+            variables = {**variables, **bindings} if variables else bindings
+        try:
+            return self.function(variables or {})
+        except KeyError as error:
+            raise ValueError(f"no value given for {error.args[0]!r} in {self.text!r}") from None
+
+    def __repr__(self):
+        return f"CompiledExpression({self.text!r})"
+
+@lru_cache(maxsize=1024)
+def compile_expression(text, mode="code"):
+    """The compiled form of text, from the LRU cache when it has been compiled recently"""
+    return CompiledExpression(text, mode)
+
+def evaluate(text, variables=None, **bindings):
+    """Parse (or fetch from the cache) and evaluate an expression in one go"""
+    return compile_expression(text)(variables, **bindings)
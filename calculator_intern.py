@@ -4,6 +4,8 @@
 # Prompt the user to input two numbers and an operation choice.
 # Perform the calculation and display the result.
 
+from calculator_engine import compile_expression
+
 def add(x, y):
     return x + y
 
@@ -19,24 +21,47 @@ def divide(x, y):
     else:
         return x / y
 
-print("Select operation:")
-print("1. Add")
-print("2. Subtract")
-print("3. Multiply")
-print("4. Divide")
-
-choice = input("Enter choice (1/2/3/4): ")
-
-num1 = float(input("Enter first number: "))
-num2 = float(input("Enter second number: "))
-
-if choice == '1':
-    print(num1, "+", num2, "=", add(num1, num2))
-elif choice == '2':
-    print(num1, "-", num2, "=", subtract(num1, num2))
-elif choice == '3':
-    print(num1, "*", num2, "=", multiply(num1, num2))
-elif choice == '4':
-    print(num1, "/", num2, "=", divide(num1, num2))
-else:
-    print("Invalid input")
\ No newline at end of file
+def calculate_expression():
+    """Option 5: a whole expression, like 2 * (x + 3) ^ 2, asking for any variables it uses"""
+    text = input("Enter expression: ")
+    try:
+        expression = compile_expression(text)
+        values = {name: float(input(f"Enter {name}: ")) for name in expression.variables}
+        print(text, "=", expression(values))
+    except ZeroDivisionError:
+        print("Error! Division by zero.")
+    except (ValueError, ArithmeticError) as error:
+        print("Error!", error)
+
+def main():
+    print("Select operation:")
+    print("1. Add")
+    print("2. Subtract")
+    print("3. Multiply")
+    print("4. Divide")
+    print("5. Expression")
+
+    choice = input("Enter choice (1/2/3/4/5): ")
+
+    if choice == '5':
+        calculate_expression()
+        return
+
+    num1 = float(input("Enter first number: "))
+    num2 = float(input("Enter second number: "))
+
+    if choice == '1':
+        print(num1, "+", num2, "=", add(num1, num2))
+    elif choice == '2':
+        print(num1, "-", num2, "=", subtract(num1, num2))
+    elif choice == '3':
+        print(num1, "*", num2, "=", multiply(num1, num2))
+    elif choice == '4':
+        print(num1, "/", num2, "=", divide(num1, num2))
+    else:
+        print("Invalid input")
+
+# Only run the interactive calculator when this file is run directly,
+# so the functions above can be imported
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Diceware-style passphrases: several words picked uniformly at random from a wordlist.
+#
+# The wordlist file is memory-mapped and indexed once into two arrays of word start
+# and end offsets, instead of being turned into one str object per word. That keeps
+# loading fast and memory small even for lists of 100k+ words. Both plain lists (one
+# word per line) and diceware lists ("11111<TAB>abacus") work.
+
+import mmap
+import os
+import re
+import secrets
+from array import array
+from math import log2
+
+# An optional dice roll column, then the word
+WORDLIST_LINE = re.compile(rb"^[ \t]*(?:[1-6]{4,6}[ \t]+)?(\S+)", re.MULTILINE)
+
+class WordList:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.close()
+            raise ValueError(f"{path} is empty")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.starts = array("Q")
+        self.ends = array("Q")
+        for match in WORDLIST_LINE.finditer(self.data):
+            self.starts.append(match.start(1))
+            self.ends.append(match.end(1))
+        if len(self.starts) < 2:
+            self.close()
+            raise ValueError(f"{path} needs at least two words")
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        return self.data[self.starts[index]:self.ends[index]].decode("utf-8")
+
+    def bits_per_word(self):
+        # Assumes the words are distinct, as in published diceware lists
+        return log2(len(self))
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def load_wordlist(path=None):
+    """The wordlist at path or $PASSPHRASE_WORDLIST"""
+    path = path or os.environ.get("PASSPHRASE_WORDLIST")
+    if not path:
+        raise ValueError("no wordlist given: pass one or set PASSPHRASE_WORDLIST")
+    return WordList(path)
+
+def check_word_count(word_count):
+    if word_count <= 0:
+        raise ValueError("a passphrase needs at least one word")
+
+def passphrase_entropy(words, word_count):
+    check_word_count(word_count)
+    return word_count * words.bits_per_word()
+
+def random_indexes(count, below):
+    """count uniform random integers in range(below), drawn from os.urandom in one go"""
+    # 32-bit draws at or above the largest multiple of `below` are rejected, as in password_bulk
+    limit = (1 << 32) - (1 << 32) % below
+    indexes = []
+    while len(indexes) < count:
+        wanted = count - len(indexes)
+        draws = array("I", os.urandom(4 * (wanted + wanted // 8 + 8)))
+        indexes.extend(value % below for value in draws if value < limit)
+    del indexes[count:]
+    return indexes
+
+def create_passphrase(words, word_count=6, separator=" "):
+    """One passphrase of word_count words chosen with the secrets module"""
+    return separator.join(words[secrets.randbelow(len(words))] for i in range(word_count))
+
+def generate_passphrases(words, count, word_count=6, separator=" ", batch_size=65536):
+    """Yield count passphrases, drawing the random word numbers a batch at a time"""
+    check_word_count(word_count)
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        indexes = random_indexes(size * word_count, len(words))
+        for offset in range(0, len(indexes), word_count):
+            yield separator.join([words[index] for index in indexes[offset:offset + word_count]])
@@ -0,0 +1,222 @@
+# Benchmarks for the password tools.
+# Run with: python password_benchmarks.py
+
+import hashlib
+import io
+import os
+import random
+import subprocess
+import sys
+import threading
+import tempfile
+import time
+
+from passphrase import WordList, generate_passphrases
+from password_blocklist import Blocklist, build_blocklist
+from password_bulk import characters_for, generate_passwords, generate_shards, write_passwords
+from password_pool import PoolClient, policy_key
+from password_policy import PasswordPolicy, uniformity_report
+from password_strength import analyze_password, audit_passwords
+from passwordgenertor import create_password
+
+def report(label, count, elapsed):
+    print(f"{label:<50} {count:>10,} passwords  {elapsed:8.3f} s  {count / elapsed:14,.0f}/s")
+
+def bulk_generation_benchmark(count=2000000):
+    """One core: the interactive create_password loop vs the batched bulk engine"""
+    print("Generation, one process:")
+    for choice, length in [("5", 16), ("4", 16), ("5", 32), ("3", 8)]:
+        characters = characters_for(choice)
+
+        few = count // 100
+        start = time.perf_counter()
+        for i in range(few):
+            create_password(length, characters)
+        report(f"create_password, choice {choice}, length {length}", few, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for password in generate_passwords(count, length, characters):
+            pass
+        report(f"generate_passwords (str), choice {choice}, length {length}", count, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        write_passwords(io.BytesIO(), count, length, characters)
+        report(f"write_passwords (bytes), choice {choice}, length {length}", count, time.perf_counter() - start)
+
+def scaling_benchmark(count=20000000, length=16):
+    """Sharded generation with 1, 2, 4, ... processes up to the number of cores"""
+    cores = os.cpu_count() or 1
+    process_counts = sorted({1, cores} | {2 ** power for power in range(cores.bit_length()) if 2 ** power <= cores})
+    print(f"Sharded generation to files, {cores} cores:")
+    single = None
+    for processes in process_counts:
+        with tempfile.TemporaryDirectory() as folder:
+            start = time.perf_counter()
+            generate_shards(folder, count, length, characters_for("5"), processes)
+            elapsed = time.perf_counter() - start
+        single = single or elapsed
+        report(f"{processes} processes (speedup {single / elapsed:4.2f}x)", count, elapsed)
+
+def audit_benchmark(count=5000000):
+    """Strength audit throughput over a file of mixed passwords"""
+    print("Strength analysis:")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "passwords.txt")
+        with open(path, "wb") as file:
+            for choice, length in [("1", 6), ("3", 8), ("4", 12), ("5", 16)]:
+                write_passwords(file, count // 4, length, characters_for(choice))
+
+        start = time.perf_counter()
+        with open(path, "rb") as file:
+            audit_passwords(file)
+        report("audit_passwords (file)", count, time.perf_counter() - start)
+
+        with open(path) as file:
+            sample = [line.rstrip("\n") for line, i in zip(file, range(count // 10))]
+        start = time.perf_counter()
+        for password in sample:
+            analyze_password(password)
+        report("analyze_password (one at a time)", len(sample), time.perf_counter() - start)
+
+def policy_benchmark(count=100000):
+    """Policy generation cost should not grow with strictness; also prints the uniformity checks"""
+    print("Policy generation:")
+    policies = {
+        "no requirements": PasswordPolicy(16),
+        "1 of each class": PasswordPolicy(16, 1, 1, 1, 1),
+        "4 of each, no ambiguous, max 1 repeat": PasswordPolicy(16, 4, 4, 4, 4, exclude_ambiguous=True, max_repeats=1),
+        "15 numbers of 16": PasswordPolicy(16, min_numbers=15),
+    }
+    for label, policy in policies.items():
+        start = time.perf_counter()
+        for password in policy.generate_many(count):
+            pass
+        report(label, count, time.perf_counter() - start)
+
+    print("Uniformity (p-values should not sit near 0):")
+    for label, policy in policies.items():
+        checks = uniformity_report(policy, count)
+        worst = min([*checks["characters_p"].values(), *checks["positions_p"].values()])
+        print(f"  {label:<48} violations {checks['violations']}   smallest p-value {worst:.3f}")
+
+def blocklist_benchmark(listed=2000000, lookups=300000):
+    """Build a blocklist from a hash dump, then time lookups through the mmap"""
+    print("Breached-password blocklist:")
+    with tempfile.TemporaryDirectory() as folder:
+        dump = os.path.join(folder, "dump.txt")
+        with open(dump, "w") as file:
+            for i in range(listed):
+                file.write(hashlib.sha1(f"leaked{i}".encode()).hexdigest().upper() + ":3\n")
+
+        path = os.path.join(folder, "breached.bin")
+        start = time.perf_counter()
+        with open(dump, "rb") as file:
+            build_blocklist(file, path)
+        print(f"{'build_blocklist':<50} {listed:>10,} hashes     {time.perf_counter() - start:8.3f} s")
+
+        with Blocklist(path) as blocklist:
+            for label, candidates in [("lookups, not listed", (f"fresh{i}" for i in range(lookups))),
+                                      ("lookups, listed", (f"leaked{i * 7}" for i in range(lookups)))]:
+                start = time.perf_counter()
+                for password in candidates:
+                    password in blocklist
+                elapsed = time.perf_counter() - start
+                report(label, lookups, elapsed)
+                print(f"{'':<50} {lookups / elapsed * 60:>10,.0f} per minute")
+
+def passphrase_benchmark(word_count=200000, count=200000):
+    """Wordlist load time and index size, then bulk passphrase generation"""
+    print("Passphrases:")
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "words.txt")
+        with open(path, "w") as file:
+            for i in range(word_count):
+                file.write("".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9))) + f"{i}\n")
+
+        start = time.perf_counter()
+        with WordList(path) as words:
+            elapsed = time.perf_counter() - start
+            index_bytes = words.starts.itemsize * len(words.starts) + words.ends.itemsize * len(words.ends)
+            print(f"{'WordList load':<50} {len(words):>10,} words      {elapsed:8.3f} s"
+                  f"  index {index_bytes / 1e6:.1f} MB")
+
+            start = time.perf_counter()
+            for phrase in generate_passphrases(words, count):
+                pass
+            report("generate_passphrases, 6 words", count, time.perf_counter() - start)
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+def wait_for_depth(client, policy, depth, timeout=30):
+    key = policy_key(policy)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        pool = client.stats().get(key)
+        if pool and pool["depth"] >= depth:
+            return
+        time.sleep(0.05)
+    raise RuntimeError(f"the pool for {key} did not reach {depth} passwords within {timeout} s")
+
+def pool_latency_benchmark(clients=(1, 4), high=10000):
+    """Issuance latency through password_pool.py: served from the pool vs generated inline per request.
+
+    Each run asks for a quarter of the pool, a burst the watermarks were sized for,
+    so it never drops below the low watermark and starts a refill mid-run."""
+    requests = high // 4
+    policies = {"default": None, "policy": {"length": 16, "min_numbers": 3, "min_special": 3, "max_repeats": 1}}
+    print("Password pool service, latency per GET:")
+    with tempfile.TemporaryDirectory() as folder:
+        for mode in ("pooled", "inline"):
+            socket_path = os.path.join(folder, f"{mode}.sock")
+            command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "password_pool.py"),
+                       "serve", "--socket", socket_path, "--low", str(high // 2), "--high", str(high)]
+            server = subprocess.Popen(command + (["--inline"] if mode == "inline" else []), stdout=subprocess.PIPE)
+            try:
+                server.stdout.readline()
+                control = PoolClient(socket_path)
+                for name, policy in policies.items():
+                    control.get(policy)
+                    if mode == "pooled":
+                        wait_for_depth(control, policy, high)  # the first fill, so it doesn't overlap a run
+                    for client_count in clients:
+                        latencies = []
+
+                        def client():
+                            connection = PoolClient(socket_path)
+                            for i in range(requests // client_count):
+                                start = time.perf_counter()
+                                connection.get(policy)
+                                latencies.append(time.perf_counter() - start)
+                            connection.close()
+
+                        threads = [threading.Thread(target=client) for i in range(client_count)]
+                        for thread in threads:
+                            thread.start()
+                        for thread in threads:
+                            thread.join()
+                        latencies.sort()
+                        print(f"  {mode:<7} {name:<8} {client_count} clients"
+                              f"   p50 {percentile(latencies, 0.5) * 1e6:8.1f} us"
+                              f"   p99 {percentile(latencies, 0.99) * 1e6:8.1f} us"
+                              f"   max {latencies[-1] * 1e6:9.1f} us")
+                control.close()
+            finally:
+                server.terminate()
+                server.wait()
+
+if __name__ == "__main__":
+    bulk_generation_benchmark()
+    print()
+    scaling_benchmark()
+    print()
+    audit_benchmark()
+    print()
+    policy_benchmark()
+    print()
+    blocklist_benchmark()
+    print()
+    passphrase_benchmark()
+    print()
+    pool_latency_benchmark()
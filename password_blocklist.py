@@ -0,0 +1,227 @@
+# Offline check against known-breached passwords.
+#
+# The blocklist is a binary file of sorted SHA-1 hashes (optionally cut down to a
+# prefix of each hash), built once from a text dump:
+#
+#   python password_blocklist.py build rockyou.txt breached.bin
+#   python password_blocklist.py build pwned-passwords-sha1.txt breached.bin --prefix-bytes 10
+#   python password_blocklist.py check breached.bin "hunter2"
+#
+# Lookups mmap the file, so it is never read into memory. The first two bytes of a
+# hash pick a bucket from the index stored in the header, and a binary search inside
+# the bucket finds the hash.
+#
+# File layout:
+#   magic b"PWBL", version, record size (uint32s), record count (uint64)
+#   65537 uint64 bucket offsets (in records): bucket b holds records [index[b], index[b+1])
+#   the sorted records
+
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from itertools import islice
+
+MAGIC = b"PWBL"
+VERSION = 1
+HEADER = struct.Struct("<4sIIQ")
+BUCKETS = 65536
+INDEX = struct.Struct(f"<{BUCKETS + 1}Q")
+DATA_START = HEADER.size + INDEX.size
+SHA1_HEX = re.compile(rb"^([0-9A-Fa-f]{40})(?::\d+)?\s*$")
+# Rejected candidates in a row before giving up: a tiny length or character set can make every one breached
+MAX_REJECTED = 1000
+
+class Records:
+    """The sorted records of a mapped file as a read-only sequence, for bisect"""
+    def __init__(self, data, record_size):
+        self.data = data
+        self.record_size = record_size
+
+    def __len__(self):
+        return (len(self.data) - DATA_START) // self.record_size
+
+    def __getitem__(self, index):
+        start = DATA_START + index * self.record_size
+        return self.data[start:start + self.record_size]
+
+class Blocklist:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            # Shorter files can't hold the header and index, and mmap refuses empty ones
+            if os.fstat(self.file.fileno()).st_size < DATA_START:
+                raise ValueError(f"{path} is too short to be a blocklist built by password_blocklist.py")
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.file.close()
+            raise
+        magic, version, self.record_size, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION or not self.record_size:
+            self.close()
+            raise ValueError(f"{path} is not a blocklist built by password_blocklist.py")
+        self.records = Records(self.data, self.record_size)
+
+    def __len__(self):
+        return self.count
+
+    def contains_hash(self, digest):
+        """True if this SHA-1 digest (20 bytes) is on the list"""
+        key = digest[:self.record_size]
+        bucket = int.from_bytes(digest[:2], "big")
+        low, high = struct.unpack_from("<2Q", self.data, HEADER.size + bucket * 8)
+        position = bisect_left(self.records, key, low, high)
+        return position < high and self.records[position] == key
+
+    def __contains__(self, password):
+        return self.contains_hash(hashlib.sha1(password.encode("utf-8")).digest())
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def load_blocklist(path=None):
+    """The blocklist at path or $PASSWORD_BLOCKLIST, or None when neither is set"""
+    path = path or os.environ.get("PASSWORD_BLOCKLIST")
+    return Blocklist(path) if path else None
+
+def breached_line_numbers(file, blocklist):
+    """Yield the line numbers (1-based) of passwords in a binary file that are on the blocklist"""
+    contains_hash = blocklist.contains_hash
+    for line_number, line in enumerate(file, start=1):
+        password = line.rstrip(b"\r\n")
+        if password and contains_hash(hashlib.sha1(password).digest()):
+            yield line_number
+
+def unlisted_passwords(passwords, blocklist, max_rejected=MAX_REJECTED):
+    """passwords without the ones on the blocklist; ValueError after max_rejected rejections in a row"""
+    rejected = 0
+    for password in passwords:
+        if password in blocklist:
+            rejected += 1
+            if rejected >= max_rejected:
+                raise ValueError("blocklist rejects every candidate; increase length or character set")
+            continue
+        rejected = 0
+        yield password
+
+# Building
+
+def dump_hashes(file, dump_format="auto"):
+    """SHA-1 digests from a text dump: plain passwords, or hex hashes (HIBP "HASH:count" lines work too)"""
+    for line in file:
+        line = line.rstrip(b"\r\n")
+        if not line:
+            continue
+        match = SHA1_HEX.match(line) if dump_format != "passwords" else None
+        if match:
+            yield bytes.fromhex(match.group(1).decode("ascii"))
+        elif dump_format == "hashes":
+            print(f"Skipping a line that is not a SHA-1 hash: {line[:60]!r}", file=sys.stderr)
+        else:
+            yield hashlib.sha1(line).digest()
+
+def sorted_runs(records, folder, run_size):
+    """Sort records a run at a time into temporary files (an external sort's first half)"""
+    paths = []
+    while True:
+        run = sorted(set(islice(records, run_size)))
+        if not run:
+            return paths
+        path = os.path.join(folder, f"run-{len(paths):05d}")
+        with open(path, "wb") as file:
+            file.write(b"".join(run))
+        paths.append(path)
+
+def read_run(path, record_size):
+    with open(path, "rb") as file:
+        while True:
+            block = file.read(record_size * 65536)
+            if not block:
+                return
+            for start in range(0, len(block), record_size):
+                yield block[start:start + record_size]
+
+def build_blocklist(source, output, record_size=20, dump_format="auto", run_size=2000000):
+    """Build a blocklist file from a text dump (a binary file object); returns the number of unique records"""
+    if not 2 <= record_size <= 20:
+        raise ValueError("record size must be between 2 and 20 bytes")
+    index = [0] * (BUCKETS + 1)
+    count = 0
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as folder:
+        records = (digest[:record_size] for digest in dump_hashes(source, dump_format))
+        runs = sorted_runs(records, folder, run_size)
+
+        with open(output, "wb") as file:
+            file.write(b"\0" * DATA_START)
+            previous = None
+            pending = []
+            for record in heapq.merge(*(read_run(path, record_size) for path in runs)):
+                if record == previous:
+                    continue
+                previous = record
+                index[int.from_bytes(record[:2], "big") + 1] += 1
+                pending.append(record)
+                count += 1
+                if len(pending) >= 65536:
+                    file.write(b"".join(pending))
+                    pending = []
+            file.write(b"".join(pending))
+
+            # Bucket sizes -> offsets
+            for bucket in range(BUCKETS):
+                index[bucket + 1] += index[bucket]
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, VERSION, record_size, count))
+            file.write(INDEX.pack(*index))
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query an offline breached-password blocklist")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="index a text dump into a sorted binary blocklist")
+    build.add_argument("source", help="text dump: one password or SHA-1 hash per line, - for stdin")
+    build.add_argument("output", help="blocklist file to write")
+    build.add_argument("--format", choices=["auto", "passwords", "hashes"], default="auto",
+                       help="what the lines are (default: hashes if they look like SHA-1, else passwords)")
+    build.add_argument("--prefix-bytes", type=int, default=20,
+                       help="keep only this many bytes of each hash: smaller file, tiny false-positive rate")
+    build.add_argument("--run-size", type=int, default=2000000, help="hashes sorted in memory at a time")
+
+    check = commands.add_parser("check", help="check passwords (arguments, or one per line on stdin)")
+    check.add_argument("blocklist")
+    check.add_argument("passwords", nargs="*")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        start = time.perf_counter()
+        source = sys.stdin.buffer if args.source == "-" else open(args.source, "rb")
+        with source:
+            count = build_blocklist(source, args.output, args.prefix_bytes, args.format, args.run_size)
+        print(f"Indexed {count:,} unique hashes in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    else:
+        with Blocklist(args.blocklist) as blocklist:
+            passwords = args.passwords or (line.rstrip("\r\n") for line in sys.stdin)
+            breached = 0
+            for password in passwords:
+                found = password in blocklist
+                breached += found
+                print(f"{'BREACHED' if found else 'ok':<8} {password}")
+        sys.exit(1 if breached else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Bulk password generation for provisioning: many passwords at once, no prompts.
+#
+# Random bytes come from os.urandom in large blocks and are turned into characters
+# with bytes.translate, so the per-character work happens in C. Byte values that
+# would make some characters more likely than others are thrown away (rejection
+# sampling), which keeps every character exactly equally likely.
+
+import hashlib
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from passwordgenertor import get_characters_to_use
+
+# Passwords produced per block; big enough to amortise the Python overhead,
+# small enough that a block of long passwords still fits comfortably in memory
+DEFAULT_BATCH_SIZE = 65536
+
+@lru_cache(maxsize=None)
+def byte_mapping(characters):
+    """Translation table from random bytes to characters, the bytes to reject, and the share kept"""
+    try:
+        alphabet = characters.encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError("password characters must be ASCII") from None
+    if not alphabet:
+        raise ValueError("need at least one character to choose from")
+    if len(set(alphabet)) != len(alphabet):
+        raise ValueError("password characters must not repeat")
+
+    # Only the first `accepted` byte values are used, so every character gets the same
+    # number of them; e.g. with 70 characters, 0-209 map to characters and 210-255 are rejected
+    accepted = 256 - 256 % len(alphabet)
+    table = bytes(alphabet[value % len(alphabet)] for value in range(accepted)) + bytes(256 - accepted)
+    rejected = bytes(range(accepted, 256))
+    return table, rejected, accepted / 256
+
+def random_characters(count, characters, randbytes=os.urandom):
+    """Return count random characters (as ASCII bytes), each one equally likely"""
+    table, rejected, kept = byte_mapping(characters)
+    blocks = []
+    found = 0
+    while found < count:
+        # Ask for a little more than the expected need so one draw is almost always enough
+        wanted = count - found
+        block = randbytes(int(wanted / kept * 1.02) + 64).translate(table, rejected)
+        blocks.append(block)
+        found += len(block)
+    return b"".join(blocks)[:count]
+
+def batch_sizes(count, batch_size):
+    while count > 0:
+        size = min(count, batch_size)
+        yield size
+        count -= size
+
+def check_sizes(count, length):
+    if count < 0:
+        raise ValueError("the number of passwords can't be negative")
+    if length <= 0:
+        raise ValueError("password length must be greater than 0")
+
+def password_block(count, length, characters, randbytes=os.urandom):
+    """count passwords of the given length as one bytes block, one password per line"""
+    chars = random_characters(count * length, characters, randbytes)
+
+    # Start with all newlines, then fill column by column: `length` slice copies
+    # instead of a Python loop over every password
+    block = bytearray(b"\n") * (count * (length + 1))
+    for position in range(length):
+        block[position::length + 1] = chars[position::length]
+    return block
+
+def generate_passwords(count, length, characters, batch_size=DEFAULT_BATCH_SIZE, randbytes=os.urandom):
+    """Yield count passwords as strings, drawing random bytes a batch at a time"""
+    check_sizes(count, length)
+    for size in batch_sizes(count, batch_size):
+        chars = random_characters(size * length, characters, randbytes).decode("ascii")
+        for start in range(0, len(chars), length):
+            yield chars[start:start + length]
+
+def write_passwords(file, count, length, characters, batch_size=DEFAULT_BATCH_SIZE, randbytes=os.urandom,
+                    progress=None):
+    """Stream count passwords to a binary file, one per line, without holding them all"""
+    check_sizes(count, length)
+    written = 0
+    for size in batch_sizes(count, batch_size):
+        file.write(password_block(size, length, characters, randbytes))
+        written += size
+        if progress:
+            progress(written)
+    return written
+
+def characters_for(choice=None, characters=None):
+    """The alphabet from a menu choice ("1"-"5", as in passwordgenertor) or a custom string"""
+    if characters:
+        return characters
+    alphabet = get_characters_to_use(choice)
+    if alphabet is None:
+        raise ValueError("choice must be one of 1, 2, 3, 4 or 5")
+    return alphabet
+
+# Sharded generation: one output file per worker process, plus a manifest.json
+# describing them, so nothing has to be merged afterwards.
+
+class HashingWriter:
+    """File wrapper that keeps a SHA-256 of everything written, for the manifest"""
+    def __init__(self, file):
+        self.file = file
+        self.digest = hashlib.sha256()
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.file.write(data)
+
+def shard_counts(count, shards):
+    """Split count passwords as evenly as possible over shards files"""
+    share, extra = divmod(count, shards)
+    return [share + (1 if index < extra else 0) for index in range(shards)]
+
+def seeded_randbytes(seed, shard):
+    # Reproducible, NOT secret: only for tests that need the same output every run
+    return random.Random(f"{seed}:{shard}").randbytes
+
+def write_shard(path, shard, count, length, characters, batch_size=DEFAULT_BATCH_SIZE, seed=None):
+    """Write one shard file; runs inside a worker process, each with its own os.urandom stream"""
+    randbytes = os.urandom if seed is None else seeded_randbytes(seed, shard)
+    with open(path, "wb") as file:
+        writer = HashingWriter(file)
+        write_passwords(writer, count, length, characters, batch_size, randbytes)
+    return {"file": os.path.basename(path), "count": count, "sha256": writer.digest.hexdigest()}
+
+def generate_shards(folder, count, length, characters, processes=None, shards=None, batch_size=DEFAULT_BATCH_SIZE,
+                    seed=None):
+    """Generate count passwords into shard files in folder with a process pool; returns the manifest"""
+    check_sizes(count, length)
+    byte_mapping(characters)  # check the alphabet before starting any workers
+    processes = processes or os.cpu_count() or 1
+    shards = shards or processes
+    os.makedirs(folder, exist_ok=True)
+
+    paths = [os.path.join(folder, f"passwords-{shard:05d}.txt") for shard in range(shards)]
+    with ProcessPoolExecutor(processes) as pool:
+        futures = [
+            pool.submit(write_shard, path, shard, shard_count, length, characters, batch_size, seed)
+            for shard, (path, shard_count) in enumerate(zip(paths, shard_counts(count, shards)))
+        ]
+        shard_info = [future.result() for future in futures]
+
+    manifest = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "count": count,
+        "length": length,
+        "characters": characters,
+        "seeded": seed is not None,
+        "shards": shard_info,
+    }
+    with open(os.path.join(folder, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
@@ -0,0 +1,226 @@
+# Non-interactive password tools, for scripts and bulk provisioning.
+#
+#   python password_cli.py generate --count 1000000 --length 16 --output passwords.txt
+#   python password_cli.py generate -n 10 -l 20 --choice 4
+#   python password_cli.py generate -n 5 --characters "abcdef0123456789"
+#   python password_cli.py generate -n 50000000 --output-dir rotation/ --processes 8
+#   python password_cli.py generate -n 1000 --min-numbers 2 --min-special 2 --no-ambiguous --max-repeats 2
+#   python password_cli.py audit existing.txt --min-bits 60 --weak-lines weak.txt
+#   python password_cli.py generate -n 1000 --blocklist breached.bin   (see password_blocklist.py)
+#   python password_cli.py passphrase --wordlist eff_large_wordlist.txt -n 5 --words 6
+
+import argparse
+import json
+import sys
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+from password_blocklist import breached_line_numbers, load_blocklist, unlisted_passwords
+from passphrase import generate_passphrases, load_wordlist, passphrase_entropy
+from password_bulk import DEFAULT_BATCH_SIZE, characters_for, generate_passwords, generate_shards, write_passwords
+from password_policy import PasswordPolicy
+from password_strength import SCORE_THRESHOLDS, audit_passwords, weak_line_numbers
+from passwordgenertor import show_password_info
+
+def report_progress(action, count, start, done=False):
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    end = "\n" if done else "\r"
+    print(f"{action} {count:,} passwords  ({count / elapsed:,.0f}/s)", end=end, file=sys.stderr, flush=True)
+
+def open_input(path):
+    # stdin is wrapped so the caller's "with" block doesn't close it
+    if path == "-":
+        return nullcontext(sys.stdin.buffer)
+    return open(path, "rb")
+
+def open_output(path):
+    if path == "-":
+        return sys.stdout.buffer
+    return open(path, "wb")
+
+POLICY_OPTIONS = ("min_lowercase", "min_uppercase", "min_numbers", "min_special", "no_ambiguous", "exclude",
+                  "max_repeats")
+
+def generate(args):
+    characters = characters_for(args.choice, args.characters)
+    if args.blocklist or any(getattr(args, option) for option in POLICY_OPTIONS):
+        generate_checked(args, characters)
+        return
+    if args.output_dir:
+        generate_sharded(args, characters)
+        return
+    if args.seed is not None:
+        raise ValueError("--seed only works together with --output-dir")
+    start = time.perf_counter()
+    quiet = args.output == "-"
+    progress = None if quiet else (lambda written: report_progress("Generated", written, start))
+
+    output = open_output(args.output)
+    try:
+        written = write_passwords(output, args.count, args.length, characters, args.batch_size, progress=progress)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        else:
+            output.flush()
+    if not quiet:
+        report_progress("Generated", written, start, done=True)
+
+def endless_passwords(length, characters, batch_size):
+    while True:
+        yield from generate_passwords(batch_size, length, characters)
+
+def generate_checked(args, characters):
+    # One password at a time: built to a policy and/or skipped when on the blocklist
+    if args.output_dir or args.seed is not None:
+        raise ValueError("policy and blocklist options can't be combined with --output-dir or --seed")
+    if any(getattr(args, option) for option in POLICY_OPTIONS):
+        policy = PasswordPolicy(args.length, args.min_lowercase, args.min_uppercase, args.min_numbers,
+                                args.min_special, args.no_ambiguous, args.exclude, args.max_repeats, characters)
+        passwords = iter(policy.generate, None)
+    else:
+        passwords = endless_passwords(args.length, characters, args.batch_size)
+
+    blocklist = load_blocklist(args.blocklist)
+    if blocklist:
+        passwords = unlisted_passwords(passwords, blocklist)
+
+    output = open_output(args.output)
+    try:
+        for start in range(0, args.count, args.batch_size):
+            batch = islice(passwords, min(args.batch_size, args.count - start))
+            output.write("".join(password + "\n" for password in batch).encode("ascii"))
+    finally:
+        if blocklist:
+            blocklist.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+        else:
+            output.flush()
+
+def generate_sharded(args, characters):
+    if args.seed is not None:
+        print("Warning: --seed makes the passwords reproducible; use it for tests only", file=sys.stderr)
+    start = time.perf_counter()
+    manifest = generate_shards(args.output_dir, args.count, args.length, characters, args.processes, args.shards,
+                               args.batch_size, args.seed)
+    report_progress("Generated", manifest["count"], start, done=True)
+    print(f"Wrote {len(manifest['shards'])} shards and manifest.json to {args.output_dir}", file=sys.stderr)
+
+def audit(args):
+    if args.path == "-" and (args.weak_lines or args.blocklist):
+        raise ValueError("--weak-lines and --blocklist read the file again, so they need a file, not stdin")
+    start = time.perf_counter()
+    with open_input(args.path) as file:
+        summary = audit_passwords(file, args.min_bits)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(json.dumps(summary, indent=2))
+    print(f"Audited {summary['passwords']:,} passwords  ({summary['passwords'] / elapsed:,.0f}/s)", file=sys.stderr)
+
+    if args.weak_lines:
+        # A second pass, only when asked: line numbers, never the passwords themselves
+        with open_input(args.path) as file, open(args.weak_lines, "w", encoding="utf-8") as output:
+            for line_number in weak_line_numbers(file, args.min_bits):
+                output.write(f"{line_number}\n")
+
+    if args.blocklist:
+        with open_input(args.path) as file, load_blocklist(args.blocklist) as blocklist:
+            breached = list(breached_line_numbers(file, blocklist))
+        print(f"{len(breached):,} passwords are on the blocklist", file=sys.stderr)
+        if args.breached_lines:
+            with open(args.breached_lines, "w", encoding="utf-8") as output:
+                output.writelines(f"{line_number}\n" for line_number in breached)
+
+def endless_passphrases(words, word_count, separator):
+    while True:
+        yield from generate_passphrases(words, DEFAULT_BATCH_SIZE, word_count, separator)
+
+def passphrase(args):
+    with load_wordlist(args.wordlist) as words:
+        bits = passphrase_entropy(words, args.words)
+        print(f"{args.words} words from {len(words):,}: {bits:.1f} bits of entropy each", file=sys.stderr)
+        blocklist = load_blocklist(args.blocklist)
+        try:
+            if blocklist:
+                # Skipped ones are replaced, so there are still args.count of them
+                candidates = endless_passphrases(words, args.words, args.separator)
+                passphrases = islice(unlisted_passwords(candidates, blocklist), args.count)
+            else:
+                passphrases = generate_passphrases(words, args.count, args.words, args.separator)
+            if args.show:
+                for phrase in passphrases:
+                    show_password_info(phrase, blocklist, bits)
+                return
+            write_passphrases(passphrases, args)
+        finally:
+            if blocklist:
+                blocklist.close()
+
+def write_passphrases(passphrases, args):
+    output = open_output(args.output)
+    try:
+        for start in range(0, args.count, DEFAULT_BATCH_SIZE):
+            batch = islice(passphrases, DEFAULT_BATCH_SIZE)
+            output.write("".join(phrase + "\n" for phrase in batch).encode("utf-8"))
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        else:
+            output.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate passwords without the interactive prompts")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="write many random passwords, one per line")
+    generate_parser.add_argument("-n", "--count", type=int, default=1, help="how many passwords (default: 1)")
+    generate_parser.add_argument("-l", "--length", type=int, default=16, help="characters per password (default: 16)")
+    generate_parser.add_argument("--choice", choices=["1", "2", "3", "4", "5"], default="5",
+                                 help="character set, numbered as in the interactive menu (default: 5, everything)")
+    generate_parser.add_argument("--characters", help="use exactly these characters instead of --choice")
+    generate_parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    generate_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                                 help="passwords per random block")
+    generate_parser.add_argument("--output-dir", help="write shard files and a manifest.json here instead")
+    generate_parser.add_argument("--processes", type=int, help="worker processes for --output-dir (default: all cores)")
+    generate_parser.add_argument("--shards", type=int, help="number of shard files (default: one per process)")
+    generate_parser.add_argument("--seed", help="reproducible output for tests; never for real credentials")
+    policy = generate_parser.add_argument_group("policy", "guarantee what every password contains")
+    for name in ("lowercase", "uppercase", "numbers", "special"):
+        policy.add_argument(f"--min-{name}", type=int, default=0, help=f"at least this many {name} characters")
+    policy.add_argument("--no-ambiguous", action="store_true", help="leave out look-alikes such as I, l, 1, O and 0")
+    policy.add_argument("--exclude", default="", help="characters never to use")
+    policy.add_argument("--max-repeats", type=int, help="most times a character may repeat in a row")
+    generate_parser.add_argument("--blocklist", help="skip passwords found in this breached-password blocklist")
+    generate_parser.set_defaults(run=generate)
+
+    audit_parser = commands.add_parser("audit", help="score every password in a file, one per line")
+    audit_parser.add_argument("path", help="password file, or - for stdin")
+    audit_parser.add_argument("--min-bits", type=float, default=SCORE_THRESHOLDS[2],
+                              help=f"entropy below this counts as too weak (default: {SCORE_THRESHOLDS[2]})")
+    audit_parser.add_argument("--weak-lines", help="also write the line numbers of too-weak passwords here")
+    audit_parser.add_argument("--blocklist", help="also count passwords found in this breached-password blocklist")
+    audit_parser.add_argument("--breached-lines", help="with --blocklist, write the breached line numbers here")
+    audit_parser.set_defaults(run=audit)
+
+    passphrase_parser = commands.add_parser("passphrase", help="diceware-style passphrases from a wordlist")
+    passphrase_parser.add_argument("--wordlist", help="one word per line, or a diceware list "
+                                                      "(default: $PASSPHRASE_WORDLIST)")
+    passphrase_parser.add_argument("-n", "--count", type=int, default=1, help="how many passphrases (default: 1)")
+    passphrase_parser.add_argument("-w", "--words", type=int, default=6, help="words per passphrase (default: 6)")
+    passphrase_parser.add_argument("--separator", default=" ", help="between words (default: a space)")
+    passphrase_parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    passphrase_parser.add_argument("--show", action="store_true",
+                                   help="print each one with the interactive generator's strength report")
+    passphrase_parser.add_argument("--blocklist", help="leave out passphrases on a breached-password blocklist")
+    passphrase_parser.set_defaults(run=passphrase)
+
+    args = parser.parse_args(argv)
+    try:
+        args.run(args)
+    except ValueError as error:
+        parser.error(str(error))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# Passwords that satisfy a policy by construction, without generate-and-test loops.
+#
+# A password is built in two steps:
+#   1. Lay out one slot per required character (e.g. 2 numbers, 1 special) plus
+#      free slots for the rest, and shuffle the slots with Fisher-Yates.
+#   2. Fill each slot with a random character from its class (free slots draw from
+#      the whole alphabet), never extending a run past max_repeats.
+# Shuffling the slots and then filling them gives the same result as placing the
+# required characters first and shuffling the finished password. Each password
+# costs the same fixed amount of work however strict the policy is.
+
+import secrets
+from math import erfc, sqrt
+
+from passwordgenertor import lowercase_letters, numbers, special_characters, uppercase_letters
+
+AMBIGUOUS_CHARACTERS = "Il1|O0o"
+CLASS_ORDER = ("lowercase", "uppercase", "numbers", "special")
+
+class PasswordPolicy:
+    def __init__(self, length=16, min_lowercase=0, min_uppercase=0, min_numbers=0, min_special=0,
+                 exclude_ambiguous=False, exclude="", max_repeats=None, characters=None):
+        """Describe what a password must look like; raises ValueError if no password can satisfy it"""
+        if length <= 0:
+            raise ValueError("password length must be greater than 0")
+        if max_repeats is not None and max_repeats < 1:
+            raise ValueError("max_repeats must be at least 1")
+
+        excluded = set(exclude) | (set(AMBIGUOUS_CHARACTERS) if exclude_ambiguous else set())
+        alphabet = characters or lowercase_letters + uppercase_letters + numbers + special_characters
+        self.characters = "".join(dict.fromkeys(char for char in alphabet if char not in excluded))
+        if not self.characters:
+            raise ValueError("every character has been excluded")
+
+        # With a custom alphabet, anything that isn't a letter or digit counts as special
+        self.class_characters = {
+            "lowercase": "".join(char for char in self.characters if char in lowercase_letters),
+            "uppercase": "".join(char for char in self.characters if char in uppercase_letters),
+            "numbers": "".join(char for char in self.characters if char in numbers),
+        }
+        self.class_characters["special"] = "".join(
+            char for char in self.characters
+            if not any(char in chosen for chosen in self.class_characters.values())
+        )
+        self.minimums = dict(zip(CLASS_ORDER, (min_lowercase, min_uppercase, min_numbers, min_special)))
+        self.length = length
+        self.max_repeats = max_repeats
+
+        if sum(self.minimums.values()) > length:
+            raise ValueError(f"the minimum counts add up to more than the length ({length})")
+        for name, minimum in self.minimums.items():
+            if minimum and not self.class_characters[name]:
+                raise ValueError(f"needs {minimum} {name} characters but none are left in the alphabet")
+        if max_repeats is not None:
+            if len(self.characters) < 2:
+                raise ValueError("max_repeats needs at least 2 characters to alternate between")
+            # A required slot must break a run of its class's character itself; free
+            # slots can pick that same character, so one required slot is already enough
+            for name, minimum in self.minimums.items():
+                if minimum and len(self.class_characters[name]) < 2:
+                    raise ValueError(f"max_repeats needs at least 2 {name} characters to choose from")
+
+        # The slot template: one label per required character, None for free slots
+        self.slots = [name for name in CLASS_ORDER for i in range(self.minimums[name])]
+        self.slots += [None] * (length - len(self.slots))
+        self.slot_characters = {None: self.characters, **self.class_characters}
+        self.positions = {
+            label: {char: index for index, char in enumerate(chars)} for label, chars in self.slot_characters.items()
+        }
+
+    def generate(self):
+        """One password that meets the policy"""
+        slots = self.slots[:]
+        # Fisher-Yates: every arrangement of the slots is equally likely
+        for index in range(len(slots) - 1, 0, -1):
+            other = secrets.randbelow(index + 1)
+            slots[index], slots[other] = slots[other], slots[index]
+
+        password = []
+        run_char = None
+        run_length = 0
+        for label in slots:
+            chars = self.slot_characters[label]
+            if self.max_repeats is not None and run_length >= self.max_repeats and run_char in self.positions[label]:
+                # Pick uniformly among the other characters of the slot's class
+                pick = secrets.randbelow(len(chars) - 1)
+                if pick >= self.positions[label][run_char]:
+                    pick += 1
+                char = chars[pick]
+            else:
+                char = chars[secrets.randbelow(len(chars))]
+
+            if char == run_char:
+                run_length += 1
+            else:
+                run_char = char
+                run_length = 1
+            password.append(char)
+        return "".join(password)
+
+    def generate_many(self, count):
+        for i in range(count):
+            yield self.generate()
+
+    def violations(self, password):
+        """Why password breaks the policy (empty list if it doesn't)"""
+        problems = []
+        if len(password) != self.length:
+            problems.append(f"length {len(password)} instead of {self.length}")
+        for name, minimum in self.minimums.items():
+            found = sum(1 for char in password if char in self.positions[name])
+            if found < minimum:
+                problems.append(f"{found} {name} characters, needs {minimum}")
+        if any(char not in self.positions[None] for char in password):
+            problems.append("uses characters outside the alphabet")
+        if self.max_repeats is not None:
+            run = 1
+            for previous, char in zip(password, password[1:]):
+                run = run + 1 if char == previous else 1
+                if run > self.max_repeats:
+                    problems.append(f"repeats {char!r} more than {self.max_repeats} times in a row")
+                    break
+        return problems
+
+def chi_square_p_value(counts):
+    """p-value for 'counts are draws from a uniform distribution' (Wilson-Hilferty approximation)"""
+    total = sum(counts)
+    if len(counts) < 2 or not total:
+        return 1.0
+    expected = total / len(counts)
+    statistic = sum((count - expected) ** 2 for count in counts) / expected
+    freedom = len(counts) - 1
+    z = ((statistic / freedom) ** (1 / 3) - (1 - 2 / (9 * freedom))) / sqrt(2 / (9 * freedom))
+    return 0.5 * erfc(z / sqrt(2))
+
+def uniformity_report(policy, samples=100000):
+    """Generate samples passwords and check them statistically.
+
+    A policy violation is a bug. A p-value near 0 means that some position or
+    character comes up more often than chance allows. Within each class, every
+    character should be equally likely. Thanks to the shuffle, every class should
+    also turn up equally often at each position."""
+    char_counts = {char: 0 for char in policy.characters}
+    class_at_position = {name: [0] * policy.length for name in CLASS_ORDER}
+    class_of = {char: name for name in CLASS_ORDER for char in policy.class_characters[name]}
+    violations = 0
+    for password in policy.generate_many(samples):
+        if policy.violations(password):
+            violations += 1
+        for position, char in enumerate(password):
+            char_counts[char] += 1
+            class_at_position[class_of[char]][position] += 1
+
+    report = {"samples": samples, "violations": violations, "characters_p": {}, "positions_p": {}}
+    for name in CLASS_ORDER:
+        chars = policy.class_characters[name]
+        if len(chars) > 1:
+            report["characters_p"][name] = chi_square_p_value([char_counts[char] for char in chars])
+        if sum(class_at_position[name]):
+            report["positions_p"][name] = chi_square_p_value(class_at_position[name])
+    return report
@@ -0,0 +1,421 @@
+# Password pool service: passwords are generated ahead of time, so handing one out
+# costs a deque pop and a socket write instead of a full generation.
+#
+#   python password_pool.py serve --socket /tmp/passwords.sock
+#   python password_pool.py get --socket /tmp/passwords.sock -n 3
+#   python password_pool.py get --socket /tmp/passwords.sock --policy '{"length": 20, "min_special": 2}'
+#   python password_pool.py stats --socket /tmp/passwords.sock
+#
+# Protocol: one command per line on a local (Unix or 127.0.0.1 TCP) socket.
+#   GET [policy JSON]   ->  the password, or "ERROR <message>"
+#   STATS               ->  one line of JSON with every pool's depth and refill counters
+# A policy is the keyword arguments of PasswordPolicy plus "choice" (1-5, as in the
+# interactive menu); each distinct policy gets its own pool.
+#
+# Every password sits in a bytearray and is overwritten with zeros as soon as it has
+# been sent. Python may still have made copies elsewhere (e.g. a PasswordPolicy str),
+# so this limits exposure rather than guaranteeing it.
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+from password_bulk import characters_for, password_block
+from password_policy import PasswordPolicy
+from passwordgenertor import create_password
+
+DEFAULT_SOCKET = "/tmp/password-pool.sock"
+# Policy field -> the JSON types it accepts (None: null is allowed)
+POLICY_FIELDS = {
+    "min_lowercase": (int,),
+    "min_uppercase": (int,),
+    "min_numbers": (int,),
+    "min_special": (int,),
+    "exclude_ambiguous": (bool,),
+    "exclude": (str,),
+    "max_repeats": (int, None),
+}
+MAX_POOLS = 32
+# Request texts remembered per pool, so a repeated policy skips JSON parsing
+MAX_ALIASES = 8 * MAX_POOLS
+
+def wipe(password):
+    password[:] = bytes(len(password))
+
+def plain_batch(length, characters):
+    """make_batch for a plain length + alphabet: one bulk block, sliced into per-password views"""
+    def make_batch(count):
+        view = memoryview(password_block(count, length, characters))
+        # Each view includes its newline, so it can be sent as it is
+        return [view[start:start + length + 1] for start in range(0, len(view), length + 1)]
+    return make_batch
+
+def policy_batch(policy):
+    def make_batch(count):
+        return [bytearray(policy.generate().encode("utf-8") + b"\n") for i in range(count)]
+    return make_batch
+
+def inline_batch(length, characters):
+    # No pool at all: what every caller paid before, one create_password per request
+    def make_batch(count):
+        return [bytearray(create_password(length, characters).encode("utf-8") + b"\n") for i in range(count)]
+    return make_batch
+
+class PasswordPool:
+    """Ready passwords for one policy, topped up to `high` whenever they fall below `low`"""
+    def __init__(self, make_batch, low=1000, high=10000, batch_size=1024):
+        if not 0 <= low <= high:
+            raise ValueError("watermarks must satisfy 0 <= low <= high")
+        self.make_batch = make_batch
+        self.low = low
+        self.high = high
+        self.batch_size = batch_size
+        self.ready = deque()
+        self.lock = threading.Lock()
+        self.issued = 0
+        self.empty = 0
+        self.generated = 0
+        self.refills = 0
+        self.refill_seconds = 0.0
+        self.closed = False
+
+    def take(self):
+        """The next password (a bytearray or memoryview ending in a newline); wipe() it when done"""
+        try:
+            password = self.ready.popleft()
+        except IndexError:
+            password = self.make_batch(1)[0]
+            with self.lock:
+                self.empty += 1
+        with self.lock:
+            self.issued += 1
+        return password
+
+    def needs_refill(self):
+        return len(self.ready) < self.low
+
+    def refill(self):
+        # Generates outside any lock in batch_size steps, so take() never waits on it
+        start = time.perf_counter()
+        added = 0
+        while not self.closed and len(self.ready) < self.high:
+            batch = self.make_batch(min(self.batch_size, self.high - len(self.ready)))
+            self.ready.extend(batch)
+            added += len(batch)
+            time.sleep(0)  # let waiting request threads have the GIL between batches
+        if self.closed:
+            self.discard()  # evicted while refilling
+        with self.lock:
+            self.generated += added
+            self.refills += 1
+            self.refill_seconds += time.perf_counter() - start
+
+    def discard(self):
+        self.closed = True
+        while self.ready:
+            wipe(self.ready.popleft())
+
+    def stats(self):
+        with self.lock:
+            return {
+                "depth": len(self.ready),
+                "low": self.low,
+                "high": self.high,
+                "issued": self.issued,
+                "served_while_empty": self.empty,
+                "generated": self.generated,
+                "refills": self.refills,
+                "refill_seconds": round(self.refill_seconds, 4),
+            }
+
+def policy_key(spec):
+    """The key of a policy's pool, as in STATS: the same policy however it is spelled"""
+    return json.dumps(spec or {}, sort_keys=True)
+
+def check_type(name, value, types):
+    # bool is an int in Python, but true is not a number in a policy
+    if value is None and None in types:
+        return
+    if isinstance(value, bool) and bool not in types or not isinstance(value, tuple(t for t in types if t)):
+        names = " or ".join("null" if t is None else {int: "a whole number", bool: "true/false", str: "a string"}[t]
+                            for t in types)
+        raise ValueError(f"{name} must be {names}")
+
+def parse_policy(text):
+    """The policy dict of a GET request, with every field checked; raises ValueError"""
+    try:
+        spec = json.loads(text)
+    except (json.JSONDecodeError, UnicodeDecodeError) as error:
+        raise ValueError(f"policy is not valid JSON: {error}") from None
+    if not isinstance(spec, dict):
+        raise ValueError("policy must be a JSON object")
+    unknown = set(spec) - set(POLICY_FIELDS) - {"length", "choice", "characters"}
+    if unknown:
+        raise ValueError(f"unknown policy fields: {', '.join(sorted(unknown))}")
+    check_type("length", spec.get("length", 16), (int,))
+    if spec.get("length", 16) <= 0:
+        raise ValueError("length must be a positive whole number")
+    check_type("choice", spec.get("choice", "5"), (str, int))
+    check_type("characters", spec.get("characters"), (str, None))
+    for name, types in POLICY_FIELDS.items():
+        if name in spec:
+            check_type(name, spec[name], types)
+            if types[0] is int and spec[name] is not None and spec[name] < 0:
+                raise ValueError(f"{name} can't be negative")
+    return spec
+
+class PoolService:
+    """One PasswordPool per policy, and the background thread that keeps them filled.
+
+    At most MAX_POOLS pools are kept; asking for a new policy beyond that discards
+    the pool that was used least recently."""
+    def __init__(self, low=1000, high=10000, batch_size=1024, inline=False):
+        self.low = low
+        self.high = high
+        self.batch_size = batch_size
+        self.inline = inline
+        # Both least recently used first: policy key -> pool, request text -> policy key
+        self.pools = OrderedDict()
+        self.aliases = OrderedDict()
+        self.pools_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.refiller = threading.Thread(target=self.keep_filled, daemon=True)
+        self.refiller.start()
+
+    def pool_for(self, policy_text=b""):
+        text = policy_text.strip() or b"{}"
+        with self.pools_lock:
+            key = self.aliases.get(text)
+            pool = self.pools.get(key) if key is not None else None
+            if pool is not None:
+                self.aliases.move_to_end(text)
+                self.pools.move_to_end(key)
+        if pool is None:
+            pool = self.create_pool(text)
+        if pool.needs_refill():
+            self.wake.set()
+        return pool
+
+    def create_pool(self, text):
+        spec = parse_policy(text)
+        key = policy_key(spec)
+        with self.pools_lock:
+            pool = self.pools.get(key)
+        if pool is None:
+            pool = self.build_pool(dict(spec))
+
+        with self.pools_lock:
+            if key in self.pools:
+                pool = self.pools[key]  # another connection got there first
+            else:
+                while len(self.pools) >= MAX_POOLS:
+                    evicted_key, evicted = self.pools.popitem(last=False)
+                    evicted.discard()
+                self.pools[key] = pool
+            self.pools.move_to_end(key)
+            self.aliases[text] = key
+            self.aliases.move_to_end(text)
+            while len(self.aliases) > MAX_ALIASES:
+                self.aliases.popitem(last=False)
+        return pool
+
+    def build_pool(self, spec):
+        length = spec.pop("length", 16)
+        characters = characters_for(str(spec.pop("choice", "5")), spec.pop("characters", None))
+        batch_size = self.batch_size
+        if spec:
+            make_batch = policy_batch(PasswordPolicy(length, characters=characters, **spec))
+            # Built one at a time in Python: smaller batches keep the refill from hogging the GIL
+            batch_size = max(1, batch_size // 16)
+        elif self.inline:
+            make_batch = inline_batch(length, characters)
+        else:
+            make_batch = plain_batch(length, characters)
+        wipe(make_batch(1)[0])  # fail here, not in the refill thread, if the policy can't be met
+
+        low, high = (0, 0) if self.inline else (self.low, self.high)
+        return PasswordPool(make_batch, low, high, batch_size)
+
+    def keep_filled(self):
+        while not self.stopping:
+            self.wake.wait(0.1)
+            self.wake.clear()
+            with self.pools_lock:
+                pools = list(self.pools.items())
+            for key, pool in pools:
+                if pool.needs_refill():
+                    try:
+                        pool.refill()
+                    except Exception as error:
+                        # One broken policy must not stop the refills of every other pool;
+                        # the next request for it builds (and checks) a new pool
+                        print(f"Refilling the pool for {key} failed, dropping it: {error!r}", file=sys.stderr)
+                        self.evict(key, pool)
+
+    def evict(self, key, pool):
+        with self.pools_lock:
+            if self.pools.get(key) is pool:
+                del self.pools[key]
+        pool.discard()
+
+    def stats(self):
+        with self.pools_lock:
+            pools = list(self.pools.items())
+        return {key: pool.stats() for key, pool in pools}
+
+    def close(self):
+        self.stopping = True
+        self.wake.set()
+        self.refiller.join()
+        for pool in list(self.pools.values()):
+            pool.discard()
+
+class PoolRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        service = self.server.service
+        for line in self.rfile:
+            command, _, argument = line.strip().partition(b" ")
+            if command == b"GET":
+                try:
+                    pool = service.pool_for(argument)
+                    password = pool.take()
+                except Exception as error:
+                    # Any failure is this request's error; the connection stays usable
+                    message = str(error) if isinstance(error, ValueError) else f"{type(error).__name__}: {error}"
+                    self.wfile.write(f"ERROR {' '.join(message.split())}\n".encode("utf-8"))
+                    continue
+                try:
+                    self.wfile.write(password)
+                finally:
+                    wipe(password)
+            elif command == b"STATS":
+                self.wfile.write(json.dumps(service.stats()).encode("utf-8") + b"\n")
+            else:
+                self.wfile.write(b"ERROR unknown command, use GET or STATS\n")
+
+    def setup(self):
+        super().setup()
+        if self.connection.family != getattr(socket, "AF_UNIX", None):
+            # Small request/response messages: don't let Nagle hold them back
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+def remove_socket(path):
+    """Remove a leftover socket at path; anything else there is an error, never deleted"""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{path} exists and is not a socket; choose another --socket path")
+    os.remove(path)
+
+def make_server(service, socket_path=None, port=None):
+    """A threading server on a Unix socket, or on 127.0.0.1:port when port is given"""
+    if port is not None:
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", port), PoolRequestHandler)
+    else:
+        remove_socket(socket_path)
+        # Created owner-only, so nobody else can connect between bind and chmod
+        umask = os.umask(0o077)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(socket_path, PoolRequestHandler)
+        finally:
+            os.umask(umask)
+        os.chmod(socket_path, 0o600)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+class PoolClient:
+    def __init__(self, socket_path=DEFAULT_SOCKET, port=None):
+        if port is not None:
+            self.socket = socket.create_connection(("127.0.0.1", port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(socket_path)
+        self.reader = self.socket.makefile("rb")
+
+    def request(self, line):
+        self.socket.sendall(line.encode("utf-8") + b"\n")
+        reply = self.reader.readline()
+        if not reply.endswith(b"\n"):
+            raise ConnectionError("the pool service closed the connection without a full reply")
+        reply = reply[:-1].decode("utf-8")
+        if reply.startswith("ERROR "):
+            raise ValueError(reply[6:])
+        return reply
+
+    def get(self, policy=None):
+        password = self.request("GET " + json.dumps(policy) if policy else "GET")
+        length = (policy or {}).get("length", 16)
+        if not password or len(password) != length:
+            raise ValueError(f"the pool service sent a {len(password)}-character password instead of {length}")
+        return password
+
+    def stats(self):
+        return json.loads(self.request("STATS"))
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve pre-generated passwords over a local socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in [("serve", "run the pool service"), ("get", "fetch passwords"),
+                            ("stats", "print pool depths and refill counters")]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+        command.add_argument("--port", type=int, help="use TCP on 127.0.0.1 instead of a Unix socket")
+    serve, get = commands.choices["serve"], commands.choices["get"]
+    serve.add_argument("--low", type=int, default=1000, help="refill when a pool drops below this (default: 1000)")
+    serve.add_argument("--high", type=int, default=10000, help="refill up to this many (default: 10000)")
+    serve.add_argument("--inline", action="store_true", help="no pool: generate on every request (for comparison)")
+    get.add_argument("-n", "--count", type=int, default=1, help="how many passwords (default: 1)")
+    get.add_argument("--policy", help='JSON policy, e.g. {"length": 20, "min_numbers": 2}')
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        service = PoolService(args.low, args.high, inline=args.inline)
+        try:
+            server = make_server(service, args.socket, args.port)
+        except (ValueError, OSError) as error:
+            service.close()
+            parser.error(str(error))
+        address = f"127.0.0.1:{server.server_address[1]}" if args.port is not None else args.socket
+        print(f"Serving passwords on {address}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopping", file=sys.stderr)
+        finally:
+            server.server_close()
+            service.close()
+            if args.port is None:
+                remove_socket(args.socket)
+        return
+
+    client = PoolClient(args.socket, args.port)
+    try:
+        if args.command == "stats":
+            print(json.dumps(client.stats(), indent=2))
+        else:
+            policy = json.loads(args.policy) if args.policy else None
+            for i in range(args.count):
+                print(client.get(policy))
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# Password strength and entropy analysis, for one password or millions from a file.
+#
+# Every byte is mapped to a character-class bit through one 256-entry table
+# (bytes.translate), so classifying a password is a single pass done in C.
+# Entropy is estimated from the classes the password actually uses: a password
+# of lowercase letters and digits is treated as drawn from 26 + 10 characters.
+
+from collections import Counter
+from math import log2
+
+LOWERCASE, UPPERCASE, NUMBER, SPECIAL, OTHER = 1, 2, 4, 8, 16
+CLASS_NAMES = {LOWERCASE: "lowercase", UPPERCASE: "uppercase", NUMBER: "numbers", SPECIAL: "special", OTHER: "other"}
+
+# How many characters an attacker has to try for each class. SPECIAL is all printable
+# ASCII punctuation plus space; OTHER is a rough allowance for non-ASCII characters.
+CLASS_SIZES = {LOWERCASE: 26, UPPERCASE: 26, NUMBER: 10, SPECIAL: 33, OTHER: 100}
+
+# Byte -> class bit. UTF-8 continuation bytes and \r are deleted instead, so each
+# character of a UTF-8 line leaves exactly one class byte behind; \n stays as the separator.
+CLASS_TABLE = bytes(
+    LOWERCASE if 97 <= value <= 122 else
+    UPPERCASE if 65 <= value <= 90 else
+    NUMBER if 48 <= value <= 57 else
+    10 if value == 10 else
+    SPECIAL if value < 128 else
+    OTHER
+    for value in range(256)
+)
+SKIPPED_BYTES = bytes(range(0x80, 0xC0)) + b"\r"
+
+RATINGS = ["very weak", "weak", "fair", "strong", "very strong"]
+# Entropy (bits) needed for scores 1 to 4
+SCORE_THRESHOLDS = [28, 36, 60, 80]
+MIN_LENGTH = 8
+
+def class_mask(classes):
+    mask = 0
+    for bit in classes:
+        mask |= bit
+    return mask
+
+def pool_size(mask):
+    return sum(size for bit, size in CLASS_SIZES.items() if mask & bit)
+
+def entropy_bits(length, mask):
+    return length * log2(pool_size(mask)) if mask else 0.0
+
+def strength_score(length, bits):
+    """0 (very weak) to 4 (very strong); anything shorter than MIN_LENGTH is at most weak"""
+    score = sum(1 for threshold in SCORE_THRESHOLDS if bits >= threshold)
+    return min(score, 1) if length < MIN_LENGTH else score
+
+def analyze_password(password, blocklist=None, known_entropy=None):
+    """Structured strength report for one password; with a Blocklist, also whether it is breached.
+
+    known_entropy replaces the character-based estimate when the generator knows better,
+    e.g. a passphrase's entropy comes from the number of words, not the letters."""
+    classes = frozenset(password.encode("utf-8").translate(CLASS_TABLE, SKIPPED_BYTES))
+    mask = class_mask(classes)
+    length = len(password)
+    bits = entropy_bits(length, mask) if known_entropy is None else known_entropy
+    score = strength_score(length, bits)
+
+    tips = []
+    breached = blocklist is not None and password in blocklist
+    if breached:
+        # Attackers try known passwords first, whatever their entropy
+        score = 0
+        tips.append("This password is on a breached-password list; never use it")
+    if length < MIN_LENGTH:
+        tips.append(f"Use {MIN_LENGTH} or more characters")
+    if not mask & SPECIAL:
+        tips.append("Add special characters")
+    if not (mask & UPPERCASE and mask & LOWERCASE):
+        tips.append("Mix uppercase and lowercase letters")
+    if not mask & NUMBER:
+        tips.append("Add numbers")
+
+    return {
+        "length": length,
+        "classes": [name for bit, name in CLASS_NAMES.items() if mask & bit],
+        "pool_size": pool_size(mask),
+        "entropy_bits": round(bits, 1),
+        "score": score,
+        "rating": RATINGS[score],
+        "tips": tips,
+        "breached": breached,
+    }
+
+def read_blocks(file, block_size=1 << 24):
+    """Yield chunks of whole lines from a binary file"""
+    leftover = b""
+    while True:
+        block = file.read(block_size)
+        if not block:
+            if leftover:
+                yield leftover
+            return
+        block = leftover + block
+        end = block.rfind(b"\n") + 1
+        leftover = block[end:]
+        if end:
+            yield block[:end]
+
+def audit_passwords(file, min_bits=SCORE_THRESHOLDS[2], block_size=1 << 24):
+    """Summarise every password (one per line) in a binary file: scores, entropy, how many are too weak"""
+    # Per block: one translate over all of it, then count (length, classes) pairs in C.
+    # Only the distinct pairs (a few thousand at most) get scored in Python.
+    shapes = Counter()
+    for block in read_blocks(file, block_size):
+        lines = block.translate(CLASS_TABLE, SKIPPED_BYTES).split(b"\n")
+        shapes.update(zip(map(len, lines), map(frozenset, lines)))
+
+    scores = [0] * len(RATINGS)
+    histogram = Counter()
+    total = 0
+    total_bits = 0.0
+    below = 0
+    for (length, classes), count in shapes.items():
+        if not length:
+            continue
+        bits = entropy_bits(length, class_mask(classes))
+        scores[strength_score(length, bits)] += count
+        histogram[int(bits // 10) * 10] += count
+        total += count
+        total_bits += bits * count
+        if bits < min_bits:
+            below += count
+
+    return {
+        "passwords": total,
+        "mean_entropy_bits": round(total_bits / total, 1) if total else 0.0,
+        "below_min_bits": below,
+        "min_bits": min_bits,
+        "ratings": dict(zip(RATINGS, scores)),
+        "entropy_histogram": {f"{start}-{start + 9}": histogram[start] for start in sorted(histogram)},
+    }
+
+def weak_line_numbers(file, min_bits=SCORE_THRESHOLDS[2], block_size=1 << 24):
+    """Yield the line numbers (1-based) of passwords below min_bits, without the passwords themselves"""
+    weak = {}
+    line_number = 0
+    for block in read_blocks(file, block_size):
+        lines = block.translate(CLASS_TABLE, SKIPPED_BYTES).split(b"\n")
+        if block.endswith(b"\n"):
+            lines.pop()
+        for classes in lines:
+            line_number += 1
+            shape = (len(classes), frozenset(classes))
+            if shape not in weak:
+                weak[shape] = bool(classes) and entropy_bits(shape[0], class_mask(shape[1])) < min_bits
+            if weak[shape]:
+                yield line_number
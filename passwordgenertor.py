@@ -1,4 +1,7 @@
-import random
+import secrets
+
+from password_blocklist import load_blocklist, unlisted_passwords
+from password_strength import analyze_password
 
 # Define all the characters we can use for passwords
 lowercase_letters = "abcdefghijklmnopqrstuvwxyz"
@@ -61,16 +64,13 @@ def get_characters_to_use(user_choice):
 
 def create_password(length, available_characters):
     """Create a random password using the available characters"""
-    password = ""
-    
-    # Pick random characters one by one until we reach the desired length
-    for i in range(length):
-        random_character = random.choice(available_characters)
-        password = password + random_character
+    # Pick random characters one by one with a cryptographically secure generator,
+    # then join them once (adding to a string in a loop copies it every time)
+    characters = [secrets.choice(available_characters) for i in range(length)]
     
-    return password
+    return "".join(characters)
 
-def show_password_info(password):
+def show_password_info(password, blocklist=None, entropy_bits=None):
     """Display the password and some information about it"""
     print("\n" + "=" * 50)
     print("YOUR NEW PASSWORD IS READY!")
@@ -78,14 +78,22 @@ def show_password_info(password):
     print(f"Password: {password}")
     print(f"Length: {len(password)} characters")
     
+    # One pass over the password finds which kinds of characters it uses
+    # (Passphrases pass in their own entropy, which depends on the wordlist size)
+    report = analyze_password(password, blocklist, entropy_bits)
+    print(f"Strength: {report['rating']} (about {report['entropy_bits']:.0f} bits of entropy)")
+    
+    if report["breached"]:
+        print("⚠️ Warning: this password appears in a list of breached passwords - don't use it!")
+    
     # Give the user some tips about their password
-    if len(password) < 8:
+    if report["length"] < 8:
         print("💡 Tip: Passwords with 8 or more characters are more secure!")
     
-    if any(char in special_characters for char in password):
+    if "special" in report["classes"]:
         print("✅ Great! Your password includes special characters - very secure!")
     
-    if any(char.isupper() for char in password) and any(char.islower() for char in password):
+    if "uppercase" in report["classes"] and "lowercase" in report["classes"]:
         print("✅ Good! Your password has both uppercase and lowercase letters!")
     
     print("=" * 50)
@@ -104,6 +112,9 @@ def ask_to_generate_another():
 def main():
     """This is the main function that runs our password generator"""
     
+    # Optional offline list of breached passwords (see password_blocklist.py)
+    blocklist = load_blocklist()
+    
     # Keep generating passwords until the user wants to stop
     while True:
         # Step 1: Ask how long the password should be
@@ -118,8 +129,17 @@ def main():
         # Step 4: Create the actual password
         new_password = create_password(password_length, characters_we_can_use)
         
+        # Never hand out a known-breached password (only short or simple ones ever are)
+        if blocklist and new_password in blocklist:
+            candidates = iter(lambda: create_password(password_length, characters_we_can_use), None)
+            try:
+                new_password = next(unlisted_passwords(candidates, blocklist))
+            except ValueError as error:
+                print(f"Sorry, {error}.")
+                continue
+        
         # Step 5: Show the password to the user
-        show_password_info(new_password)
+        show_password_info(new_password, blocklist)
         
         # Step 6: Ask if they want another password
         if not ask_to_generate_another():
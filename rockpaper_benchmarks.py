@@ -0,0 +1,73 @@
+# Benchmarks for Rock Paper Scissors.
+# Run with: python rockpaper_benchmarks.py
+
+import random
+import time
+
+import rockpaper_simulation
+from rockpaper_intern import determine_winner, get_computer_choice
+from rockpaper_simulation import Cycle, make_rng, simulate, uniform, weighted
+from rockpaper_strategies import play_against, strategy_from_name
+
+def report(label, rounds, elapsed):
+    print(f"{label:<40} {rounds:>12,} rounds  {elapsed:8.3f} s  {rounds / elapsed:14,.0f}/s")
+
+def simulation_benchmark(rounds=20000000):
+    """Random vs random: the game's per-round functions vs simulate() a chunk at a time"""
+    print("Rock Paper Scissors, random vs random:")
+    random.seed(1)
+    few = rounds // 100
+    start = time.perf_counter()
+    scores = {"player": 0, "computer": 0, "tie": 0}
+    for i in range(few):
+        scores[determine_winner(get_computer_choice(), get_computer_choice())] += 1
+    report("get_computer_choice + determine_winner", few, time.perf_counter() - start)
+
+    backends = [False] + ([True] if rockpaper_simulation.numpy is not None else [])
+    for use_numpy in backends:
+        label = "NumPy" if use_numpy else "bytes"
+        start = time.perf_counter()
+        result = simulate(uniform, uniform, rounds, seed=1, use_numpy=use_numpy)
+        report(f"simulate, {label}", rounds, time.perf_counter() - start)
+        assert abs(result["win_rate"] - 1 / 3) < 0.001, result
+
+        start = time.perf_counter()
+        simulate(uniform, Cycle(), rounds, seed=1, use_numpy=use_numpy)
+        report(f"simulate, {label}, uniform vs cycle", rounds, time.perf_counter() - start)
+
+def habit_moves(rounds, pattern=b"\x00\x00\x01\x02\x01", noise=0.1, seed=3):
+    """A player who mostly repeats a fixed sequence, straying from it now and then"""
+    rng = random.Random(seed)
+    moves = bytearray((pattern * (rounds // len(pattern) + 1))[:rounds])
+    for index in range(rounds):
+        if rng.random() < noise:
+            moves[index] = rng.randrange(3)
+    return bytes(moves)
+
+def strategy_benchmark(rounds=500000):
+    """Adaptive computer strategies: time per move (choose + record), memory, and how often they win"""
+    rng = make_rng(2, use_numpy=False)
+    players = {
+        "uniform": uniform(rounds, rng),
+        "weighted 5:3:2": weighted(5, 3, 2)(rounds, rng),
+        "cycle": Cycle()(rounds, rng),
+        "habit": habit_moves(rounds),
+    }
+    print(f"Computer strategies, {rounds:,} rounds against each player; computer's win rate (edge):")
+    print(f"{'strategy':<12} {'per move':>10} {'memory':>10}   " + "".join(f"{name:>22}" for name in players))
+    for name in ["random", "frequency", "markov:1", "markov:2", "markov:4", "markov:8", "markov:12", "mixed:4"]:
+        line = ""
+        elapsed = 0.0
+        for moves in players.values():
+            strategy = strategy_from_name(name, random.Random(1))
+            start = time.perf_counter()
+            result = play_against(strategy, moves)
+            elapsed += time.perf_counter() - start
+            line += f"{result['win_rate']:>13.1%} ({result['edge']:+.3f})"
+        memory = strategy.memory_bytes() if hasattr(strategy, "memory_bytes") else 0
+        print(f"{name:<12} {elapsed / (rounds * len(players)) * 1e9:>7.0f} ns {memory:>10,}   {line}")
+
+if __name__ == "__main__":
+    simulation_benchmark()
+    print()
+    strategy_benchmark()
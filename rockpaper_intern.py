@@ -1,6 +1,9 @@
 import random
 import os
 
+from rockpaper_simulation import MOVES
+from rockpaper_strategies import strategy_from_name
+
 # Keep track of wins and losses
 player_wins = 0
 computer_wins = 0
@@ -55,8 +58,10 @@ def get_player_choice():
             print("\nThanks for playing!")
             return 'quit'
 
-def get_computer_choice():
-    """Computer picks randomly"""
+def get_computer_choice(strategy=None):
+    """Computer picks randomly, or asks its strategy (see rockpaper_strategies.py)"""
+    if strategy is not None:
+        return MOVES[strategy.choose()]
     choices = ['rock', 'paper', 'scissors']
     return random.choice(choices)
 
@@ -73,19 +78,19 @@ def show_choices(player_choice, computer_choice):
     print(f"Computer chose: {choice_emojis[computer_choice]} {computer_choice.title()}")
     print("-" * 30)
 
+# All the ways a choice can win, built once instead of on every round
+winning_combinations = {
+    'rock': 'scissors',      # rock beats scissors
+    'scissors': 'paper',     # scissors beats paper
+    'paper': 'rock'          # paper beats rock
+}
+
 def determine_winner(player_choice, computer_choice):
     """Figure out who won the game"""
     # Check for tie first
     if player_choice == computer_choice:
         return 'tie'
     
-    # Check all the ways player can win
-    winning_combinations = {
-        'rock': 'scissors',      # rock beats scissors
-        'scissors': 'paper',     # scissors beats paper
-        'paper': 'rock'          # paper beats rock
-    }
-    
     if winning_combinations[player_choice] == computer_choice:
         return 'player'
     else:
@@ -187,6 +192,13 @@ def main():
     """Main game function - this runs everything"""
     print("Starting Rock Paper Scissors Game...")
     
+    # Pick how the computer plays, e.g. ROCKPAPER_STRATEGY=markov:3 to learn your habits
+    try:
+        strategy = strategy_from_name(os.environ.get("ROCKPAPER_STRATEGY", "random"))
+    except ValueError as error:
+        print(f"Ignoring ROCKPAPER_STRATEGY: {error}")
+        strategy = strategy_from_name("random")
+    
     # Show welcome message
     clear_screen()
     show_welcome_message()
@@ -201,7 +213,7 @@ def main():
             break
         
         # Get computer's choice
-        computer_choice = get_computer_choice()
+        computer_choice = get_computer_choice(strategy)
         
         # Show both choices
         show_choices(player_choice, computer_choice)
@@ -212,6 +224,9 @@ def main():
         # Show the result
         show_result(winner, player_choice, computer_choice)
         
+        # Let the strategy learn from this round
+        strategy.record(MOVES.index(player_choice), MOVES.index(computer_choice))
+        
         # Show current score
         show_current_score()
         
@@ -0,0 +1,201 @@
+# Headless Rock Paper Scissors: play millions of rounds between two strategies and
+# report how often each wins, without any input() or printing per round.
+#
+#   python rockpaper_simulation.py uniform cycle --rounds 10000000 --seed 1
+#   python rockpaper_simulation.py weighted:0.5,0.3,0.2 paper
+#
+# Moves are small integers: rock 0, paper 1, scissors 2. With that order a round
+# needs no lookup table: (a - b) mod 3 is 0 for a tie, 1 when a wins, 2 when b wins.
+# Rounds are played a chunk at a time, as one array operation per chunk:
+#   - with NumPy, on uint8 arrays (np.bincount does the counting);
+#   - without it, on bytes objects. b's moves are turned into 3 - b with
+#     bytes.translate, then both chunks are read as huge integers and added: every
+#     byte of the sum is a + 3 - b (at most 5, so nothing carries into the next byte),
+#     and bytes.count tallies the outcomes. All of it runs in C.
+#
+# A strategy is any callable strategy(count, rng) returning count moves, as bytes or
+# as a NumPy array. rng is a numpy.random.Generator when NumPy is used, else a
+# random.Random. Strategies may keep state between calls (see Cycle).
+
+import argparse
+import random
+import sys
+import time
+from math import sqrt
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ROCK, PAPER, SCISSORS = 0, 1, 2
+MOVES = ("rock", "paper", "scissors")
+TIE, WIN, LOSS = 0, 1, 2
+DEFAULT_CHUNK_ROUNDS = 1 << 20
+Z_95 = 1.959963984540054
+
+# Byte tables for the pure Python path
+MOD3 = bytes(value % 3 for value in range(256))
+NEGATE = bytes(3 - value if value < 3 else 0 for value in range(256))
+
+def uses_numpy(rng):
+    return numpy is not None and isinstance(rng, numpy.random.Generator)
+
+def random_bytes_moves(count, rng):
+    # Byte 255 is dropped so the other 255 values split evenly into three moves
+    moves = b""
+    while len(moves) < count:
+        wanted = count - len(moves)
+        moves += rng.randbytes(wanted + wanted // 64 + 16).translate(MOD3, b"\xff")
+    return moves[:count]
+
+def uniform(count, rng):
+    """Every move equally likely: what get_computer_choice does"""
+    if uses_numpy(rng):
+        return rng.integers(0, 3, size=count, dtype=numpy.uint8)
+    return random_bytes_moves(count, rng)
+
+def constant(move):
+    def strategy(count, rng):
+        return bytes([move]) * count
+    strategy.__name__ = MOVES[move]
+    return strategy
+
+def weighted(rock, paper, scissors):
+    """Random moves with these relative weights"""
+    total = rock + paper + scissors
+    if min(rock, paper, scissors) < 0 or total <= 0:
+        raise ValueError("weights must be non-negative and not all zero")
+    weights = [rock / total, paper / total, scissors / total]
+    # Without NumPy, one random byte picks the move, so weights are rounded to 1/256ths
+    bounds = [round(256 * weights[0]), round(256 * (weights[0] + weights[1]))]
+    table = bytes(ROCK if value < bounds[0] else PAPER if value < bounds[1] else SCISSORS for value in range(256))
+
+    def strategy(count, rng):
+        if uses_numpy(rng):
+            return rng.choice(3, size=count, p=weights).astype(numpy.uint8)
+        return rng.randbytes(count).translate(table)
+    strategy.__name__ = f"weighted:{rock:g},{paper:g},{scissors:g}"
+    return strategy
+
+class Cycle:
+    """rock, paper, scissors, rock, ... continuing where the previous chunk stopped"""
+    __name__ = "cycle"
+
+    def __init__(self, start=ROCK):
+        self.position = start
+
+    def __call__(self, count, rng):
+        start = self.position % 3
+        self.position += count
+        return (b"\x00\x01\x02" * (count // 3 + 2))[start:start + count]
+
+STRATEGIES = {
+    "uniform": lambda: uniform,
+    "rock": lambda: constant(ROCK),
+    "paper": lambda: constant(PAPER),
+    "scissors": lambda: constant(SCISSORS),
+    "cycle": Cycle,
+}
+
+def strategy_from_name(name):
+    """A strategy from its command-line name: uniform, rock, paper, scissors, cycle or weighted:R,P,S"""
+    if name.startswith("weighted:"):
+        try:
+            weights = [float(weight) for weight in name[len("weighted:"):].split(",")]
+        except ValueError:
+            weights = []
+        if len(weights) != 3:
+            raise ValueError("weighted needs three weights, e.g. weighted:0.5,0.3,0.2")
+        return weighted(*weights)
+    if name not in STRATEGIES:
+        raise ValueError(f"unknown strategy {name!r}, use one of {', '.join(STRATEGIES)} or weighted:R,P,S")
+    return STRATEGIES[name]()
+
+def count_outcomes(moves_a, moves_b):
+    """[ties, a's wins, b's wins] for two equally long chunks of moves"""
+    if numpy is not None and (isinstance(moves_a, numpy.ndarray) or isinstance(moves_b, numpy.ndarray)):
+        a = numpy.frombuffer(moves_a, dtype=numpy.uint8) if isinstance(moves_a, bytes) else moves_a
+        b = numpy.frombuffer(moves_b, dtype=numpy.uint8) if isinstance(moves_b, bytes) else moves_b
+        outcomes = (a + (3 - b)) % 3
+        return numpy.bincount(outcomes, minlength=3).tolist()
+    count = len(moves_a)
+    sums = (int.from_bytes(moves_a, "little") + int.from_bytes(moves_b.translate(NEGATE), "little"))
+    sums = sums.to_bytes(count, "little")
+    # Each byte is a + 3 - b: 3 is a tie, 1 or 4 a win for a, 2 or 5 a win for b
+    return [sums.count(3), sums.count(1) + sums.count(4), sums.count(2) + sums.count(5)]
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Confidence interval for a proportion (Wilson score); stays inside [0, 1] even near the edges"""
+    if not trials:
+        return (0.0, 1.0)
+    share = successes / trials
+    middle = (share + z * z / (2 * trials)) / (1 + z * z / trials)
+    spread = z / (1 + z * z / trials) * sqrt(share * (1 - share) / trials + z * z / (4 * trials * trials))
+    return (max(0.0, middle - spread), min(1.0, middle + spread))
+
+def summarize(ties, wins, losses, z=Z_95):
+    """Counts, rates with confidence intervals, and a's edge (win rate minus loss rate)"""
+    rounds = ties + wins + losses
+    summary = {"rounds": rounds, "wins": wins, "losses": losses, "ties": ties}
+    for name, count in (("win", wins), ("loss", losses), ("tie", ties)):
+        summary[f"{name}_rate"] = count / rounds if rounds else 0.0
+        summary[f"{name}_rate_ci"] = wilson_interval(count, rounds, z)
+    # Each round scores +1, 0 or -1 for a; normal approximation for the mean score
+    edge = (wins - losses) / rounds if rounds else 0.0
+    spread = z * sqrt(max((wins + losses) / rounds - edge * edge, 0.0) / rounds) if rounds else 1.0
+    summary["edge"] = edge
+    summary["edge_ci"] = (edge - spread, edge + spread)
+    return summary
+
+def make_rng(seed=None, use_numpy=None):
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ValueError("NumPy is not installed")
+    return numpy.random.default_rng(seed) if use_numpy else random.Random(seed)
+
+def simulate(strategy_a, strategy_b, rounds, seed=None, use_numpy=None, chunk_rounds=DEFAULT_CHUNK_ROUNDS):
+    """Play rounds rounds of strategy_a against strategy_b; returns summarize()'s dict from a's side"""
+    if rounds < 0:
+        raise ValueError("rounds can't be negative")
+    rng = make_rng(seed, use_numpy)
+    totals = [0, 0, 0]
+    for start in range(0, rounds, chunk_rounds):
+        count = min(chunk_rounds, rounds - start)
+        moves_a = strategy_a(count, rng)
+        moves_b = strategy_b(count, rng)
+        if len(moves_a) != count or len(moves_b) != count:
+            raise ValueError(f"a strategy returned the wrong number of moves (wanted {count})")
+        for outcome, found in enumerate(count_outcomes(moves_a, moves_b)):
+            totals[outcome] += found
+    return summarize(totals[TIE], totals[WIN], totals[LOSS])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Rock Paper Scissors strategies against each other")
+    parser.add_argument("strategy_a", help="uniform, rock, paper, scissors, cycle or weighted:R,P,S")
+    parser.add_argument("strategy_b")
+    parser.add_argument("--rounds", type=int, default=10000000)
+    parser.add_argument("--seed", type=int, help="for reproducible results")
+    parser.add_argument("--no-numpy", action="store_true", help="use the pure Python bytes engine")
+    args = parser.parse_args(argv)
+
+    try:
+        strategy_a = strategy_from_name(args.strategy_a)
+        strategy_b = strategy_from_name(args.strategy_b)
+        start = time.perf_counter()
+        result = simulate(strategy_a, strategy_b, args.rounds, args.seed, False if args.no_numpy else None)
+    except ValueError as error:
+        parser.error(str(error))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.strategy_a} vs {args.strategy_b}, {result['rounds']:,} rounds:")
+    for name, label in (("win", "wins"), ("loss", "losses"), ("tie", "ties")):
+        low, high = result[f"{name}_rate_ci"]
+        print(f"  {label:<7} {result[label]:>14,}  {result[f'{name}_rate']:7.3%}  (95% CI {low:.3%} to {high:.3%})")
+    low, high = result["edge_ci"]
+    print(f"  edge    {result['edge']:+.4f}  (95% CI {low:+.4f} to {high:+.4f})")
+    print(f"{result['rounds'] / max(elapsed, 1e-9):,.0f} rounds/s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Strategies for the computer player, including ones that learn the player's habits.
+#
+# A strategy is an object with two methods:
+#   choose()                          -> the computer's next move (0 rock, 1 paper, 2 scissors)
+#   record(player_move, computer_move)   called once the round has been played
+# rockpaper_intern picks one with $ROCKPAPER_STRATEGY (e.g. "markov:3"); the default is
+# "random", which plays exactly like the original get_computer_choice.
+#
+# NGramStrategy predicts the player's next move from their last `order` moves, and
+# plays whatever beats it. The last `order` moves are kept as one base-3 number, and
+# the counts of what followed each of the 3**order possible histories live in one
+# fixed array('H'). Recording a round is an index update plus one shift of that
+# number, so it costs the same in round 10 as in round 10 million, and memory never
+# grows. When a count fills up, the counts for that history are halved, which also
+# lets newer habits outweigh old ones.
+
+import random
+from array import array
+
+from rockpaper_simulation import PAPER, ROCK, SCISSORS, summarize
+
+# BEATS[move] is the move that beats it
+BEATS = (PAPER, SCISSORS, ROCK)
+MAX_ORDER = 12
+COUNT_LIMIT = 65535
+
+class RandomStrategy:
+    """Every move equally likely, ignoring the player"""
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
+    def choose(self):
+        return self.rng.randrange(3)
+
+    def record(self, player_move, computer_move):
+        pass
+
+class NGramStrategy:
+    """Beat the move the player most often made after their last `order` moves"""
+    def __init__(self, order=2, rng=None):
+        if not 0 <= order <= MAX_ORDER:
+            raise ValueError(f"order must be between 0 and {MAX_ORDER}")
+        self.order = order
+        self.contexts = 3 ** order
+        # counts[3 * context + move]: how often `move` followed that history
+        self.counts = array("H", bytes(2 * 3 * self.contexts))
+        self.context = 0
+        self.rng = rng or random.Random()
+
+    def predict(self):
+        """The player's most likely next move, or None with nothing to go on yet"""
+        counts = self.counts
+        index = 3 * self.context
+        rock, paper, scissors = counts[index], counts[index + 1], counts[index + 2]
+        if rock >= paper and rock >= scissors:
+            if rock == 0:
+                return None
+            return ROCK
+        return PAPER if paper >= scissors else SCISSORS
+
+    def choose(self):
+        # predict() inlined: this runs every round
+        counts = self.counts
+        index = 3 * self.context
+        rock, paper, scissors = counts[index], counts[index + 1], counts[index + 2]
+        if rock >= paper and rock >= scissors:
+            return PAPER if rock else self.rng.randrange(3)
+        return SCISSORS if paper >= scissors else ROCK
+
+    def record(self, player_move, computer_move):
+        counts = self.counts
+        index = 3 * self.context + player_move
+        if counts[index] == COUNT_LIMIT:
+            start = index - player_move
+            for position in range(start, start + 3):
+                counts[position] >>= 1
+        counts[index] += 1
+        self.context = (self.context * 3 + player_move) % self.contexts
+
+    def memory_bytes(self):
+        return self.counts.itemsize * len(self.counts)
+
+class MixedStrategy:
+    """NGramStrategy for every order up to max_order, following whichever has lately predicted best.
+
+    Short orders learn fast and long ones catch longer patterns; this gets both.
+    Each round costs one predict() per order, so still nothing that grows with
+    the length of the game."""
+    def __init__(self, max_order=4, decay=0.9, rng=None):
+        if not 0 <= max_order <= MAX_ORDER:
+            raise ValueError(f"order must be between 0 and {MAX_ORDER}")
+        self.rng = rng or random.Random()
+        self.predictors = [NGramStrategy(order, self.rng) for order in range(max_order + 1)]
+        self.scores = array("d", bytes(8 * len(self.predictors)))
+        self.predictions = [None] * len(self.predictors)
+        self.decay = decay
+
+    def choose(self):
+        best = None
+        best_score = -1.0
+        for index, predictor in enumerate(self.predictors):
+            predicted = self.predictions[index] = predictor.predict()
+            if predicted is not None and self.scores[index] > best_score:
+                best, best_score = predicted, self.scores[index]
+        return self.rng.randrange(3) if best is None else BEATS[best]
+
+    def record(self, player_move, computer_move):
+        decay = self.decay
+        scores = self.scores
+        for index, predictor in enumerate(self.predictors):
+            scores[index] = scores[index] * decay + (self.predictions[index] == player_move)
+            predictor.record(player_move, computer_move)
+
+    def memory_bytes(self):
+        return sum(predictor.memory_bytes() for predictor in self.predictors) + 8 * len(self.scores)
+
+def strategy_from_name(name, rng=None):
+    """random, frequency (what the player plays most), markov:N (order N) or mixed:N (orders 0 to N)"""
+    kind, _, order = name.partition(":")
+    try:
+        order = int(order) if order else None
+    except ValueError:
+        raise ValueError(f"order must be a whole number in {name!r}") from None
+    if kind == "random" and order is None:
+        return RandomStrategy(rng)
+    if kind == "frequency" and order is None:
+        return NGramStrategy(0, rng)
+    if kind == "markov":
+        return NGramStrategy(2 if order is None else order, rng)
+    if kind == "mixed":
+        return MixedStrategy(4 if order is None else order, rng=rng)
+    raise ValueError(f"unknown strategy {name!r}, use random, frequency, markov:N or mixed:N")
+
+def play_against(strategy, player_moves):
+    """Let strategy play every move in player_moves (bytes of 0/1/2); summarize()'s dict from the computer's side"""
+    tallies = [0, 0, 0]
+    choose = strategy.choose
+    record = strategy.record
+    for player_move in player_moves:
+        computer_move = choose()
+        tallies[(computer_move - player_move) % 3] += 1
+        record(player_move, computer_move)
+    ties, wins, losses = tallies
+    return summarize(ties, wins, losses)
@@ -0,0 +1,878 @@
+import sqlite3 as sql
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache, partial
+import json
+import re
+import threading
+import unicodedata
+
+TASK_COLUMNS = 'id, title, priority, due_date, completed'
+
+EPOCH = date(1970, 1, 1)
+DUE_DATE_PATTERN = re.compile(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})')
+
+def normalize_due_date(value):
+    # Due dates are stored as ISO "YYYY-MM-DD" text, so text order is date order and
+    # SQLite's julianday() can derive the indexed due_day column from them
+    if value is None or isinstance(value, str) and not value.strip():
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    
+    text = value.strip().lower()
+    if text == 'today':
+        return date.today().isoformat()
+    if text == 'tomorrow':
+        return (date.today() + timedelta(days=1)).isoformat()
+    
+    match = DUE_DATE_PATTERN.fullmatch(text)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+        return date(year, month, day).isoformat()
+    raise ValueError(f"Unrecognised due date {value!r}, use YYYY-MM-DD")
+
+def stored_due_date(value):
+    # normalize_due_date for imports: text it can't parse is kept as it is, the way
+    # migration 5 leaves free-form legacy due dates alone, instead of losing the task
+    try:
+        return normalize_due_date(value)
+    except ValueError:
+        return value.strip()
+
+def epoch_day(value):
+    # Days since 1970-01-01 for a date, ISO string or an epoch day already
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = date.fromisoformat(normalize_due_date(value))
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal() - EPOCH.toordinal()
+
+def due_epoch_day(due_date):
+    # Python twin of the due_day generated column: None when there is no valid date
+    try:
+        return epoch_day(date.fromisoformat(due_date))
+    except (TypeError, ValueError):
+        return None
+
+def task_page_key(task):
+    # Keyset cursor for get_tasks_page: the (priority, due_date, title, id) sort tuple
+    task_id, title, priority, due_date, completed = task
+    return (priority, due_date, title, task_id)
+
+def keyset_condition(key, after=True):
+    # Builds "row comes after/before key" for ORDER BY priority, due_date, title, id.
+    # due_date may be NULL (sorted first), so it cannot use a plain row-value compare.
+    priority, due_date, title, task_id = key
+    gt = '>' if after else '<'
+    if due_date is None:
+        due_beyond = 'due_date IS NOT NULL' if after else '0'
+        due_same = 'due_date IS NULL'
+        due_params = []
+    else:
+        due_beyond = f'due_date {gt} ?' if after else '(due_date IS NULL OR due_date < ?)'
+        due_same = 'due_date = ?'
+        due_params = [due_date]
+    condition = (
+        f'(priority {gt} ? OR (priority = ? AND ({due_beyond} OR ({due_same} AND '
+        f'(title {gt} ? OR (title = ? AND id {gt} ?))))))'
+    )
+    params = [priority, priority] + due_params + due_params + [title, title, task_id]
+    return condition, params
+
+def keyset_fragments(key, after=True, inclusive=False):
+    # Splits "rows after/before key" into conditions that each map onto a single
+    # index range seek. Run in order, they yield the rows in ORDER BY order.
+    # (Row-value comparisons treat NULL due dates as unknown, hence the split.)
+    priority, due_date, title, task_id = key
+    gt = '>=' if inclusive else '>'
+    if after:
+        if due_date is None:
+            return [
+                (f'priority = ? AND due_date IS NULL AND (title, id) {gt} (?, ?)', [priority, title, task_id]),
+                ('priority = ? AND due_date IS NOT NULL', [priority]),
+                ('priority > ?', [priority]),
+            ]
+        return [
+            (f'priority = ? AND (due_date, title, id) {gt} (?, ?, ?)', [priority, due_date, title, task_id]),
+            ('priority > ?', [priority]),
+        ]
+    if due_date is None:
+        return [
+            ('priority = ? AND due_date IS NULL AND (title, id) < (?, ?)', [priority, title, task_id]),
+            ('priority < ?', [priority]),
+        ]
+    return [
+        ('priority = ? AND (due_date, title, id) < (?, ?, ?)', [priority, due_date, title, task_id]),
+        ('priority = ? AND due_date IS NULL', [priority]),
+        ('priority < ?', [priority]),
+    ]
+
+SEARCH_TOKEN = re.compile(r'[^\W_]+')
+
+# Searches matching more rows than this walk the sorted index instead of sorting every match
+SEARCH_SORT_LIMIT = 10000
+
+# tasks_fts has prefix indexes for prefixes up to this long (prefix='1 2 3')
+INDEXED_PREFIX_LENGTH = 3
+
+# Deleted tasks' rows in task_changes are kept for this many versions, then pruned
+CHANGE_LOG_KEEP = 10000
+
+def search_tokens(text):
+    # Approximates FTS5's unicode61 tokenizer: alphanumeric runs, case and accents folded
+    if not text.isascii():
+        text = ''.join(ch for ch in unicodedata.normalize('NFD', text) if not unicodedata.combining(ch))
+    return SEARCH_TOKEN.findall(text.casefold())
+
+def search_expression(text):
+    # Turns what the user typed into an FTS5 query: every word must match as a prefix
+    words = search_tokens(text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+@lru_cache(maxsize=64)
+def search_patterns(expression):
+    # One regex per '"prefix"*' term: the prefix at the start of an alphanumeric run
+    return tuple(
+        re.compile(r'(?:^|[\W_])' + re.escape(term[1:-2])) for term in expression.split()
+    )
+
+def title_matches_search(title, expression):
+    # Row-by-row twin of "tasks_fts MATCH expression", registered as search_match()
+    if title is None:
+        return 0
+    if not title.isascii():
+        title = ''.join(ch for ch in unicodedata.normalize('NFD', title) if not unicodedata.combining(ch))
+    title = title.casefold()
+    return all(pattern.search(title) for pattern in search_patterns(expression))
+
+def due_range_condition(first=None, last=None):
+    # "due_day BETWEEN first AND last" with either end optional; an index range scan
+    conditions = ['due_day IS NOT NULL']
+    params = []
+    if first is not None:
+        conditions.append('due_day >= ?')
+        params.append(epoch_day(first))
+    if last is not None:
+        conditions.append('due_day <= ?')
+        params.append(epoch_day(last))
+    return ' AND '.join(conditions), params
+
+def task_sort_key(task):
+    # Mirrors "ORDER BY priority, due_date, title, id": SQLite sorts NULL first, and
+    # any column but id can be NULL in rows written by older versions or other tools
+    task_id, title, priority, due_date, completed = task
+    return (priority is not None, priority or 0, due_date is not None, due_date or "",
+            title is not None, title or "", task_id)
+
+def page_key_sort_key(key):
+    # The task_sort_key of a get_tasks_page cursor
+    priority, due_date, title, task_id = key
+    return (priority is not None, priority or 0, due_date is not None, due_date or "",
+            title is not None, title or "", task_id)
+
+def migrate_create_tasks(cursor):
+    # Version 1: the tasks table. Databases from before the id column are rebuilt
+    # in place, keeping every row, instead of being renamed away.
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(tasks)")]
+    if columns and 'id' not in columns:
+        cursor.execute('ALTER TABLE tasks RENAME TO tasks_legacy')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT, 
+            priority INTEGER DEFAULT 2,
+            due_date TEXT,
+            completed INTEGER DEFAULT 0
+        )
+    ''')
+    
+    if columns and 'id' not in columns:
+        kept = [col for col in ('title', 'priority', 'due_date', 'completed') if col in columns]
+        if kept:
+            kept_list = ', '.join(kept)
+            cursor.execute(f'INSERT INTO tasks ({kept_list}) SELECT {kept_list} FROM tasks_legacy')
+        cursor.execute('DROP TABLE tasks_legacy')
+
+def migrate_add_indexes(cursor):
+    # Version 2: covering indexes for the filtered and unfiltered list queries.
+    # Both end in the rowid (id), so "ORDER BY priority, due_date, title, id" needs no sort.
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_tasks_completed_order '
+        'ON tasks (completed, priority, due_date, title)'
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_tasks_order '
+        'ON tasks (priority, due_date, title, id, completed)'
+    )
+
+def migrate_add_title_search(cursor):
+    # Version 3: external-content FTS5 index over tasks.title, kept in sync by triggers
+    cursor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts "
+        "USING fts5(title, content='tasks', content_rowid='id', prefix='1 2 3')"
+    )
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title);
+        END
+    ''')
+    cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+def migrate_add_change_log(cursor):
+    # Version 4: task_changes keeps, per task id, the version of its latest change.
+    # Any connection can then ask "what changed since version N" with one index seek.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_changes (
+            task_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_changes_version ON task_changes (version)')
+    for event, row in (('INSERT', 'new'), ('UPDATE', 'new'), ('DELETE', 'old')):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS tasks_log_{event.lower()} AFTER {event} ON tasks BEGIN
+                INSERT INTO task_changes (task_id, version)
+                VALUES ({row}.id, (SELECT IFNULL(MAX(version), 0) + 1 FROM task_changes))
+                ON CONFLICT (task_id) DO UPDATE SET version = excluded.version;
+            END
+        ''')
+
+def migrate_add_due_day(cursor):
+    # Version 5: rewrite parseable due dates as ISO text and index them as epoch days
+    # through a generated column; free-form text that can't be parsed is left alone
+    rewritten = []
+    for task_id, due_date in cursor.execute('SELECT id, due_date FROM tasks WHERE due_date IS NOT NULL').fetchall():
+        try:
+            normalized = normalize_due_date(due_date)
+        except ValueError:
+            continue
+        if normalized != due_date:
+            rewritten.append((normalized, task_id))
+    cursor.executemany('UPDATE tasks SET due_date = ? WHERE id = ?', rewritten)
+    
+    cursor.execute(
+        'ALTER TABLE tasks ADD COLUMN due_day INTEGER '
+        'GENERATED ALWAYS AS (CAST(julianday(due_date) - 2440587.5 AS INTEGER)) VIRTUAL'
+    )
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_due_day ON tasks (due_day)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_completed_due_day ON tasks (completed, due_day)')
+
+def migrate_add_change_log_floor(cursor):
+    # Version 6: rows of deleted tasks are pruned from task_changes (see prune_changes).
+    # The floor is the newest version pruned so far; a reader that last looked before
+    # it may have missed a deletion, and has to reload instead of syncing.
+    cursor.execute('CREATE TABLE IF NOT EXISTS task_changes_floor (version INTEGER NOT NULL)')
+    cursor.execute('INSERT INTO task_changes_floor (version) VALUES (0)')
+
+# MIGRATIONS[n] upgrades a database from user_version n to n + 1
+MIGRATIONS = [
+    migrate_create_tasks, migrate_add_indexes, migrate_add_title_search, migrate_add_change_log,
+    migrate_add_due_day, migrate_add_change_log_floor,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+class TaskDatabase:
+    def __init__(self, db_name='listOfTasks.db', wal=False, synchronous=None, cache=False, instrumentation=None,
+                 check_same_thread=True):
+        self.conn = sql.connect(db_name, check_same_thread=check_same_thread)
+        self.cursor = self.conn.cursor()
+        self.batch_depth = 0
+        self.search_plans = {}
+        self.term_counts = {}
+        
+        # Opt-in statement timing (see todo_instrumentation.py); when None nothing is hooked
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation.attach_database(self)
+        
+        # Optional in-memory copy of the table (see load_cache); None until first read
+        self.cache_enabled = cache
+        self.cache_rows = None
+        self.cache_order = None
+        self.cache_version = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_refetched = 0
+        self.conn.create_function('search_match', 2, title_matches_search, deterministic=True)
+        
+        # Opt-in: WAL lets readers run alongside a writer, and with
+        # synchronous=NORMAL a commit no longer waits for an fsync
+        if wal:
+            self.cursor.execute('PRAGMA journal_mode = WAL')
+        if synchronous is not None:
+            level = str(synchronous).upper()
+            if level not in SYNCHRONOUS_LEVELS:
+                raise ValueError(f"synchronous must be one of {', '.join(SYNCHRONOUS_LEVELS)}")
+            self.cursor.execute(f'PRAGMA synchronous = {level}')
+        
+        self.migrate()
+        self.data_version = self.read_data_version()
+
+    def commit(self):
+        # Inside batch() the commit is deferred to the end of the outermost block
+        if self.batch_depth == 0:
+            self.conn.commit()
+            self.sync_cache()
+
+    @contextmanager
+    def batch(self):
+        self.batch_depth += 1
+        try:
+            yield self
+        except:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.conn.rollback()
+            raise
+        self.batch_depth -= 1
+        if self.batch_depth == 0:
+            self.conn.commit()
+            self.sync_cache()
+
+    def read_data_version(self):
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def has_external_changes(self):
+        # PRAGMA data_version only moves when another connection commits, so this
+        # is a cheap way to notice other app instances and scripts
+        version = self.read_data_version()
+        if version == self.data_version:
+            return False
+        self.data_version = version
+        self.sync_cache()
+        return True
+
+    def change_version(self):
+        # Bumped by the task_changes triggers on every write, from any connection
+        return self.conn.execute('SELECT IFNULL(MAX(version), 0) FROM task_changes').fetchone()[0]
+
+    def change_floor(self):
+        return self.conn.execute('SELECT version FROM task_changes_floor').fetchone()[0]
+
+    def prune_changes(self, keep=CHANGE_LOG_KEEP):
+        # Drops the rows of deleted tasks more than keep versions old. The newest row
+        # always stays, so versions keep counting up. Runs once per keep versions.
+        cutoff = self.change_version() - keep
+        if cutoff < self.change_floor() + keep:
+            return 0
+        with self.batch():
+            self.cursor.execute(
+                'DELETE FROM task_changes WHERE version <= ? AND task_id NOT IN (SELECT id FROM tasks)', (cutoff,)
+            )
+            pruned = self.cursor.rowcount
+            self.cursor.execute('UPDATE task_changes_floor SET version = ?', (cutoff,))
+        return pruned
+
+    def load_cache(self):
+        # The cache queries run on their own cursors so that self.cursor.rowcount
+        # still describes the caller's last write after commit() syncs the cache
+        self.cache_misses += 1
+        self.cache_version = self.change_version()
+        ordered = self.conn.execute(
+            f'SELECT {TASK_COLUMNS} FROM tasks ORDER BY priority, due_date, title, id'
+        ).fetchall()
+        self.cache_rows = {task[0]: task for task in ordered}
+        self.cache_order = {
+            None: ordered,
+            0: [task for task in ordered if task[4] == 0],
+            1: [task for task in ordered if task[4] == 1],
+        }
+
+    def sync_cache(self):
+        # Re-fetches only the tasks logged in task_changes since the cache last looked
+        if self.cache_rows is None:
+            return
+        if self.cache_version < self.change_floor():
+            self.load_cache()  # deletions this cache hasn't seen may have been pruned
+            return
+        changes = self.conn.execute(
+            'SELECT task_id, version FROM task_changes WHERE version > ?', (self.cache_version,)
+        ).fetchall()
+        if not changes:
+            return
+        
+        self.cache_version = max(version for task_id, version in changes)
+        task_ids = [task_id for task_id, version in changes]
+        fresh = {
+            task[0]: task for task in self.conn.execute(
+                f'SELECT {TASK_COLUMNS} FROM tasks WHERE id IN (SELECT value FROM json_each(?))',
+                (json.dumps(task_ids),)
+            )
+        }
+        self.cache_refetched += len(fresh)
+        for task_id in task_ids:
+            self.cache_discard(task_id)
+            if task_id in fresh:
+                self.cache_insert(fresh[task_id])
+
+    def cache_insert(self, task):
+        self.cache_rows[task[0]] = task
+        key = task_sort_key(task)
+        for completed in {None, task[4]}:
+            if completed in self.cache_order:
+                order = self.cache_order[completed]
+                order.insert(bisect_left(order, key, key=task_sort_key), task)
+
+    def cache_discard(self, task_id):
+        task = self.cache_rows.pop(task_id, None)
+        if task is None:
+            return
+        key = task_sort_key(task)
+        for completed in {None, task[4]}:
+            if completed in self.cache_order:
+                order = self.cache_order[completed]
+                del order[bisect_left(order, key, key=task_sort_key)]
+
+    def cached_order(self, filter_completed=None, load=True):
+        # The cached sorted task list, or None when the cache can't answer.
+        # With load=False an empty cache stays empty instead of reading the table.
+        if not self.cache_enabled or self.batch_depth:
+            return None
+        if self.cache_rows is None:
+            if not load:
+                return None
+            self.load_cache()
+            self.data_version = self.read_data_version()
+        elif self.has_external_changes():
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+        return self.cache_order.get(filter_completed, [])
+
+    def warm_cache(self):
+        # Loads the cache ahead of the first read that needs it, e.g. right after the
+        # app has shown its first page; returns cache_stats()
+        if self.cache_rows is None:
+            self.cached_order()
+        return self.cache_stats()
+
+    def cache_stats(self):
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "refetched_rows": self.cache_refetched,
+            "cached_rows": len(self.cache_rows) if self.cache_rows is not None else 0,
+        }
+
+    def schema_version(self):
+        return self.cursor.execute('PRAGMA user_version').fetchone()[0]
+
+    def migrate(self):
+        version = self.schema_version()
+        if version > SCHEMA_VERSION:
+            raise sql.DatabaseError(
+                f"Database schema version {version} is newer than this app supports ({SCHEMA_VERSION})."
+            )
+        
+        # Each step runs in its own transaction together with its version bump.
+        # BEGIN IMMEDIATE waits for the write lock up front, and the version is re-read
+        # under it, so connections opening a new file at the same time take turns
+        while version < SCHEMA_VERSION:
+            try:
+                self.cursor.execute('BEGIN IMMEDIATE')
+                version = self.schema_version()
+                if version < SCHEMA_VERSION:
+                    MIGRATIONS[version](self.cursor)
+                    version += 1
+                    self.cursor.execute(f'PRAGMA user_version = {version}')
+                self.conn.commit()
+            except:
+                self.conn.rollback()
+                raise
+
+    def query_plan(self, query, params=()):
+        # EXPLAIN QUERY PLAN details, e.g. to confirm a query still uses a covering index
+        rows = self.cursor.execute('EXPLAIN QUERY PLAN ' + query, params).fetchall()
+        return [row[3] for row in rows]
+
+    def add_task(self, title, priority=2, due_date=None):
+        self.cursor.execute(
+            'INSERT INTO tasks (title, priority, due_date, completed) VALUES (?, ?, ?, ?)', 
+            (title, priority, normalize_due_date(due_date), 0)
+        )
+        self.commit()
+        return self.cursor.lastrowid
+
+    def toggle_completed(self, task_id):
+        # One atomic statement: no read-then-write window for another writer to slip into
+        self.cursor.execute(
+            "UPDATE tasks SET completed = 1 - IFNULL(completed, 0) WHERE id = ? RETURNING completed",
+            (task_id,)
+        )
+        result = self.cursor.fetchall()
+        self.commit()
+        return result[0][0] if result else None
+
+    def toggle_many(self, task_ids):
+        # Flips every given task in a single statement; returns [(id, new_status), ...]
+        # for the tasks that still exist
+        self.cursor.execute(
+            "UPDATE tasks SET completed = 1 - IFNULL(completed, 0) "
+            "WHERE id IN (SELECT value FROM json_each(?)) RETURNING id, completed",
+            (json.dumps(list(task_ids)),)
+        )
+        changes = self.cursor.fetchall()
+        self.commit()
+        return changes
+
+    def delete_task(self, task_id):
+        self.cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+        deleted = self.cursor.rowcount > 0
+        self.commit()
+        self.prune_changes()
+        return deleted
+
+    def delete_all_tasks(self):
+        self.cursor.execute('DELETE FROM tasks')
+        deleted = self.cursor.rowcount
+        self.commit()
+        self.prune_changes()
+        return deleted
+
+    def add_tasks(self, tasks):
+        # tasks: iterable of (title, priority, due_date) tuples, inserted in one transaction
+        with self.batch():
+            self.cursor.executemany(
+                'INSERT INTO tasks (title, priority, due_date, completed) VALUES (?, ?, ?, 0)',
+                ((title, priority, normalize_due_date(due_date)) for title, priority, due_date in tasks)
+            )
+            count = self.cursor.rowcount
+        return count
+
+    def import_tasks(self, tasks):
+        # tasks: iterable of (title, priority, due_date, completed); the caller picks the chunking
+        with self.batch():
+            self.cursor.executemany(
+                'INSERT INTO tasks (title, priority, due_date, completed) VALUES (?, ?, ?, ?)',
+                (
+                    (title, priority, stored_due_date(due_date), completed)
+                    for title, priority, due_date, completed in tasks
+                )
+            )
+            count = self.cursor.rowcount
+        return count
+
+    def set_completed_many(self, task_ids, completed=1):
+        with self.batch():
+            self.cursor.executemany(
+                'UPDATE tasks SET completed = ? WHERE id = ?',
+                ((completed, task_id) for task_id in task_ids)
+            )
+            count = self.cursor.rowcount
+        return count
+
+    def delete_many(self, task_ids):
+        # One DELETE for the whole selection; returns the ids that were actually deleted
+        self.cursor.execute(
+            "DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?)) RETURNING id",
+            (json.dumps(list(task_ids)),)
+        )
+        deleted = [row[0] for row in self.cursor.fetchall()]
+        self.commit()
+        self.prune_changes()
+        return deleted
+
+    def get_task(self, task_id):
+        if self.cached_order(load=False) is not None:
+            return self.cache_rows.get(task_id)
+        self.cursor.execute(
+            'SELECT id, title, priority, due_date, completed FROM tasks WHERE id = ?',
+            (task_id,)
+        )
+        return self.cursor.fetchone()
+
+    def get_tasks(self, filter_completed=None):
+        cached = self.cached_order(filter_completed)
+        if cached is not None:
+            return list(cached)
+        
+        query = 'SELECT id, title, priority, due_date, completed FROM tasks'
+        params = []
+        
+        if filter_completed is not None:
+            query += ' WHERE completed = ?'
+            params.append(filter_completed)
+            
+        query += ' ORDER BY priority, due_date, title, id'
+        
+        self.cursor.execute(query, params)
+        return self.cursor.fetchall()
+
+    def term_count(self, term):
+        # Titles matching one FTS5 term, counted up to SEARCH_SORT_LIMIT
+        if term not in self.term_counts:
+            if len(self.term_counts) >= 256:
+                self.term_counts.clear()
+            self.term_counts[term] = self.cursor.execute(
+                'SELECT count(*) FROM (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ? LIMIT ?)',
+                (term, SEARCH_SORT_LIMIT)
+            ).fetchone()[0]
+        return self.term_counts[term]
+
+    def prefix_count(self, term):
+        # term_count for a '"prefix"*' term. Counting a prefix longer than the prefix
+        # indexes merges the doclist of every word that starts with it, which takes
+        # milliseconds. fts5vocab instead lists those words one at a time with their
+        # title counts, and the sum can stop at SEARCH_SORT_LIMIT. A title with two of
+        # the words is counted twice, so the sum can only overestimate.
+        prefix = term[1:-2]
+        if len(prefix) <= INDEXED_PREFIX_LENGTH:
+            return self.term_count(term)
+        if term not in self.term_counts:
+            if len(self.term_counts) >= 256:
+                self.term_counts.clear()
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS temp.tasks_vocab USING fts5vocab(main, tasks_fts, 'row')"
+            )
+            total = 0
+            for (titles,) in self.conn.execute(
+                'SELECT doc FROM temp.tasks_vocab WHERE term >= ? AND term < ?', (prefix, prefix + '\U0010ffff')
+            ):
+                total += titles
+                if total >= SEARCH_SORT_LIMIT:
+                    break
+            self.term_counts[term] = total
+        return self.term_counts[term]
+
+    def has_rare_term(self, search):
+        # True when some '"prefix"*' term matches fewer than SEARCH_SORT_LIMIT titles.
+        # The whole word alone ('"report"') is a cheap lower bound, so common words are
+        # settled by that; the remaining terms get prefix_count, longest (usually
+        # rarest) first.
+        uncertain = [term for term in search.split() if self.term_count(term[:-1]) < SEARCH_SORT_LIMIT]
+        return any(self.prefix_count(term) < SEARCH_SORT_LIMIT for term in sorted(uncertain, key=len, reverse=True))
+
+    def search_condition(self, search):
+        # Few matches: collect them from the FTS index and sort them. Many matches:
+        # walk the sorted index and test titles, since a page fills up quickly.
+        # The rarest term bounds the match count and is much cheaper to count than
+        # the whole AND query.
+        if search not in self.search_plans:
+            if len(self.search_plans) >= 64:
+                self.search_plans.clear()
+            if self.has_rare_term(search):
+                self.search_plans[search] = (
+                    'id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)', [search]
+                )
+            else:
+                # A cheap substring test on ASCII titles skips most search_match() calls
+                prefilters = [
+                    '(instr(lower(title), ?) > 0 OR length(CAST(title AS BLOB)) != length(title))'
+                    for term in search.split()
+                ]
+                self.search_plans[search] = (
+                    ' AND '.join(prefilters + ['search_match(title, ?)']),
+                    [term[1:-2] for term in search.split()] + [search]
+                )
+        return self.search_plans[search]
+
+    def iter_tasks(self, filter_completed=None, chunk_size=1000):
+        # Streams every task in id order through its own cursor, chunk_size rows at a time
+        query = f'SELECT {TASK_COLUMNS} FROM tasks'
+        params = []
+        if filter_completed is not None:
+            query += ' WHERE completed = ?'
+            params.append(filter_completed)
+        query += ' ORDER BY id'
+        
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def due_between(self, first, last, filter_completed=None):
+        # Tasks due from first to last inclusive (dates, ISO strings or epoch days),
+        # in the usual priority/due_date order
+        condition, params = due_range_condition(first, last)
+        if filter_completed is not None:
+            condition += ' AND completed = ?'
+            params.append(filter_completed)
+        self.cursor.execute(
+            f'SELECT {TASK_COLUMNS} FROM tasks WHERE {condition} ORDER BY priority, due_date, title, id',
+            params
+        )
+        return self.cursor.fetchall()
+
+    def overdue(self, today=None):
+        # Active tasks whose due date has passed
+        today = epoch_day(today or date.today())
+        return self.due_between(None, today - 1, filter_completed=0)
+
+    def due_within(self, days, today=None, filter_completed=0):
+        # Tasks due from today up to and including today + days
+        today = epoch_day(today or date.today())
+        return self.due_between(today, today + days, filter_completed)
+
+    def get_tasks_page(self, after_key=None, limit=100, filter_completed=None, before_key=None,
+                       search=None, inclusive=False, due_range=None):
+        # Keyset pagination: every page is a few index seeks, however deep it is.
+        # Pages forward from after_key (including it when inclusive), or backward from
+        # before_key when only that is given.
+        # search is an FTS5 query (see search_expression) restricting the titles, and
+        # due_range an inclusive (first, last) pair of epoch days, either end open.
+        backwards = before_key is not None and after_key is None
+        
+        # A page is a few index seeks, so it never waits for the whole table to load
+        cached = self.cached_order(filter_completed, load=False) if search is None and due_range is None else None
+        if cached is not None:
+            start, stop = 0, len(cached)
+            if after_key is not None:
+                find = bisect_left if inclusive else bisect_right
+                start = find(cached, page_key_sort_key(after_key), key=task_sort_key)
+            if before_key is not None:
+                stop = bisect_left(cached, page_key_sort_key(before_key), key=task_sort_key)
+            if backwards:
+                return cached[max(start, stop - limit):stop]
+            return cached[start:min(stop, start + limit)]
+        
+        base_conditions = []
+        base_params = []
+        
+        if filter_completed is not None:
+            base_conditions.append('completed = ?')
+            base_params.append(filter_completed)
+        if search is not None:
+            condition, search_params = self.search_condition(search)
+            base_conditions.append(condition)
+            base_params.extend(search_params)
+        if due_range is not None:
+            condition, due_params = due_range_condition(*due_range)
+            base_conditions.append(condition)
+            base_params.extend(due_params)
+        if before_key is not None and not backwards:
+            condition, key_params = keyset_condition(before_key, after=False)
+            base_conditions.append(condition)
+            base_params.extend(key_params)
+        
+        if backwards:
+            fragments = keyset_fragments(before_key, after=False)
+            order = 'priority DESC, due_date DESC, title DESC, id DESC'
+        elif after_key is not None:
+            fragments = keyset_fragments(after_key, after=True, inclusive=inclusive)
+            order = 'priority, due_date, title, id'
+        else:
+            fragments = [(None, [])]
+            order = 'priority, due_date, title, id'
+        
+        rows = []
+        for condition, key_params in fragments:
+            conditions = base_conditions + ([condition] if condition else [])
+            query = f'SELECT {TASK_COLUMNS} FROM tasks'
+            if conditions:
+                query += ' WHERE ' + ' AND '.join(conditions)
+            query += f' ORDER BY {order} LIMIT ?'
+            
+            self.cursor.execute(query, base_params + key_params + [limit - len(rows)])
+            rows.extend(self.cursor.fetchall())
+            if len(rows) >= limit:
+                break
+        
+        # Paging backwards walks the index in reverse, then flips the page
+        if backwards:
+            rows.reverse()
+        return rows
+
+    def close(self):
+        self.conn.close()
+        if self.instrumentation is not None:
+            self.instrumentation.dump()
+
+# What TaskDatabasePool (and the HTTP server on top of it) lets callers run
+READ_METHODS = frozenset({
+    'get_task', 'get_tasks', 'get_tasks_page', 'due_between', 'overdue', 'due_within',
+    'schema_version', 'change_version',
+})
+WRITE_METHODS = frozenset({
+    'add_task', 'toggle_completed', 'toggle_many', 'delete_task', 'delete_all_tasks', 'add_tasks',
+    'import_tasks', 'set_completed_many', 'delete_many',
+})
+
+class TaskDatabasePool:
+    # Shares one database file between threads. Each thread gets its own TaskDatabase
+    # (connection, cursor, search plans), all in WAL mode so reads run side by side;
+    # writes take write_lock so only one thread is ever inside a write transaction.
+    # Needs a real file: every ':memory:' connection would be a separate database.
+    def __init__(self, db_name='listOfTasks.db', synchronous='NORMAL'):
+        self.db_name = db_name
+        self.synchronous = synchronous
+        self.local = threading.local()
+        self.write_lock = threading.Lock()
+        self.databases = []
+        self.databases_lock = threading.Lock()
+        
+        # Opening the first connection here runs any migrations before other threads arrive
+        self.database()
+
+    def database(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = TaskDatabase(self.db_name, wal=True, synchronous=self.synchronous, check_same_thread=False)
+            self.local.db = db
+            with self.databases_lock:
+                self.databases.append(db)
+        return db
+
+    def call_logged(self, method, *args, **kwargs):
+        # A write method in one BEGIN IMMEDIATE transaction, so no other connection can
+        # write in between: (result, [before, after]), the task_changes versions it produced
+        if method not in WRITE_METHODS:
+            raise AttributeError(f"{method!r} is not a TaskDatabasePool write method")
+        with self.write_lock:
+            db = self.database()
+            with db.batch():
+                if not db.conn.in_transaction:
+                    db.cursor.execute('BEGIN IMMEDIATE')
+                before = db.change_version()
+                result = getattr(db, method)(*args, **kwargs)
+                after = db.change_version()
+            return result, [before, after]
+
+    def call(self, method, *args, **kwargs):
+        if method in WRITE_METHODS:
+            with self.write_lock:
+                return getattr(self.database(), method)(*args, **kwargs)
+        if method in READ_METHODS:
+            return getattr(self.database(), method)(*args, **kwargs)
+        raise AttributeError(f"TaskDatabasePool has no method {method!r}")
+
+    def __getattr__(self, name):
+        if name in READ_METHODS or name in WRITE_METHODS:
+            return partial(self.call, name)
+        raise AttributeError(name)
+
+    def connection_count(self):
+        return len(self.databases)
+
+    def close(self):
+        with self.databases_lock:
+            for db in self.databases:
+                db.close()
+            self.databases = []
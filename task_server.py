@@ -0,0 +1,184 @@
+# Local HTTP/JSON service so several people (or app windows) can share one task store.
+#
+#   python task_server.py --db listOfTasks.db --port 8765
+#   TODO_SERVER=http://127.0.0.1:8765 python todo_app.py
+#
+# Every TaskDatabase method in READ_METHODS / WRITE_METHODS is one endpoint:
+#   POST /api/<method>   {"args": [...], "kwargs": {...}}   ->   {"result": ...}
+# Write methods also return "versions": [before, after], the task_changes versions the
+# write itself produced, so a client can tell its own changes from everyone else's.
+# Errors come back as {"error": message, "type": exception name} with a 4xx/5xx status.
+
+import argparse
+import json
+import sqlite3 as sql
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from task_database import READ_METHODS, WRITE_METHODS, TaskDatabasePool
+
+# Rows travel as JSON arrays; the client turns them back into tuples like sqlite3 returns
+ROW_RESULTS = {"get_task"}
+ROW_LIST_RESULTS = {"get_tasks", "get_tasks_page", "due_between", "overdue", "due_within", "toggle_many"}
+REMOTE_ERRORS = {"ValueError": ValueError, "TypeError": TypeError}
+
+class TaskServerError(Exception):
+    """The task server could not be reached, or sent back something that isn't a reply"""
+
+class TaskRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.0: one request per connection, so a slow client can't hold a worker thread
+    server_version = "TaskServer/1.0"
+
+    def do_POST(self):
+        method = self.path.rstrip("/").rsplit("/", 1)[-1]
+        if not self.path.startswith("/api/") or method not in READ_METHODS | WRITE_METHODS:
+            self.send_json(404, {"error": f"unknown method {method!r}", "type": "LookupError"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise TypeError("the request body must be a JSON object")
+            args, kwargs = body.get("args", []), body.get("kwargs", {})
+            if method in WRITE_METHODS:
+                result, versions = self.server.pool.call_logged(method, *args, **kwargs)
+                payload = {"result": result, "versions": versions}
+            else:
+                payload = {"result": self.server.pool.call(method, *args, **kwargs)}
+        except (ValueError, TypeError) as error:
+            self.send_json(400, {"error": str(error), "type": type(error).__name__})
+        except sql.Error as error:
+            self.send_json(500, {"error": str(error), "type": type(error).__name__})
+        else:
+            self.send_json(200, payload)
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class TaskServer(HTTPServer):
+    # A fixed set of worker threads instead of a thread per request, so the
+    # pool never holds more than `threads` SQLite connections
+    def __init__(self, address, db_name="listOfTasks.db", threads=8, verbose=False):
+        self.pool = TaskDatabasePool(db_name)
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="task-server")
+        self.verbose = verbose
+        super().__init__(address, TaskRequestHandler)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+        self.pool.close()
+
+class RemoteTaskDatabase:
+    # Stands in for TaskDatabase inside DatabaseWorker when the app uses a server
+    # With instrumentation, every call is timed as "POST /api/<method>" alongside the SQL
+    # statements a local database would report.
+    def __init__(self, url="http://127.0.0.1:8765", timeout=10, instrumentation=None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.instrumentation = instrumentation
+        # Also checks the server is there before the window starts asking for pages
+        self.seen_version = self.change_version()
+
+    def call(self, method, *args, **kwargs):
+        request = urllib.request.Request(
+            f"{self.url}/api/{method}",
+            data=json.dumps({"args": args, "kwargs": kwargs}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                reply = json.load(response)
+            result = reply["result"]
+        except urllib.error.HTTPError as error:
+            try:
+                details = json.load(error)
+                message = details["error"]
+            except (ValueError, KeyError, TypeError, OSError):
+                raise TaskServerError(f"the task server at {self.url} answered {error.code} {error.reason}") from None
+            raise REMOTE_ERRORS.get(details.get("type"), RuntimeError)(message) from None
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            # URLError (refused, unknown host), timeouts and dropped connections are all OSErrors
+            reason = getattr(error, "reason", error)
+            raise TaskServerError(f"could not reach the task server at {self.url}: {reason}") from None
+        finally:
+            if self.instrumentation is not None:
+                self.instrumentation.record(self.instrumentation.sql, f"POST /api/{method}",
+                                            time.perf_counter() - start)
+
+        # Our own write moved the change log from before to after; if nobody else had
+        # written since we last looked, that isn't an external change
+        versions = reply.get("versions")
+        if versions and versions[0] == self.seen_version:
+            self.seen_version = versions[1]
+
+        if method in ROW_RESULTS and result is not None:
+            return tuple(result)
+        if method in ROW_LIST_RESULTS:
+            return [tuple(row) for row in result]
+        return result
+
+    def __getattr__(self, name):
+        if name in READ_METHODS or name in WRITE_METHODS:
+            return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+        raise AttributeError(name)
+
+    def has_external_changes(self):
+        # data_version is per connection, so remotely the shared change log decides
+        version = self.change_version()
+        if version == self.seen_version:
+            return False
+        self.seen_version = version
+        return True
+
+    def close(self):
+        if self.instrumentation is not None:
+            self.instrumentation.dump()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a to-do list database over local HTTP/JSON")
+    parser.add_argument("--db", default="listOfTasks.db", help="database file (default: listOfTasks.db)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port, 0 picks a free one (default: 8765)")
+    parser.add_argument("--threads", type=int, default=8, help="worker threads / pooled connections")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = TaskServer((args.host, args.port), args.db, args.threads, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving {args.db} on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping", file=sys.stderr)
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
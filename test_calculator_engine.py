@@ -0,0 +1,30 @@
+# Powers stay real: where Python's ** would hand back a complex number, every
+# way of evaluating an expression raises the same ValueError as math.sqrt(-1).
+# Run with: python -m pytest
+
+import pytest
+
+from calculator_batch import evaluate_lines
+from calculator_engine import CompiledExpression, evaluate
+
+@pytest.mark.parametrize("mode", ["code", "closures"])
+@pytest.mark.parametrize("text, variables", [
+    ("x ^ 0.5", {"x": -8}),
+    ("(-8) ^ 0.5", {}),
+    ("(-e) ^ (-e)", {}),
+    ("x ** (1 / 3)", {"x": -27}),
+])
+def test_complex_powers_are_domain_errors(mode, text, variables):
+    with pytest.raises(ValueError, match="math domain error"):
+        CompiledExpression(text, mode)(variables)
+
+def test_real_powers_still_work():
+    assert evaluate("x ^ 2", x=-3) == 9
+    assert evaluate("(-8) ^ 3") == -512
+    assert evaluate("2 ^ 3 ^ 2") == 512
+    assert evaluate("x ^ 0.5", x=16) == 4
+
+def test_batch_lines_report_domain_errors():
+    output, errors = evaluate_lines(["(-e)^(-e)", "2 ^ 0.5", "(-8) ^ 0.5"])
+    assert output == ["Error! math domain error", repr(2 ** 0.5), "Error! math domain error"]
+    assert errors == [(0, "math domain error"), (2, "math domain error")]
@@ -0,0 +1,58 @@
+# Statistical checks on generated passwords: every character of the alphabet
+# should be equally likely, and policy passwords should never break the policy.
+# Each p-value has a 1 in 10,000 chance of falling under the threshold by luck;
+# a biased generator drives it to about 0 at these sample sizes.
+# Run with: python -m pytest
+
+import random
+from collections import Counter
+
+import pytest
+
+from password_bulk import characters_for, random_characters
+from password_policy import PasswordPolicy, chi_square_p_value, uniformity_report
+
+P_THRESHOLD = 1e-4
+CHARACTER_SAMPLES = 200000
+POLICY_SAMPLES = 10000
+
+def test_chi_square_spots_bias():
+    assert chi_square_p_value([1000] * 10) > 0.99
+    assert chi_square_p_value([1300] + [1000] * 9) < P_THRESHOLD
+
+@pytest.mark.parametrize("characters", [characters_for(choice) for choice in "12345"] + ["0123456", "abc"])
+def test_random_characters_are_uniform(characters):
+    # Alphabet sizes that don't divide 256 are where a modulo bias would show up
+    drawn = random_characters(CHARACTER_SAMPLES, characters, random.Random(17).randbytes)
+    assert len(drawn) == CHARACTER_SAMPLES
+    counts = Counter(drawn.decode("ascii"))
+    assert set(counts) <= set(characters)
+    assert chi_square_p_value([counts[char] for char in characters]) > P_THRESHOLD
+
+@pytest.mark.parametrize("policy", [
+    PasswordPolicy(16),
+    PasswordPolicy(12, min_lowercase=1, min_uppercase=1, min_numbers=2, min_special=2),
+    PasswordPolicy(10, min_numbers=3, exclude_ambiguous=True, max_repeats=1),
+    PasswordPolicy(8, characters="abcdef0123456789", min_numbers=4),
+], ids=["plain", "minimums", "no-ambiguous-no-repeats", "custom-alphabet"])
+def test_policy_passwords_are_valid_and_uniform(policy):
+    report = uniformity_report(policy, POLICY_SAMPLES)
+    assert report["violations"] == 0
+    assert report["characters_p"] and report["positions_p"]
+    for kind in ("characters_p", "positions_p"):
+        for name, p_value in report[kind].items():
+            assert p_value > P_THRESHOLD, (kind, name, p_value)
+
+@pytest.mark.parametrize("length, minimums, max_repeats, characters", [
+    (6, {"min_numbers": 1}, 1, "a1"),
+    (8, {"min_numbers": 2}, 2, "ab1"),
+])
+def test_unbreakable_runs_are_rejected(length, minimums, max_repeats, characters):
+    # One number to choose from: a required number slot could never break a run of it
+    with pytest.raises(ValueError, match="at least 2 numbers characters"):
+        PasswordPolicy(length, max_repeats=max_repeats, characters=characters, **minimums)
+
+def test_max_repeats_with_small_classes_always_generates():
+    policy = PasswordPolicy(8, min_numbers=2, max_repeats=1, characters="ab12")
+    for i in range(5000):
+        assert not policy.violations(policy.generate())
@@ -0,0 +1,104 @@
+# The list queries must keep reading rows straight from a covering index, in
+# order: no table lookups and no temporary B-tree to sort them. The optional
+# in-memory cache must answer exactly what the table would, writes included.
+# Run with: python -m pytest
+
+import pytest
+
+from task_database import TaskDatabase, task_page_key
+
+@pytest.fixture
+def db(tmp_path):
+    database = TaskDatabase(str(tmp_path / 'tasks.db'))
+    database.add_tasks([(f'Task {number}', number % 3 + 1, f'2026-01-{number % 28 + 1:02d}' if number % 4 else None)
+                        for number in range(200)])
+    yield database
+    database.close()
+
+def executed_selects(db, call):
+    """The SELECT statements, with their parameters filled in, that call() runs against db"""
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        db.conn.set_trace_callback(None)
+    return [statement for statement in statements if statement.lstrip().upper().startswith('SELECT')]
+
+def assert_covered_and_ordered(db, call):
+    selects = executed_selects(db, call)
+    assert selects
+    for query in selects:
+        plan = ' | '.join(db.query_plan(query))
+        assert 'USING COVERING INDEX' in plan, (query, plan)
+        assert 'USE TEMP B-TREE' not in plan, (query, plan)
+
+@pytest.mark.parametrize('filter_completed', [None, 0, 1])
+def test_get_tasks_uses_covering_index(db, filter_completed):
+    assert_covered_and_ordered(db, lambda: db.get_tasks(filter_completed))
+
+@pytest.mark.parametrize('filter_completed', [None, 0, 1])
+def test_first_page_uses_covering_index(db, filter_completed):
+    assert_covered_and_ordered(db, lambda: db.get_tasks_page(limit=20, filter_completed=filter_completed))
+
+@pytest.mark.parametrize('position', [0, 5, 150])
+def test_later_pages_use_covering_index(db, position):
+    # Row 0 has no due date and row 5 has one: the two shapes keyset_fragments builds
+    key = task_page_key(db.get_tasks()[position])
+    assert_covered_and_ordered(db, lambda: db.get_tasks_page(after_key=key, limit=20))
+    assert_covered_and_ordered(db, lambda: db.get_tasks_page(before_key=key, limit=20))
+
+@pytest.fixture
+def cached_db(tmp_path):
+    database = TaskDatabase(str(tmp_path / 'tasks.db'), cache=True)
+    database.add_tasks([(f'Task {number}', number % 3 + 1, None) for number in range(20)])
+    yield database
+    database.close()
+
+def table_order(db):
+    return db.conn.execute(
+        'SELECT id, title, priority, due_date, completed FROM tasks ORDER BY priority, due_date, title, id'
+    ).fetchall()
+
+def test_cache_counts_hits_and_misses(cached_db):
+    # Pages don't load the cache; the first full read does, later reads are hits
+    cached_db.get_tasks_page(limit=5)
+    assert cached_db.cache_stats()['cached_rows'] == 0
+    assert cached_db.get_tasks() == table_order(cached_db)
+    assert cached_db.get_tasks_page(limit=5) == table_order(cached_db)[:5]
+    cached_db.get_task(1)
+    assert cached_db.cache_stats() == {'hits': 2, 'misses': 1, 'refetched_rows': 0, 'cached_rows': 20}
+
+def test_cache_keeps_write_return_values(cached_db):
+    cached_db.warm_cache()
+    assert cached_db.add_tasks([('New', 1, None), ('Newer', 2, None)]) == 2
+    assert cached_db.set_completed_many([1, 2, 3]) == 3
+    assert cached_db.delete_task(1) is True
+    assert cached_db.delete_task(1) is False
+    assert cached_db.get_tasks() == table_order(cached_db)
+    assert cached_db.delete_all_tasks() == 21
+    assert cached_db.get_tasks() == []
+
+def test_cache_sees_other_connections(cached_db, tmp_path):
+    cached_db.warm_cache()
+    other = TaskDatabase(str(tmp_path / 'tasks.db'))
+    try:
+        new_id = other.add_task('Written elsewhere', 1, '2026-03-01')
+        other.toggle_completed(2)
+        other.delete_task(3)
+    finally:
+        other.close()
+    
+    tasks = cached_db.get_tasks()
+    assert tasks == table_order(cached_db)
+    assert new_id in {task[0] for task in tasks} and 3 not in {task[0] for task in tasks}
+    assert cached_db.get_tasks(1) == [task for task in tasks if task[4] == 1]
+    stats = cached_db.cache_stats()
+    assert stats['refetched_rows'] == 2  # the new and the toggled task; the deleted one is just dropped
+    assert stats['misses'] == 2 and stats['hits'] == 1
+
+@pytest.mark.parametrize('term', ['"task"*', '"task1"*', '"1"*', '"12"*', '"nothing"*'])
+def test_prefix_count_never_undercounts(db, term):
+    # The planner may overestimate a prefix, never underestimate it
+    exact = db.conn.execute('SELECT count(*) FROM tasks_fts WHERE tasks_fts MATCH ?', (term,)).fetchone()[0]
+    assert db.prefix_count(term) >= exact
@@ -1,92 +1,177 @@
 from tkinter import *
 from tkinter import messagebox, ttk
-import sqlite3 as sql
+from bisect import bisect_left
+from concurrent.futures import Future
+from datetime import date
+from time import perf_counter
 import os
+import queue
+import threading
 
-class TaskDatabase:
-    def __init__(self, db_name='listOfTasks.db'):
-        if os.path.exists(db_name):
+from task_database import (
+    TaskDatabase, due_epoch_day, epoch_day, normalize_due_date, search_expression, task_page_key,
+    task_sort_key, title_matches_search
+)
+
+class DatabaseWorker:
+    # Owns the TaskDatabase on a background thread so the Tk loop never waits on SQLite.
+    # Requests go through a queue; results come back through poll(), which the GUI
+    # calls from root.after. Requests sharing a key are coalesced: a newer one cancels
+    # the older one if it has not started, and drops its result if it has.
+    # backend builds the database object; RemoteTaskDatabase talks to task_server.py instead.
+    # on_error(method, error) gets every failed request (method "open" if the database
+    # itself could not be opened); without it, poll() raises the error.
+    def __init__(self, *db_args, backend=TaskDatabase, on_error=None, **db_kwargs):
+        self.backend = backend
+        self.on_error = on_error
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.latest = {}
+        self.ready = Future()
+        self.ready_checked = False
+        
+        # UI-thread cost of delivering results, and how late the poll loop ran
+        self.ui_events = 0
+        self.ui_max_event_seconds = 0.0
+        self.ui_max_poll_lag_seconds = 0.0
+        
+        self.thread = threading.Thread(target=self.run, args=(db_args, db_kwargs), daemon=True)
+        self.thread.start()
+
+    def run(self, db_args, db_kwargs):
+        try:
+            db = self.backend(*db_args, **db_kwargs)
+        except BaseException as error:
+            self.ready.set_exception(error)
+            return
+        self.ready.set_result(True)
+        
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            future, method, args, kwargs, callback, key = request
+            if not future.set_running_or_notify_cancel():
+                continue
             try:
-                conn = sql.connect(db_name)
-                cursor = conn.cursor()
-                try:
-                    cursor.execute("SELECT id FROM tasks LIMIT 1")
-                    conn.close()
-                except sql.OperationalError:
-                    conn.close()
-                    if os.path.exists(db_name + '.backup'):
-                        os.remove(db_name + '.backup')
-                    os.rename(db_name, db_name + '.backup')
-                    print(f"Old database format detected. Renamed to {db_name}.backup and creating new database.")
-            except:
-                pass
-        
-        self.conn = sql.connect(db_name)
-        self.cursor = self.conn.cursor()
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT, 
-                priority INTEGER DEFAULT 2,
-                due_date TEXT,
-                completed INTEGER DEFAULT 0
-            )
-        ''')
-        self.conn.commit()
-
-    def add_task(self, title, priority=2, due_date=None):
-        self.cursor.execute(
-            'INSERT INTO tasks (title, priority, due_date, completed) VALUES (?, ?, ?, ?)', 
-            (title, priority, due_date, 0)
-        )
-        self.conn.commit()
-        return self.cursor.lastrowid
-
-    def toggle_completed(self, task_id):
-        self.cursor.execute("SELECT completed FROM tasks WHERE id = ?", (task_id,))
-        result = self.cursor.fetchone()
-        if not result:
-            return None
+                future.set_result(getattr(db, method)(*args, **kwargs))
+            except BaseException as error:
+                future.set_exception(error)
+            self.results.put(request)
+        
+        db.close()
+
+    def submit(self, method, *args, callback=None, key=None, **kwargs):
+        future = Future()
+        if key is not None:
+            stale = self.latest.get(key)
+            if stale is not None:
+                stale.cancel()
+            self.latest[key] = future
+        self.requests.put((future, method, args, kwargs, callback, key))
+        return future
+
+    def poll(self):
+        # Runs finished requests' callbacks; must be called from the GUI thread
+        if not self.ready_checked and self.ready.done():
+            self.ready_checked = True
+            if self.ready.exception() is not None:
+                self.report_error("open", self.ready.exception())
+        
+        while True:
+            try:
+                future, method, args, kwargs, callback, key = self.results.get_nowait()
+            except queue.Empty:
+                return
+            
+            if key is not None:
+                if self.latest.get(key) is not future:
+                    continue
+                del self.latest[key]
             
-        current_status = result[0]
-        new_status = 0 if current_status else 1
-        self.cursor.execute("UPDATE tasks SET completed = ? WHERE id = ?", (new_status, task_id))
-        self.conn.commit()
-        return new_status
+            start = perf_counter()
+            error = future.exception()
+            if error is not None:
+                self.report_error(method, error)
+            elif callback is not None:
+                callback(future.result())
+            elapsed = perf_counter() - start
+            
+            self.ui_events += 1
+            self.ui_max_event_seconds = max(self.ui_max_event_seconds, elapsed)
 
-    def delete_task(self, task_id):
-        self.cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-        self.conn.commit()
+    def report_error(self, method, error):
+        if self.on_error is None:
+            raise error
+        self.on_error(method, error)
 
-    def delete_all_tasks(self):
-        self.cursor.execute('DELETE FROM tasks')
-        self.conn.commit()
+    def pending(self, key):
+        return key in self.latest
 
-    def get_tasks(self, filter_completed=None):
-        query = 'SELECT id, title, priority, due_date, completed FROM tasks'
-        params = []
-        
-        if filter_completed is not None:
-            query += ' WHERE completed = ?'
-            params.append(filter_completed)
-            
-        query += ' ORDER BY priority, due_date, title'
-        
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+    def record_poll_lag(self, seconds):
+        self.ui_max_poll_lag_seconds = max(self.ui_max_poll_lag_seconds, seconds)
 
-    def close(self):
-        self.conn.close()
+    def latency_report(self):
+        return {
+            "events": self.ui_events,
+            "max_event_ms": self.ui_max_event_seconds * 1000,
+            "max_poll_lag_ms": self.ui_max_poll_lag_seconds * 1000,
+        }
+
+    def close(self, timeout=None):
+        # Queued writes still run before the worker closes the connection
+        self.requests.put(None)
+        self.thread.join(timeout)
 
 class TaskManager:
-    def __init__(self, root):
-        self.db = TaskDatabase()
+    # The Treeview only ever holds a sliding window of rows; pages are fetched as the user scrolls
+    PAGE_SIZE = 100
+    MAX_LOADED_ROWS = 400
+    PREFETCH_MARGIN = 0.2
+    POLL_INTERVAL_MS = 15
+    SEARCH_DELAY_MS = 150
+    EXTERNAL_CHECK_MS = 1000
+    # Tk callbacks and worker callbacks timed when instrumentation is on
+    TIMED_CALLBACKS = ("add_task", "filter_tasks", "update_listbox", "toggle_selected_task", "delete_task",
+                       "delete_all_tasks", "run_search", "on_tree_scroll", "show_first_page", "append_page",
+                       "prepend_page", "apply_task", "remove_tasks", "sync_tasks")
+
+    def __init__(self, root, instrumentation=None, server_url=None):
+        self.root = root
+        # Wrap before any widget binds a command, so the buttons get the timed versions
+        if instrumentation is not None:
+            instrumentation.wrap_methods(self, self.TIMED_CALLBACKS)
+        if server_url:
+            # Shared task store: same requests, answered by task_server.py
+            from task_server import RemoteTaskDatabase
+            self.db = DatabaseWorker(server_url, backend=RemoteTaskDatabase, instrumentation=instrumentation,
+                                     on_error=self.show_database_error)
+        else:
+            # The in-memory cache answers page turns and full reads without SQLite
+            self.db = DatabaseWorker(cache=True, instrumentation=instrumentation, on_error=self.show_database_error)
+        self.last_error_message = None
+        self.showing_error = False
         self.tasks = []
-        self.task_ids = []
+        self.task_rows = {}
+        self.more_before = False
+        self.more_after = False
+        self.page_check_pending = False
+        self.search = None
+        self.search_after_id = None
+        self.priority_names = {1: "High", 2: "Medium", 3: "Low"}
+        
+        # Ask for the first page before building any widgets: the worker opens the
+        # database and runs the query while Tk lays out the window, and poll() only
+        # delivers the rows once mainloop is running, i.e. after the first paint
+        self.filter_completed = None
+        self.due_range = None
+        self.retrieve_database()
+        if not server_url:
+            # Queued behind the first page, so filling the cache never delays it
+            self.db.submit('warm_cache')
         
         root.title("Enhanced To-Do List")
-        root.geometry("800x500+550+250")
+        root.geometry("800x540+550+250")
         root.resizable(0, 0)
         root.configure(bg="#F0F8FF")
         
@@ -105,9 +190,35 @@ class TaskManager:
         self.create_task_list(root)
         self.create_buttons(root)
         
-        self.filter_completed = None
-        self.retrieve_database()
-        self.update_listbox()
+        root.protocol("WM_DELETE_WINDOW", self.close)
+        self.last_poll = perf_counter()
+        root.after(self.POLL_INTERVAL_MS, self.poll_worker)
+        root.after(self.EXTERNAL_CHECK_MS, self.check_external_changes)
+
+    def poll_worker(self):
+        now = perf_counter()
+        self.db.record_poll_lag(now - self.last_poll - self.POLL_INTERVAL_MS / 1000)
+        try:
+            self.db.poll()
+        finally:
+            # Keep delivering results even if a callback failed
+            self.last_poll = perf_counter()
+            self.root.after(self.POLL_INTERVAL_MS, self.poll_worker)
+
+    def show_database_error(self, method, error):
+        if method == "open":
+            message = f"Could not open the task database: {error}"
+        else:
+            message = f"Could not complete the request ({method}): {error}"
+        # The background checks repeat every second: don't stack up identical dialogs
+        if self.showing_error or message == self.last_error_message:
+            return
+        self.last_error_message = message
+        self.showing_error = True
+        try:
+            messagebox.showerror('Error', message)
+        finally:
+            self.showing_error = False
 
     def create_header(self, parent):
         Label(
@@ -181,19 +292,34 @@ class TaskManager:
         
         self.status_filter = ttk.Combobox(
             filter_frame,
-            values=["All", "Active", "Completed"],
+            values=["All", "Active", "Completed", "Overdue", "This week"],
             width=10
         )
         self.status_filter.pack(side=LEFT, padx=5)
         self.status_filter.current(0)
         self.status_filter.bind("<<ComboboxSelected>>", self.filter_tasks)
+        
+        Label(
+            input_frame,
+            text="Search:",
+            font=("Arial", "12", "bold"),
+            bg=self.colors["bg"]
+        ).grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        
+        self.search_entry = Entry(
+            input_frame,
+            font=("Arial", "12"),
+            width=40
+        )
+        self.search_entry.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
 
     def create_task_list(self, parent):
         list_frame = Frame(parent, bg=self.colors["bg"], pady=10)
         list_frame.pack(fill="both", expand=True, padx=20)
         
         columns = ("Title", "Priority", "Due Date", "Status")
-        self.task_tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=12)
+        self.task_tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=10)
         
         for col in columns:
             self.task_tree.heading(col, text=col)
@@ -203,13 +329,19 @@ class TaskManager:
         self.task_tree.column("Due Date", width=150)
         self.task_tree.column("Status", width=100)
         
-        scrollbar = ttk.Scrollbar(list_frame, orient=VERTICAL, command=self.task_tree.yview)
-        self.task_tree.configure(yscroll=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(list_frame, orient=VERTICAL, command=self.task_tree.yview)
+        self.task_tree.configure(yscroll=self.on_tree_scroll)
         
-        scrollbar.pack(side=RIGHT, fill=Y)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
         self.task_tree.pack(fill=BOTH, expand=True)
         
         self.task_tree.bind("<Double-1>", self.toggle_task_completion)
+        
+        # Configure row colours once instead of once per inserted row
+        self.task_tree.tag_configure("completed", background=self.colors["completed"])
+        self.task_tree.tag_configure("priority_1", background=self.colors["high_priority"])
+        self.task_tree.tag_configure("priority_2", background=self.colors["medium_priority"])
+        self.task_tree.tag_configure("priority_3", background=self.colors["low_priority"])
 
     def create_buttons(self, parent):
         button_frame = Frame(parent, bg=self.colors["bg"], pady=10)
@@ -267,66 +399,71 @@ class TaskManager:
         priority_map = {"High": 1, "Medium": 2, "Low": 3}
         priority = priority_map.get(priority_text, 2)
         
-        if due_date == "YYYY-MM-DD (Optional)":
+        if due_date == "YYYY-MM-DD (Optional)" or not due_date:
             due_date = None
+        
+        try:
+            due_date = normalize_due_date(due_date)
+        except ValueError:
+            messagebox.showinfo('Error', 'Due date must look like YYYY-MM-DD.')
+            return
             
-        self.db.add_task(title, priority, due_date)
+        self.db.submit(
+            'add_task', title, priority, due_date,
+            callback=lambda task_id: self.apply_task((task_id, title, priority, due_date, 0))
+        )
         
         self.task_title.delete(0, END)
         self.task_priority.current(1)
         self.task_due_date.delete(0, END)
         self.task_due_date.insert(0, "YYYY-MM-DD (Optional)")
-        
-        self.retrieve_database()
-        self.update_listbox()
 
     def toggle_task_completion(self, event):
         selected_item = self.task_tree.selection()
         if selected_item:
             self.toggle_selected_task()
 
+    def selected_task_ids(self):
+        # Treeview item ids are the task ids themselves
+        return [int(item_id) for item_id in self.task_tree.selection()]
+
     def toggle_selected_task(self):
-        selected_item = self.task_tree.selection()
-        if not selected_item:
+        task_ids = self.selected_task_ids()
+        if not task_ids:
             messagebox.showinfo('Error', 'No task selected.')
             return
-            
-        index = self.task_tree.index(selected_item[0])
-        if index >= len(self.task_ids):
-            return
-            
-        task_id = self.task_ids[index]
         
-        self.db.toggle_completed(task_id)
+        # Remember the rows now: a reload may replace the window before the result arrives
+        selected = {task_id: self.task_rows[task_id] for task_id in task_ids if task_id in self.task_rows}
         
-        self.retrieve_database()
-        self.update_listbox()
+        def toggled(changes):
+            new_status = dict(changes)
+            for task_id, task in selected.items():
+                if task_id not in new_status:
+                    self.remove_task(task_id)
+                else:
+                    task = self.task_rows.get(task_id, task)
+                    self.apply_task(task[:4] + (new_status[task_id],))
+        
+        self.db.submit('toggle_many', task_ids, callback=toggled)
 
     def delete_task(self):
-        selected_item = self.task_tree.selection()
-        if not selected_item:
+        task_ids = self.selected_task_ids()
+        if not task_ids:
             messagebox.showinfo('Error', 'No task selected.')
             return
-            
-        index = self.task_tree.index(selected_item[0])
-        if index >= len(self.task_ids):
-            return
-            
-        task_id = self.task_ids[index]
         
-        if messagebox.askyesno('Delete Task', 'Are you sure?'):
-            self.db.delete_task(task_id)
-            self.retrieve_database()
-            self.update_listbox()
+        question = 'Are you sure?' if len(task_ids) == 1 else f'Delete {len(task_ids)} tasks?'
+        if messagebox.askyesno('Delete Task', question):
+            self.db.submit('delete_many', task_ids, callback=self.remove_tasks)
 
     def delete_all_tasks(self):
         if messagebox.askyesno('Delete All', 'Are you sure?'):
-            self.db.delete_all_tasks()
-            self.retrieve_database()
-            self.update_listbox()
+            self.db.submit('delete_all_tasks', callback=self.clear_tasks)
 
     def filter_tasks(self, event=None):
         status = self.status_filter.get()
+        self.due_range = None
         
         if status == "All":
             self.filter_completed = None
@@ -334,44 +471,282 @@ class TaskManager:
             self.filter_completed = 0
         elif status == "Completed":
             self.filter_completed = 1
+        elif status == "Overdue":
+            self.filter_completed = 0
+            self.due_range = (None, epoch_day(date.today()) - 1)
+        elif status == "This week":
+            self.filter_completed = 0
+            today = epoch_day(date.today())
+            self.due_range = (today, today + 6)
             
         self.retrieve_database()
-        self.update_listbox()
+
+    def view_filters(self):
+        # Everything that decides which rows belong in the list, as get_tasks_page arguments
+        return {"filter_completed": self.filter_completed, "search": self.search, "due_range": self.due_range}
+
+    def schedule_search(self, event=None):
+        # Debounce typing: only query once the user pauses
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self.search_after_id = None
+        search = search_expression(self.search_entry.get())
+        if search != self.search:
+            self.search = search
+            self.retrieve_database()
 
     def retrieve_database(self):
-        self.tasks = self.db.get_tasks(filter_completed=self.filter_completed)
-        self.task_ids = [task[0] for task in self.tasks]
+        # Rapid filter and search changes supersede each other through the shared "window" key
+        self.db.submit(
+            'get_tasks_page', limit=self.PAGE_SIZE + 1, key='window', callback=self.show_first_page,
+            **self.view_filters()
+        )
 
-    def update_listbox(self):
-        for item in self.task_tree.get_children():
-            self.task_tree.delete(item)
-            
-        priority_names = {1: "High", 2: "Medium", 3: "Low"}
-        priority_colors = {1: self.colors["high_priority"], 2: self.colors["medium_priority"], 3: self.colors["low_priority"]}
+    def check_external_changes(self):
+        # Other app instances and scripts share the database file
+        self.db.submit('has_external_changes', key='external', callback=self.external_changes_checked)
+        self.root.after(self.EXTERNAL_CHECK_MS, self.check_external_changes)
+
+    def external_changes_checked(self, changed):
+        if changed and not self.db.pending('window'):
+            self.refresh_window()
+
+    def refresh_window(self):
+        # Re-read the loaded rows in place, keeping the scroll position
+        start_key = task_page_key(self.tasks[0]) if self.more_before and self.tasks else None
+        limit = max(len(self.tasks), self.PAGE_SIZE)
+        
+        def refreshed(page):
+            self.more_after = len(page) > limit
+            self.sync_tasks(page[:limit])
+        
+        self.db.submit(
+            'get_tasks_page', start_key, limit + 1, inclusive=True, key='window', callback=refreshed,
+            **self.view_filters()
+        )
+
+    def show_first_page(self, page):
+        self.more_before = False
+        self.more_after = len(page) > self.PAGE_SIZE
+        self.sync_tasks(page[:self.PAGE_SIZE])
+
+    def clear_tasks(self, deleted=None):
+        self.more_before = False
+        self.more_after = False
+        self.sync_tasks([])
+
+    def on_tree_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if not self.page_check_pending:
+            self.page_check_pending = True
+            self.task_tree.after_idle(self.load_visible_window)
+
+    def load_visible_window(self):
+        self.page_check_pending = False
+        first, last = self.task_tree.yview()
+        if float(last) >= 1 - self.PREFETCH_MARGIN and self.more_after:
+            self.load_next_page()
+        elif float(first) <= self.PREFETCH_MARGIN and self.more_before:
+            self.load_previous_page()
+
+    def load_next_page(self):
+        if not self.tasks:
+            self.retrieve_database()
+            return
         
-        for task in self.tasks:
-            task_id, title, priority, due_date, completed = task
-            
-            display_status = "Completed" if completed else "Active"
-            display_priority = priority_names.get(priority, "Medium")
-            
-            values = (title, display_priority, due_date or "", display_status)
-            
-            item_id = self.task_tree.insert("", END, values=values)
-            
-            if completed:
-                self.task_tree.tag_configure("completed", background=self.colors["completed"])
-                self.task_tree.item(item_id, tags=("completed",))
-            else:
-                tag_name = f"priority_{priority}"
-                self.task_tree.tag_configure(tag_name, background=priority_colors.get(priority, "white"))
-                self.task_tree.item(item_id, tags=(tag_name,))
+        anchor = self.tasks[-1]
+        filters = self.view_filters()
+        
+        def loaded(page):
+            # Ignore the page if the window moved or the filters changed meanwhile
+            if not self.tasks or self.tasks[-1] != anchor or self.view_filters() != filters:
+                return
+            self.append_page(page)
+        
+        self.db.submit(
+            'get_tasks_page', task_page_key(anchor), self.PAGE_SIZE + 1,
+            key='next_page', callback=loaded, **filters
+        )
+
+    def append_page(self, page):
+        self.more_after = len(page) > self.PAGE_SIZE
+        page = page[:self.PAGE_SIZE]
+        
+        for task in page:
+            values, tags = self.row_display(task)
+            self.task_tree.insert("", END, iid=task[0], values=values, tags=tags)
+            self.task_rows[task[0]] = task
+        self.tasks.extend(page)
+        
+        overflow = len(self.tasks) - self.MAX_LOADED_ROWS
+        if overflow > 0:
+            top = int(float(self.task_tree.yview()[0]) * len(self.tasks))
+            self.drop_rows(0, overflow)
+            self.more_before = True
+            self.task_tree.yview_moveto(max(top - overflow, 0) / len(self.tasks))
+
+    def load_previous_page(self):
+        if not self.tasks:
+            self.retrieve_database()
+            return
+        
+        anchor = self.tasks[0]
+        filters = self.view_filters()
+        
+        def loaded(page):
+            if not self.tasks or self.tasks[0] != anchor or self.view_filters() != filters:
+                return
+            self.prepend_page(page)
+        
+        self.db.submit(
+            'get_tasks_page', limit=self.PAGE_SIZE + 1, before_key=task_page_key(anchor),
+            key='previous_page', callback=loaded, **filters
+        )
+
+    def prepend_page(self, page):
+        self.more_before = len(page) > self.PAGE_SIZE
+        page = page[-self.PAGE_SIZE:]
+        
+        top = int(float(self.task_tree.yview()[0]) * len(self.tasks))
+        for index, task in enumerate(page):
+            values, tags = self.row_display(task)
+            self.task_tree.insert("", index, iid=task[0], values=values, tags=tags)
+            self.task_rows[task[0]] = task
+        self.tasks[0:0] = page
+        
+        overflow = len(self.tasks) - self.MAX_LOADED_ROWS
+        if overflow > 0:
+            self.drop_rows(len(self.tasks) - overflow, len(self.tasks))
+            self.more_after = True
+        self.task_tree.yview_moveto((top + len(page)) / len(self.tasks))
+
+    def drop_rows(self, start, stop):
+        dropped = [task[0] for task in self.tasks[start:stop]]
+        for task_id in dropped:
+            del self.task_rows[task_id]
+        self.task_tree.delete(*dropped)
+        del self.tasks[start:stop]
+
+    def matches_filter(self, task):
+        if self.search is not None and not title_matches_search(task[1], self.search):
+            return False
+        if self.due_range is not None:
+            due_day = due_epoch_day(task[3])
+            first, last = self.due_range
+            if due_day is None or (first is not None and due_day < first) or (last is not None and due_day > last):
+                return False
+        return self.filter_completed is None or task[4] == self.filter_completed
+
+    def row_display(self, task):
+        task_id, title, priority, due_date, completed = task
+        
+        display_status = "Completed" if completed else "Active"
+        display_priority = self.priority_names.get(priority, "Medium")
+        
+        values = (title, display_priority, due_date or "", display_status)
+        tags = ("completed",) if completed else (f"priority_{priority}",)
+        return values, tags
+
+    def task_index(self, task_id):
+        # Position of a loaded task, found by binary search on its sort key
+        return bisect_left(self.tasks, task_sort_key(self.task_rows[task_id]), key=task_sort_key)
+
+    def apply_task(self, task):
+        # Insert, update or move a single row without touching the others
+        task_id = task[0]
+        if not self.matches_filter(task):
+            self.remove_task(task_id)
+            return
+        
+        values, tags = self.row_display(task)
+        on_screen = task_id in self.task_rows
+        
+        if on_screen:
+            index = self.task_index(task_id)
+            if task_sort_key(self.task_rows[task_id]) == task_sort_key(task):
+                self.tasks[index] = task
+                self.task_rows[task_id] = task
+                self.task_tree.item(task_id, values=values, tags=tags)
+                return
+            del self.tasks[index]
+            del self.task_rows[task_id]
+        
+        index = bisect_left(self.tasks, task_sort_key(task), key=task_sort_key)
+        
+        # Rows that sort outside the loaded window arrive with a later page instead
+        outside_window = (
+            (index == len(self.tasks) and self.more_after) or
+            (index == 0 and self.more_before)
+        )
+        if outside_window:
+            if on_screen:
+                self.task_tree.delete(task_id)
+            return
+        
+        self.tasks.insert(index, task)
+        self.task_rows[task_id] = task
+        
+        if on_screen:
+            self.task_tree.item(task_id, values=values, tags=tags)
+            self.task_tree.move(task_id, "", index)
+        else:
+            self.task_tree.insert("", index, iid=task_id, values=values, tags=tags)
+
+    def remove_task(self, task_id):
+        if task_id not in self.task_rows:
+            return
+        del self.tasks[self.task_index(task_id)]
+        del self.task_rows[task_id]
+        self.task_tree.delete(task_id)
+
+    def remove_tasks(self, task_ids):
+        for task_id in task_ids:
+            self.remove_task(task_id)
+
+    def sync_tasks(self, tasks):
+        # Diff a freshly queried (already sorted) list against the rows on screen
+        new_ids = {task[0] for task in tasks}
+        stale = [task_id for task_id in self.task_rows if task_id not in new_ids]
+        if stale:
+            self.task_tree.delete(*stale)
+        
+        old_rows = self.task_rows
+        self.task_rows = {}
+        for task in tasks:
+            task_id = task[0]
+            old_task = old_rows.get(task_id)
+            if old_task is None:
+                values, tags = self.row_display(task)
+                self.task_tree.insert("", END, iid=task_id, values=values, tags=tags)
+            elif old_task != task:
+                values, tags = self.row_display(task)
+                self.task_tree.item(task_id, values=values, tags=tags)
+            self.task_rows[task_id] = task
+        
+        # Only reorder when the on-screen order actually differs
+        ordered_items = tuple(str(task[0]) for task in tasks)
+        if self.task_tree.get_children() != ordered_items:
+            self.task_tree.set_children("", *ordered_items)
+        
+        self.tasks = list(tasks)
+
+    def update_listbox(self):
+        self.sync_tasks(self.tasks)
 
     def close(self):
         self.db.close()
-        guiWindow.destroy()
+        self.root.destroy()
 
 if __name__ == "__main__":
+    # TODO_PROFILE=profile.json writes SQL and callback timings there on exit;
+    # TODO_SERVER=http://127.0.0.1:8765 uses a task_server.py store instead of the local file
+    instrumentation = None
+    if os.environ.get("TODO_PROFILE"):
+        from todo_instrumentation import Instrumentation
+        instrumentation = Instrumentation(os.environ["TODO_PROFILE"])
     guiWindow = Tk()
-    app = TaskManager(guiWindow)
+    app = TaskManager(guiWindow, instrumentation, os.environ.get("TODO_SERVER"))
     guiWindow.mainloop()
\ No newline at end of file
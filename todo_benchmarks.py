@@ -0,0 +1,280 @@
+# Benchmarks for the to-do list database layer.
+# Run with: python todo_benchmarks.py
+
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from task_database import TaskDatabase, search_expression, task_page_key
+from task_server import RemoteTaskDatabase
+from todo_app import DatabaseWorker
+
+def sample_tasks(count):
+    return [(f"Task {i}", i % 3 + 1, f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}") for i in range(count)]
+
+def time_writes(label, count, run, **db_options):
+    """Time one way of writing count tasks into a fresh database file"""
+    with tempfile.TemporaryDirectory() as folder:
+        db = TaskDatabase(os.path.join(folder, "bench.db"), **db_options)
+        start = time.perf_counter()
+        run(db, sample_tasks(count))
+        elapsed = time.perf_counter() - start
+        db.close()
+
+    print(f"{label:<40} {count:>8} rows  {elapsed:8.3f} s  {count / elapsed:12,.0f} rows/s")
+    return elapsed
+
+def per_row_commits(db, tasks):
+    for title, priority, due_date in tasks:
+        db.add_task(title, priority, due_date)
+
+def one_batch(db, tasks):
+    db.add_tasks(tasks)
+
+def batch_write_benchmark(per_row_count=2000, batch_count=200000):
+    """Compare one commit per task against batch() / executemany, with and without WAL"""
+    print("Inserts:")
+    time_writes("add_task, commit per row", per_row_count, per_row_commits)
+    time_writes("add_task, commit per row (WAL, NORMAL)", per_row_count, per_row_commits,
+                wal=True, synchronous="NORMAL")
+    time_writes("add_tasks, one transaction", batch_count, one_batch)
+    time_writes("add_tasks, one transaction (WAL, NORMAL)", batch_count, one_batch,
+                wal=True, synchronous="NORMAL")
+
+    print("\nUpdates and deletes:")
+    with tempfile.TemporaryDirectory() as folder:
+        db = TaskDatabase(os.path.join(folder, "bench.db"))
+        db.add_tasks(sample_tasks(batch_count))
+        task_ids = [task[0] for task in db.get_tasks()]
+
+        start = time.perf_counter()
+        for task_id in task_ids[:per_row_count]:
+            db.toggle_completed(task_id)
+        elapsed = time.perf_counter() - start
+        print(f"{'toggle_completed, commit per row':<40} {per_row_count:>8} rows  {elapsed:8.3f} s  {per_row_count / elapsed:12,.0f} rows/s")
+
+        start = time.perf_counter()
+        db.set_completed_many(task_ids, 1)
+        elapsed = time.perf_counter() - start
+        print(f"{'set_completed_many':<40} {len(task_ids):>8} rows  {elapsed:8.3f} s  {len(task_ids) / elapsed:12,.0f} rows/s")
+
+        start = time.perf_counter()
+        db.delete_many(task_ids)
+        elapsed = time.perf_counter() - start
+        print(f"{'delete_many':<40} {len(task_ids):>8} rows  {elapsed:8.3f} s  {len(task_ids) / elapsed:12,.0f} rows/s")
+        db.close()
+
+def worker_latency_benchmark(task_count=200000, events=300):
+    """Measure how long the GUI thread is busy per event: direct SQLite calls vs DatabaseWorker"""
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bench.db")
+        db = TaskDatabase(path)
+        db.add_tasks(sample_tasks(task_count))
+
+        # Direct: every filter change blocks the caller for the full query
+        worst = 0.0
+        for i in range(events):
+            start = time.perf_counter()
+            db.get_tasks(filter_completed=i % 2)
+            worst = max(worst, time.perf_counter() - start)
+        db.close()
+        print(f"{'direct get_tasks, worst event':<40} {worst * 1000:10.3f} ms")
+
+        # Worker: the GUI thread only pays for submit() and for poll() callbacks
+        worker = DatabaseWorker(path)
+        worker.ready.result()
+        worst = 0.0
+        for i in range(events):
+            start = time.perf_counter()
+            worker.submit("get_tasks", filter_completed=i % 2, key="window")
+            worker.poll()
+            worst = max(worst, time.perf_counter() - start)
+        worker.submit("schema_version").result()
+        worker.poll()
+        worker.close()
+        print(f"{'DatabaseWorker submit + poll, worst':<40} {worst * 1000:10.3f} ms")
+        print(f"{'DatabaseWorker callbacks, worst':<40} {worker.latency_report()['max_event_ms']:10.3f} ms")
+
+def search_latency_benchmark(task_count=1000000, page_size=101, target_ms=20):
+    """Time the first and second search result page for rare, common and one-letter queries.
+
+    The first page of a new search should take under target_ms; misses are listed at the end.
+    Its time includes choosing the query plan, which the next page reuses."""
+    words = [f"item{i}" for i in range(5000)] + ["report", "meeting", "groceries", "email"] * 250
+    rng = random.Random(1)
+    tasks = ((" ".join(rng.choices(words, k=4)), i % 3 + 1, None if i % 7 == 0 else f"2024-{i % 12 + 1:02d}-01")
+             for i in range(task_count))
+
+    with tempfile.TemporaryDirectory() as folder:
+        db = TaskDatabase(os.path.join(folder, "bench.db"))
+        db.add_tasks(tasks)
+        db.cursor.execute("ANALYZE")
+
+        print(f"Search over {task_count:,} tasks (first page target {target_ms} ms):")
+        missed = []
+        for text in ["item1234", "report", "rep", "r", "item12 report", "nothing"]:
+            search = search_expression(text)
+            start = time.perf_counter()
+            page = db.get_tasks_page(limit=page_size, search=search)
+            first = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if page:
+                db.get_tasks_page(task_page_key(page[-1]), page_size, search=search)
+            second = time.perf_counter() - start
+            print(f"  {text!r:<18} first page {first * 1000:8.2f} ms   next page {second * 1000:8.2f} ms")
+            if first * 1000 > target_ms:
+                missed.append(f"{text!r} ({first * 1000:.1f} ms)")
+        db.close()
+        print(f"  target missed by: {', '.join(missed)}" if missed else "  every first page met the target")
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+def server_load_benchmark(task_count=100000, client_counts=(1, 4, 16), seconds=5, write_share=0.1):
+    """Requests/s and p50/p99 latency against task_server.py with concurrent local clients"""
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bench.db")
+        db = TaskDatabase(path)
+        db.add_tasks(sample_tasks(task_count))
+        db.close()
+
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "task_server.py"),
+             "--db", path, "--port", "0"],
+            stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            url = re.search(r"http://\S+", server.stdout.readline()).group()
+            print(f"Server load, {task_count:,} tasks, {write_share:.0%} writes:")
+            for clients in client_counts:
+                latencies = {"read": [], "write": []}
+                deadline = time.perf_counter() + seconds
+
+                def client(seed):
+                    rng = random.Random(seed)
+                    remote = RemoteTaskDatabase(url)
+                    while time.perf_counter() < deadline:
+                        kind = "write" if rng.random() < write_share else "read"
+                        start = time.perf_counter()
+                        if kind == "write":
+                            remote.toggle_completed(rng.randrange(1, task_count + 1))
+                        else:
+                            remote.get_tasks_page(limit=101, filter_completed=rng.choice([None, 0, 1]))
+                        latencies[kind].append(time.perf_counter() - start)
+
+                threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+                every = sorted(latencies["read"] + latencies["write"])
+                line = f"  {clients:>3} clients  {len(every) / seconds:8,.0f} req/s"
+                for kind in ("read", "write"):
+                    values = sorted(latencies[kind])
+                    if values:
+                        line += (f"   {kind} p50 {percentile(values, 0.5) * 1000:6.2f} ms"
+                                 f" p99 {percentile(values, 0.99) * 1000:7.2f} ms")
+                print(line)
+        finally:
+            server.terminate()
+            server.wait()
+
+# Runs the real app in a child process and quits as soon as the first page is on screen
+STARTUP_CHILD = """
+import time
+started = time.perf_counter()
+from tkinter import Tk
+import todo_app
+imported = time.perf_counter()
+
+show_first_page = todo_app.TaskManager.show_first_page
+def first_page_shown(self, page):
+    show_first_page(self, page)
+    self.root.update_idletasks()
+    print(f"{len(page)} {imported - started} {time.perf_counter() - started}", flush=True)
+    self.root.after_idle(self.close)
+todo_app.TaskManager.show_first_page = first_page_shown
+
+root = Tk()
+todo_app.TaskManager(root)
+root.mainloop()
+"""
+
+# Without a display: the part of startup that no longer waits for the window. The app
+# asks for its first page before building widgets, so opening the database and
+# running that query overlap the widget build instead of following it.
+STARTUP_HEADLESS_CHILD = """
+import time
+started = time.perf_counter()
+from tkinter import Tk
+import todo_app
+imported = time.perf_counter()
+
+worker = todo_app.DatabaseWorker()
+page = worker.submit('get_tasks_page', limit=todo_app.TaskManager.PAGE_SIZE + 1, key='window').result()
+print(f"{len(page)} {imported - started} {time.perf_counter() - imported}", flush=True)
+worker.close()
+"""
+
+def headless_startup_benchmark(folder, env, runs):
+    print("  no display, so timing what runs alongside the widget build instead:")
+    pages = []
+    for run in range(runs):
+        child = subprocess.run([sys.executable, "-c", STARTUP_HEADLESS_CHILD], cwd=folder, env=env,
+                               capture_output=True, text=True)
+        if child.returncode != 0:
+            print("  skipped: " + (child.stderr.strip().splitlines() or ["worker failed to start"])[-1])
+            return
+        rows, imports, page = child.stdout.split()
+        pages.append(float(page))
+        print(f"  run {run + 1}: imports {float(imports) * 1000:6.1f} ms  open + first page "
+              f"{float(page) * 1000:6.1f} ms  {rows} rows")
+    median = sorted(pages)[len(pages) // 2] * 1000
+    print(f"  median open + first page {median:.1f} ms: before, the first row waited for this after the"
+          f" widgets were built; now it overlaps them, saving up to {median:.1f} ms")
+
+def startup_benchmark(task_count=200000, runs=5):
+    """Process start to first rendered row for todo_app.py on an existing database.
+
+    Without a display, times the database open and first page query instead."""
+    with tempfile.TemporaryDirectory() as folder:
+        db = TaskDatabase(os.path.join(folder, "listOfTasks.db"))
+        db.add_tasks(sample_tasks(task_count))
+        db.close()
+
+        app_folder = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [app_folder, os.environ.get("PYTHONPATH")])))
+        print(f"Startup with {task_count:,} tasks (process start to first rendered row):")
+        totals = []
+        for run in range(runs):
+            start = time.perf_counter()
+            child = subprocess.run([sys.executable, "-c", STARTUP_CHILD], cwd=folder, env=env,
+                                   capture_output=True, text=True)
+            total = time.perf_counter() - start
+            if child.returncode != 0:
+                print("  " + (child.stderr.strip().splitlines() or ["app failed to start"])[-1])
+                headless_startup_benchmark(folder, env, runs)
+                return
+            rows, imports, in_process = child.stdout.split()
+            totals.append(total)
+            print(f"  run {run + 1}: {total * 1000:8.1f} ms total  imports {float(imports) * 1000:6.1f} ms"
+                  f"  in process {float(in_process) * 1000:6.1f} ms  {rows} rows shown")
+        print(f"  median {sorted(totals)[len(totals) // 2] * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    batch_write_benchmark()
+    print()
+    worker_latency_benchmark()
+    print()
+    search_latency_benchmark()
+    print()
+    server_load_benchmark()
+    print()
+    startup_benchmark()
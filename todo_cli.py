@@ -0,0 +1,163 @@
+# Headless import/export for the to-do list database.
+# Works without tkinter, so it can run on servers and in scripts.
+#
+#   python todo_cli.py import tasks.csv
+#   python todo_cli.py export tasks.jsonl --status active
+#   python todo_cli.py export - --format csv > tasks.csv
+
+import argparse
+import csv
+import json
+import sys
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+from task_database import TaskDatabase, stored_due_date
+
+FIELDS = ["id", "title", "priority", "due_date", "completed"]
+PRIORITY_NAMES = {"high": 1, "medium": 2, "low": 3}
+STATUS_FILTERS = {"all": None, "active": 0, "completed": 1}
+# Skipped rows are counted; only this many are reported line by line
+SKIPPED_LINES_SHOWN = 20
+
+def guess_format(path, chosen_format):
+    """Use --format if given, otherwise go by the file extension"""
+    if chosen_format:
+        return chosen_format
+    if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+def parse_priority(value):
+    if value is None or value == "":
+        return 2
+    if isinstance(value, str) and value.strip().lower() in PRIORITY_NAMES:
+        return PRIORITY_NAMES[value.strip().lower()]
+    return int(value)
+
+def parse_completed(value):
+    if isinstance(value, str):
+        return 1 if value.strip().lower() in ("1", "true", "yes", "y", "completed") else 0
+    return 1 if value else 0
+
+def task_from_record(record):
+    """Turn one CSV/JSON record into an (title, priority, due_date, completed) tuple"""
+    title = record.get("title")
+    if not title:
+        raise ValueError("missing title")
+    due_date = record.get("due_date")
+    if due_date is not None and not isinstance(due_date, str):
+        raise ValueError(f"due_date must be text, got {due_date!r}")
+    # Legacy free-form due dates come back from an export as they went out
+    due_date = stored_due_date(due_date)
+    return (title, parse_priority(record.get("priority")), due_date, parse_completed(record.get("completed")))
+
+def read_records(file, file_format):
+    """Yield (line number, record) one at a time, never holding the whole file"""
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(file, start=1):
+            if line.strip():
+                yield line_number, line
+
+def valid_tasks(records, skipped):
+    """The tasks of the valid records; skipped["count"] and skipped["lines"] (the first few) track the rest"""
+    for line_number, record in records:
+        try:
+            if isinstance(record, str):
+                record = json.loads(record)
+            yield task_from_record(record)
+        except (ValueError, TypeError, AttributeError) as error:
+            skipped["count"] += 1
+            if len(skipped["lines"]) < SKIPPED_LINES_SHOWN:
+                skipped["lines"].append(line_number)
+                print(f"Skipping line {line_number}: {error}", file=sys.stderr)
+
+def chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+def report_progress(action, count, start, done=False):
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    end = "\n" if done else "\r"
+    print(f"{action} {count:,} rows  ({count / elapsed:,.0f} rows/s)", end=end, file=sys.stderr, flush=True)
+
+def import_tasks(db, file, file_format, chunk_size=10000):
+    """Stream tasks into the database, one transaction per chunk"""
+    start = time.perf_counter()
+    skipped = {"count": 0, "lines": []}
+    imported = 0
+    for chunk in chunks(valid_tasks(read_records(file, file_format), skipped), chunk_size):
+        db.import_tasks(chunk)
+        imported += len(chunk)
+        report_progress("Imported", imported, start)
+    report_progress("Imported", imported, start, done=True)
+    if skipped["count"]:
+        more = " ..." if skipped["count"] > len(skipped["lines"]) else ""
+        print(f"Skipped {skipped['count']:,} invalid rows, first on lines "
+              f"{', '.join(map(str, skipped['lines']))}{more}", file=sys.stderr)
+    return imported
+
+def export_tasks(db, file, file_format, filter_completed=None, chunk_size=10000):
+    """Stream tasks out of the database without loading them all"""
+    start = time.perf_counter()
+    exported = 0
+    writer = csv.writer(file) if file_format == "csv" else None
+    if writer:
+        writer.writerow(FIELDS)
+
+    for task in db.iter_tasks(filter_completed, chunk_size):
+        if writer:
+            writer.writerow(task)
+        else:
+            file.write(json.dumps(dict(zip(FIELDS, task)), ensure_ascii=False) + "\n")
+        exported += 1
+        if exported % chunk_size == 0:
+            report_progress("Exported", exported, start)
+    report_progress("Exported", exported, start, done=True)
+    return exported
+
+def open_file(path, mode):
+    # stdin/stdout are wrapped so the caller's "with" block doesn't close them
+    if path == "-":
+        return nullcontext(sys.stdin if "r" in mode else sys.stdout)
+    return open(path, mode, newline="", encoding="utf-8")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export to-do tasks without the GUI")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="CSV or JSONL file, or - for stdin/stdout")
+    parser.add_argument("--db", default="listOfTasks.db", help="database file (default: listOfTasks.db)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="file format (default: from the extension)")
+    parser.add_argument("--status", choices=list(STATUS_FILTERS), default="all", help="which tasks to export")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows per transaction / fetch")
+    parser.add_argument("--wal", action="store_true", help="use WAL journaling with synchronous=NORMAL")
+    parser.add_argument("--profile", metavar="FILE", help="write SQL statement timings to this JSON file")
+    args = parser.parse_args(argv)
+
+    file_format = guess_format(args.path, args.format)
+    options = {"wal": True, "synchronous": "NORMAL"} if args.wal else {}
+    if args.profile:
+        from todo_instrumentation import Instrumentation
+        options["instrumentation"] = Instrumentation(args.profile)
+    db = TaskDatabase(args.db, **options)
+    try:
+        if args.command == "import":
+            with open_file(args.path, "r") as file:
+                import_tasks(db, file, file_format, args.chunk_size)
+        else:
+            with open_file(args.path, "w") as file:
+                export_tasks(db, file, file_format, STATUS_FILTERS[args.status], args.chunk_size)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# Opt-in timing for the to-do app: every SQL statement TaskDatabase runs and every
+# instrumented Tk callback. Nothing here is imported or wrapped unless it is switched on,
+# e.g. TODO_PROFILE=profile.json python todo_app.py
+# The JSON report is written when the database is closed.
+
+import heapq
+import json
+import re
+import threading
+from functools import wraps
+from inspect import isgeneratorfunction
+from time import perf_counter
+
+SQL_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+WHITESPACE = re.compile(r"\s+")
+
+# Methods that wrap other statements rather than issue their own
+UNTIMED_DATABASE_METHODS = {"batch", "close"}
+
+def sql_template(statement):
+    """Collapse literals so 'WHERE id = 5' and 'WHERE id = 6' count as one query"""
+    return WHITESPACE.sub(" ", SQL_LITERAL.sub("?", statement)).strip()
+
+def histogram_bucket(seconds):
+    """Power-of-two microsecond buckets: <1us, <2us, <4us, ..."""
+    micros = seconds * 1000000
+    bound = 1
+    while micros >= bound:
+        bound *= 2
+    return f"<{bound}us"
+
+class Timings:
+    """Count, total, max and a latency histogram for one name"""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = histogram_bucket(seconds)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def report(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.count,
+            "max_ms": self.max * 1000,
+            "histogram": dict(sorted(self.histogram.items(), key=lambda item: int(item[0][1:-2]))),
+        }
+
+class Instrumentation:
+    def __init__(self, path, slowest=20):
+        self.path = path
+        self.slowest_kept = slowest
+        self.lock = threading.Lock()
+        self.sql = {}
+        self.ui = {}
+        self.slowest = []
+        self.running = threading.local()
+
+    def record(self, table, name, seconds):
+        with self.lock:
+            if name not in table:
+                table[name] = Timings()
+            table[name].add(seconds)
+
+    def attach_database(self, db):
+        """Time every statement on db's connection through its trace callback"""
+        db.conn.set_trace_callback(self.trace)
+        for name, method in vars(type(db)).items():
+            if callable(method) and name not in UNTIMED_DATABASE_METHODS and not name.startswith("_") \
+                    and not isgeneratorfunction(method):
+                setattr(db, name, self.closing_statements(getattr(db, name)))
+
+    def trace(self, statement):
+        # SQLite calls this as each statement starts; the previous one on this thread ends here.
+        # Trigger and FTS5 sub-statements (repeated outer text, or "-- ...") belong to the outer one.
+        pending = getattr(self.running, "statement", None)
+        if pending is not None and (pending[0] == statement or statement.startswith("-- ")):
+            return
+        now = perf_counter()
+        self.finish_statement(now)
+        self.running.statement = (statement, now)
+
+    def finish_statement(self, now=None):
+        pending = getattr(self.running, "statement", None)
+        if pending is None:
+            return
+        self.running.statement = None
+        statement, start = pending
+        elapsed = (now or perf_counter()) - start
+        self.record(self.sql, sql_template(statement), elapsed)
+        with self.lock:
+            entry = (elapsed, statement)
+            if len(self.slowest) < self.slowest_kept:
+                heapq.heappush(self.slowest, entry)
+            elif entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def closing_statements(self, method):
+        # A database call's last statement (and its fetches) ends when the call returns
+        @wraps(method)
+        def timed(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.finish_statement()
+        return timed
+
+    def wrap_methods(self, obj, names):
+        """Time the given methods of obj, e.g. Tk callbacks, before anything binds them"""
+        for name in names:
+            method = getattr(obj, name)
+
+            @wraps(method)
+            def timed(*args, _method=method, _name=name, **kwargs):
+                start = perf_counter()
+                try:
+                    return _method(*args, **kwargs)
+                finally:
+                    self.record(self.ui, _name, perf_counter() - start)
+
+            setattr(obj, name, timed)
+
+    def report(self):
+        with self.lock:
+            by_total = lambda table: dict(
+                sorted(((name, timings.report()) for name, timings in table.items()),
+                       key=lambda item: item[1]["total_ms"], reverse=True)
+            )
+            return {
+                "sql": by_total(self.sql),
+                "ui": by_total(self.ui),
+                "slowest_sql": [
+                    {"ms": elapsed * 1000, "sql": statement}
+                    for elapsed, statement in sorted(self.slowest, reverse=True)
+                ],
+            }
+
+    def dump(self):
+        self.finish_statement()
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2)